@@ -2,6 +2,10 @@ import os
 from flask import Flask
 from app.config import Config
 from app.game.QuizEngine import QuizEngine
+from app.game.HttpPool import http_pool
+from app.game.CircuitBreaker import quiz_breaker
+from app.game.AnswerLog import answer_log
+from app.game.Metrics import metrics
 
 
 def create_app(config_class=Config):
@@ -16,8 +20,23 @@ def create_app(config_class=Config):
                 static_folder=static_dir)
     app.config.from_object(config_class)
     
+    # Pool HTTP partagé (fermé à l'arrêt du processus)
+    http_pool.init_app(app)
+    quiz_breaker.init_app(app)
+    # Réponses des joueurs : difficulté calibrée des questions
+    answer_log.init_app(app)
+    
+    # Mesures des routes et de /metrics (PROFILING=False les désactive entièrement)
+    metrics.init_app(app)
+    
     # Enregistrer les blueprints
-    from app.routes import bp as main_bp
+    from app.routes import bp as main_bp, session_manager
     app.register_blueprint(main_bp)
+    # Journal replay, turn scheduler and reaper start with the first request (see SessionManager.start)
+    session_manager.configure(app.config, start=False)
+    
+    # Commandes CLI (flask questions sync/import/stats)
+    from app.commands import questions_cli
+    app.cli.add_command(questions_cli)
 
     return app
@@ -0,0 +1,62 @@
+import json
+import click
+from flask.cli import AppGroup
+from flask import current_app
+from app.game.QuizEngine import QuizEngine
+from app.game.QuestionStore import QuestionStore
+
+questions_cli = AppGroup('questions', help="Gestion de la banque de questions locale.")
+
+
+def _open_store() -> QuestionStore:
+    return QuestionStore(current_app.config['QUESTION_DB_PATH'])
+
+
+@questions_cli.command('sync')
+@click.option('--category', 'categories', multiple=True, help="Catégorie à importer (répétable).")
+@click.option('--difficulty', 'difficulties', multiple=True,
+              type=click.Choice(['facile', 'normal', 'difficile']), help="Difficulté à importer (répétable).")
+@click.option('--batch-size', default=50, show_default=True, help="Questions demandées par requête.")
+@click.option('--max-rounds', default=20, show_default=True, help="Nombre maximal de vagues de requêtes.")
+def sync_questions(categories, difficulties, batch_size, max_rounds):
+    """Importe les questions de l'API de quiz dans la banque locale."""
+    store = _open_store()
+    # Always talk to the live API, whatever QUESTION_BACKEND says
+    quiz = QuizEngine(max_concurrency=current_app.config['QUIZ_MAX_CONCURRENCY'])
+    try:
+        added = store.sync_from_api(quiz, list(categories) or None, list(difficulties) or None,
+                                    batch_size=batch_size, max_rounds=max_rounds)
+        click.echo(f"{added} nouvelle(s) question(s) importée(s).")
+    finally:
+        quiz.close()
+        store.close()
+
+
+@questions_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--category', default=None, help="Catégorie par défaut des questions du fichier.")
+@click.option('--difficulty', default=None, type=click.Choice(['facile', 'normal', 'difficile']),
+              help="Difficulté par défaut des questions du fichier.")
+def import_questions(path, category, difficulty):
+    """Importe un fichier JSON (liste ou {"quizzes": [...]}) au format de l'API."""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    questions = data.get('quizzes', []) if isinstance(data, dict) else data
+    store = _open_store()
+    try:
+        added = store.add_questions(questions, category=category, difficulty=difficulty)
+        click.echo(f"{added} nouvelle(s) question(s) importée(s) sur {len(questions)}.")
+    finally:
+        store.close()
+
+
+@questions_cli.command('stats')
+def questions_stats():
+    """Affiche le nombre de questions par catégorie et difficulté."""
+    store = _open_store()
+    try:
+        for category, counts in sorted(store.get_stats().items()):
+            detail = ", ".join(f"{diff}: {n}" for diff, n in sorted(counts.items()))
+            click.echo(f"{category}: {detail}")
+    finally:
+        store.close()
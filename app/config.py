@@ -3,12 +3,77 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+basedir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+
 
 class Config:
     """Configuration de base pour l'application Flask"""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     DEBUG = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     
+    # Tampon de questions pré-chargées (par difficulté et catégorie)
+    QUESTION_BUFFER_LOW_WATER = int(os.environ.get('QUESTION_BUFFER_LOW_WATER', 3))
+    QUESTION_BUFFER_HIGH_WATER = int(os.environ.get('QUESTION_BUFFER_HIGH_WATER', 10))
+    
+    # Chargement groupé des questions : requêtes simultanées et délai par requête
+    QUIZ_MAX_CONCURRENCY = int(os.environ.get('QUIZ_MAX_CONCURRENCY', 8))
+    QUIZ_REQUEST_DEADLINE = float(os.environ.get('QUIZ_REQUEST_DEADLINE', 5.0))
+    
+    # Tolérance aux pannes de l'API de quiz : nouvelles tentatives, requêtes doublées, disjoncteur
+    QUIZ_RETRIES = int(os.environ.get('QUIZ_RETRIES', 2))
+    QUIZ_RETRY_BACKOFF = float(os.environ.get('QUIZ_RETRY_BACKOFF', 0.2))
+    QUIZ_HEDGE = os.environ.get('QUIZ_HEDGE', 'True').lower() == 'true'
+    QUIZ_BREAKER_THRESHOLD = int(os.environ.get('QUIZ_BREAKER_THRESHOLD', 5))
+    QUIZ_BREAKER_RESET = float(os.environ.get('QUIZ_BREAKER_RESET', 30.0))
+    # Les parties qui demandent les mêmes questions au même moment partagent une seule requête
+    QUIZ_COALESCE = os.environ.get('QUIZ_COALESCE', 'True').lower() == 'true'
+    
+    # Journal des réponses et difficulté calibrée des questions (taux de réussite réel)
+    DIFFICULTY_CALIBRATION = os.environ.get('DIFFICULTY_CALIBRATION', 'True').lower() == 'true'
+    CALIBRATION_MIN_ANSWERS = int(os.environ.get('CALIBRATION_MIN_ANSWERS', 20))
+    CALIBRATION_EVERY = int(os.environ.get('CALIBRATION_EVERY', 1000))
+    ANSWER_LOG_SIZE = int(os.environ.get('ANSWER_LOG_SIZE', 1_000_000))
+    ANSWER_LOG_PATH = os.environ.get('ANSWER_LOG_PATH')
+    
+    # Mesures internes exposées sur /metrics (format Prometheus)
+    PROFILING = os.environ.get('PROFILING', 'True').lower() == 'true'
+    
+    # Pool HTTP partagé par toutes les sessions
+    HTTP_TIMEOUT = float(os.environ.get('HTTP_TIMEOUT', 10.0))
+    HTTP_POOL_MAX_CONNECTIONS = int(os.environ.get('HTTP_POOL_MAX_CONNECTIONS', 20))
+    HTTP_POOL_MAX_KEEPALIVE = int(os.environ.get('HTTP_POOL_MAX_KEEPALIVE', 10))
+    HTTP_POOL_KEEPALIVE_EXPIRY = float(os.environ.get('HTTP_POOL_KEEPALIVE_EXPIRY', 30.0))
+    HTTP_POOL_HTTP2 = os.environ.get('HTTP_POOL_HTTP2', 'True').lower() == 'true'
+    
+    # Expiration des sessions (secondes) et nombre maximal de sessions en mémoire
+    SESSION_TTL = float(os.environ.get('SESSION_TTL', 2 * 3600))
+    SESSION_FINISHED_TTL = float(os.environ.get('SESSION_FINISHED_TTL', 15 * 60))
+    SESSION_MAX_LIVE = int(os.environ.get('SESSION_MAX_LIVE', 200))
+    SESSION_EVICT_IDLE = float(os.environ.get('SESSION_EVICT_IDLE', 10 * 60))
+    SESSION_REAP_INTERVAL = float(os.environ.get('SESSION_REAP_INTERVAL', 60))
+    
+    # Stockage des sessions : "memory" (un seul processus) ou "sqlite" (partagé entre workers)
+    SESSION_STORE = os.environ.get('SESSION_STORE', 'memory')
+    SESSION_STORE_PATH = os.environ.get('SESSION_STORE_PATH') or os.path.join(basedir, 'sessions.db')
+    
+    # Journal des événements de chaque partie, rejoué au démarrage (avec le stockage "memory")
+    SESSION_JOURNAL = os.environ.get('SESSION_JOURNAL', 'False').lower() == 'true'
+    SESSION_JOURNAL_PATH = os.environ.get('SESSION_JOURNAL_PATH') or os.path.join(basedir, 'journal')
+    SESSION_SNAPSHOT_EVERY = int(os.environ.get('SESSION_SNAPSHOT_EVERY', 200))
+    SESSION_JOURNAL_FSYNC = os.environ.get('SESSION_JOURNAL_FSYNC', 'False').lower() == 'true'
+    
+    # Adresse annoncée dans le QR code du lobby (détectée automatiquement si vide)
+    JOIN_HOST = os.environ.get('JOIN_HOST')
+    JOIN_PORT = int(os.environ.get('JOIN_PORT', 5000))
+    
+    # Minuteur côté serveur : fin du temps de réponse et passage automatique
+    TURN_SCHEDULER = os.environ.get('TURN_SCHEDULER', 'True').lower() == 'true'
+    TURN_SCHEDULER_WORKERS = int(os.environ.get('TURN_SCHEDULER_WORKERS', 4))
+    
+    # Source des questions : "api", "local" (hors-ligne) ou "hybrid"
+    QUESTION_BACKEND = os.environ.get('QUESTION_BACKEND', 'api')
+    QUESTION_DB_PATH = os.environ.get('QUESTION_DB_PATH') or os.path.join(basedir, 'questions.db')
+    
     # Configuration de la base de données (si nécessaire)
     # SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///devagames.db'
     # SQLALCHEMY_TRACK_MODIFICATIONS = False
@@ -0,0 +1,304 @@
+import atexit
+import itertools
+import json
+import os
+import threading
+from array import array
+from collections import Counter
+from typing import Optional, Dict, List, Tuple
+
+try:
+    import numpy
+except ImportError:
+    # Optional: without it, aggregation relies on Counter and itertools (C loops too, a few times slower)
+    numpy = None
+
+
+class AnswerLog:
+    """Toutes les réponses données, en colonnes, pour mesurer la difficulté réelle des questions.
+
+    Une réponse occupe 11 octets répartis dans des tableaux `array` (code de
+    question, bonne réponse, temps de réponse, code de catégorie) : pas
+    d'objet par réponse, et les agrégats se calculent colonne par colonne
+    (numpy.bincount si numpy est installé). Le taux de réussite de chaque
+    question, une fois assez de réponses reçues, donne sa difficulté
+    calibrée (« facile », « normal », « difficile »), qui remplace le
+    niveau annoncé par l'API pour le multiplicateur et le tirage du paquet.
+    """
+
+    # Success rate at or above which a question is easy, and below which it is hard (4 options: 25% by chance)
+    EASY_RATE = 0.7
+    HARD_RATE = 0.35
+
+    def __init__(self, max_answers: int = 1_000_000, min_answers: int = 20,
+                 recalibrate_every: int = 1000, enabled: bool = True):
+        self._lock = threading.Lock()
+        self._calibrate_lock = threading.Lock()
+        self.configure(max_answers, min_answers, recalibrate_every, enabled)
+        self._clear()
+        self.stats = {
+            "recorded": 0,
+            "dropped": 0,
+            "calibrations": 0,
+        }
+
+    def configure(self, max_answers: int = 1_000_000, min_answers: int = 20,
+                  recalibrate_every: int = 1000, enabled: bool = True):
+        """
+        Règle la taille du journal et la calibration.
+
+        Args:
+            max_answers: Réponses conservées ; au-delà, la plus ancienne moitié est oubliée.
+            min_answers: Réponses nécessaires avant de calibrer une question.
+            recalibrate_every: Nouvelles réponses entre deux calibrations.
+            enabled: False garde le niveau de l'API pour toutes les questions (les réponses sont toujours enregistrées).
+        """
+        self.max_answers = max(2, max_answers)
+        self.min_answers = min_answers
+        self.recalibrate_every = recalibrate_every
+        self.enabled = enabled
+
+    def init_app(self, app):
+        """Configure le journal depuis la config Flask ; le recharge et le sauve à l'arrêt si ANSWER_LOG_PATH est défini."""
+        self.configure(
+            max_answers=app.config.get('ANSWER_LOG_SIZE', 1_000_000),
+            min_answers=app.config.get('CALIBRATION_MIN_ANSWERS', 20),
+            recalibrate_every=app.config.get('CALIBRATION_EVERY', 1000),
+            enabled=app.config.get('DIFFICULTY_CALIBRATION', True),
+        )
+        app.extensions['answer_log'] = self
+        path = app.config.get('ANSWER_LOG_PATH')
+        if path:
+            if os.path.exists(path):
+                try:
+                    self.load(path)
+                except (OSError, ValueError, EOFError) as e:
+                    print(f"Erreur lors du chargement du journal des réponses: {e}")
+            atexit.register(self.save, path)
+
+    def _clear(self):
+        # One entry per answer in each column
+        self._question = array("I")
+        self._correct = array("B")
+        self._response_ms = array("I")
+        self._category = array("H")
+        # Question hashes and categories are stored once, answers refer to them by index
+        self._question_codes: Dict[str, int] = {}
+        self._hashes: List[str] = []
+        self._category_codes: Dict[Optional[str], int] = {None: 0}
+        self._categories: List[Optional[str]] = [None]
+        self._levels: Dict[str, str] = {}
+        self._since_calibration = 0
+
+    def record(self, digest: str, correct: bool, response_ms: int, category: Optional[str] = None):
+        """
+        Enregistre une réponse.
+
+        Args:
+            digest: Empreinte de la question (question_hash).
+            correct: La réponse était-elle bonne.
+            response_ms: Temps de réponse en millisecondes.
+            category: Catégorie de la question, si connue.
+        """
+        with self._lock:
+            code = self._question_codes.get(digest)
+            if code is None:
+                code = self._question_codes[digest] = len(self._hashes)
+                self._hashes.append(digest)
+            category_code = self._category_codes.get(category)
+            if category_code is None:
+                category_code = self._category_codes[category] = len(self._categories)
+                self._categories.append(category)
+            self._question.append(code)
+            self._correct.append(1 if correct else 0)
+            self._response_ms.append(min(max(0, int(response_ms)), 0xFFFFFFFF))
+            self._category.append(category_code)
+            self.stats["recorded"] += 1
+            self._since_calibration += 1
+            if len(self._question) > self.max_answers:
+                self._drop_oldest(len(self._question) // 2)
+
+    def _drop_oldest(self, n: int):
+        for column in (self._question, self._correct, self._response_ms, self._category):
+            del column[:n]
+        self.stats["dropped"] += n
+        # Questions only answered in the dropped half give their code back: renumber the others densely,
+        # so the hash table stays bounded by max_answers however many questions go through
+        used = sorted(set(self._question))
+        if len(used) < len(self._hashes):
+            remap = [0] * len(self._hashes)
+            for code, old_code in enumerate(used):
+                remap[old_code] = code
+            self._question = array("I", map(remap.__getitem__, self._question))
+            self._hashes = [self._hashes[old_code] for old_code in used]
+            self._question_codes = {digest: code for code, digest in enumerate(self._hashes)}
+
+    def __len__(self) -> int:
+        return len(self._question)
+
+    def _columns(self) -> Tuple[array, array, array, array, List[str], List[Optional[str]]]:
+        # Copies: aggregation runs without holding the lock that record() needs
+        with self._lock:
+            return (array("I", self._question), array("B", self._correct), array("I", self._response_ms),
+                    array("H", self._category), list(self._hashes), list(self._categories))
+
+    def question_counts(self) -> Tuple[List[str], List[int], List[int]]:
+        """
+        (empreintes, réponses, bonnes réponses) par question, en un passage par colonne.
+
+        Returns:
+            Trois listes alignées, indexées par code de question.
+        """
+        questions, correct, _, _, hashes, _ = self._columns()
+        size = len(hashes)
+        if numpy is not None:
+            codes = numpy.frombuffer(questions, dtype=numpy.uint32)
+            answers = numpy.bincount(codes, minlength=size)
+            right = numpy.bincount(codes, weights=numpy.frombuffer(correct, dtype=numpy.uint8), minlength=size)
+            return hashes, answers.tolist(), right.astype(numpy.int64).tolist()
+        answers_by_code = Counter(questions)
+        right_by_code = Counter(itertools.compress(questions, correct))
+        return (hashes, [answers_by_code.get(code, 0) for code in range(size)],
+                [right_by_code.get(code, 0) for code in range(size)])
+
+    def question_stats(self, min_answers: int = 1) -> Dict[str, Dict]:
+        """
+        Réponses, taux de réussite et temps de réponse moyen de chaque question.
+
+        Args:
+            min_answers: Ignore les questions ayant reçu moins de réponses.
+
+        Returns:
+            Dictionnaire {empreinte: {"answers", "success_rate", "mean_ms"}}.
+        """
+        questions, correct, response_ms, _, hashes, _ = self._columns()
+        size = len(hashes)
+        if numpy is not None:
+            codes = numpy.frombuffer(questions, dtype=numpy.uint32)
+            answers = numpy.bincount(codes, minlength=size).tolist()
+            right = numpy.bincount(codes, weights=numpy.frombuffer(correct, dtype=numpy.uint8),
+                                   minlength=size).tolist()
+            total_ms = numpy.bincount(codes, weights=numpy.frombuffer(response_ms, dtype=numpy.uint32),
+                                      minlength=size).tolist()
+        else:
+            answers, right, total_ms = [0] * size, [0] * size, [0] * size
+            for code, ok, ms in zip(questions, correct, response_ms):
+                answers[code] += 1
+                right[code] += ok
+                total_ms[code] += ms
+        return {
+            hashes[code]: {
+                "answers": answers[code],
+                "success_rate": right[code] / answers[code],
+                "mean_ms": total_ms[code] / answers[code],
+            }
+            for code in range(size) if answers[code] and answers[code] >= min_answers
+        }
+
+    def category_stats(self) -> Dict[Optional[str], Dict]:
+        """Réponses et taux de réussite par catégorie."""
+        _, correct, _, categories, _, names = self._columns()
+        answers = Counter(categories)
+        right = Counter(itertools.compress(categories, correct))
+        return {
+            names[code]: {"answers": count, "success_rate": right.get(code, 0) / count}
+            for code, count in answers.items()
+        }
+
+    def level_for_rate(self, success_rate: float) -> str:
+        """Difficulté (« facile », « normal », « difficile ») correspondant à un taux de réussite."""
+        if success_rate >= self.EASY_RATE:
+            return "facile"
+        if success_rate < self.HARD_RATE:
+            return "difficile"
+        return "normal"
+
+    def calibrate(self) -> Dict[str, str]:
+        """
+        Recalcule la difficulté des questions ayant au moins `min_answers` réponses.
+
+        Returns:
+            Dictionnaire {empreinte: difficulté calibrée}.
+        """
+        hashes, answers, right = self.question_counts()
+        levels = {}
+        for digest, count, ok in zip(hashes, answers, right):
+            if count >= self.min_answers:
+                # Laplace smoothing: one right and one wrong answer assumed
+                levels[digest] = self.level_for_rate((ok + 1) / (count + 2))
+        with self._lock:
+            self._levels = levels
+            self.stats["calibrations"] += 1
+        return levels
+
+    def level_of(self, digest: str) -> Optional[str]:
+        """
+        Difficulté calibrée d'une question, ou None si elle n'a pas assez de réponses.
+
+        Si assez de réponses sont arrivées depuis la dernière calibration,
+        en lance une en arrière-plan (une seule à la fois) : l'appelant lit
+        la calibration précédente sans attendre.
+        """
+        if not self.enabled:
+            return None
+        if self._since_calibration >= self.recalibrate_every and self._calibrate_lock.acquire(blocking=False):
+            self._since_calibration = 0
+            try:
+                threading.Thread(target=self._calibrate_in_background, name="answer-calibration",
+                                 daemon=True).start()
+            except RuntimeError:
+                self._calibrate_lock.release()
+                raise
+        return self._levels.get(digest)
+
+    def _calibrate_in_background(self):
+        try:
+            self.calibrate()
+        except Exception as e:
+            print(f"Erreur lors de la calibration des difficultés: {e}")
+        finally:
+            self._calibrate_lock.release()
+
+    def save(self, path: str):
+        """Écrit le journal (en-tête JSON puis les colonnes brutes, ordre d'octets de la machine)."""
+        with self._lock:
+            header = {"answers": len(self._question), "hashes": self._hashes, "categories": self._categories}
+            with open(path + ".tmp", "wb") as f:
+                f.write(json.dumps(header, separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n")
+                for column in (self._question, self._correct, self._response_ms, self._category):
+                    column.tofile(f)
+        os.replace(path + ".tmp", path)
+
+    def load(self, path: str):
+        """Remplace le contenu du journal par celui écrit par save()."""
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            columns = [array("I"), array("B"), array("I"), array("H")]
+            for column in columns:
+                column.fromfile(f, header["answers"])
+        with self._lock:
+            self._clear()
+            self._question, self._correct, self._response_ms, self._category = columns
+            self._hashes = header["hashes"]
+            self._question_codes = {digest: code for code, digest in enumerate(self._hashes)}
+            self._categories = header["categories"]
+            self._category_codes = {category: code for code, category in enumerate(self._categories)}
+            self._since_calibration = self.recalibrate_every
+
+    def reset(self):
+        with self._lock:
+            self._clear()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["answers"] = len(self._question)
+            stats["questions"] = len(self._hashes)
+            stats["calibrated"] = len(self._levels)
+            stats["bytes"] = sum(column.itemsize * len(column) for column in
+                                 (self._question, self._correct, self._response_ms, self._category))
+            stats["numpy"] = numpy is not None
+        return stats
+
+
+answer_log = AnswerLog()
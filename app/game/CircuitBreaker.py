@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import deque
+from typing import Optional, Dict
+
+
+class CircuitBreaker:
+    """Disjoncteur devant l'API de quiz, partagé par tous les QuizEngine du processus.
+
+    Après `failure_threshold` échecs consécutifs, le circuit s'ouvre : les
+    requêtes sont refusées sans toucher le réseau pendant `reset_timeout`
+    secondes, puis une seule requête d'essai est autorisée (semi-ouvert).
+    Son succès referme le circuit, son échec le rouvre pour une nouvelle
+    période. Il garde aussi les dernières latences de l'API, qui servent à
+    décider quand doubler une requête lente.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    LATENCY_SAMPLES = 200
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self._lock = threading.Lock()
+        self.configure(failure_threshold, reset_timeout)
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._latencies = deque(maxlen=self.LATENCY_SAMPLES)
+        self.stats = {
+            "successes": 0,
+            "failures": 0,
+            "rejected": 0,
+            "opened": 0,
+        }
+
+    def configure(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Règle les seuils du disjoncteur.
+
+        Args:
+            failure_threshold: Échecs consécutifs avant ouverture (0 désactive le disjoncteur).
+            reset_timeout: Durée (secondes) d'ouverture avant une requête d'essai.
+        """
+        with self._lock:
+            self.failure_threshold = failure_threshold
+            self.reset_timeout = reset_timeout
+
+    def init_app(self, app):
+        """Configure le disjoncteur depuis la config Flask."""
+        self.configure(
+            failure_threshold=app.config.get('QUIZ_BREAKER_THRESHOLD', 5),
+            reset_timeout=app.config.get('QUIZ_BREAKER_RESET', 30.0),
+        )
+        app.extensions['quiz_breaker'] = self
+
+    def allow(self) -> bool:
+        """Indique si une requête peut partir (et réserve la requête d'essai en semi-ouvert)."""
+        with self._lock:
+            if self.failure_threshold <= 0 or self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def record_success(self, elapsed: Optional[float] = None):
+        with self._lock:
+            if elapsed is not None:
+                self._latencies.append(elapsed)
+            self.stats["successes"] += 1
+            self.failures = 0
+            self.state = self.CLOSED
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """Rend la requête d'essai réservée par allow() sans résultat (erreur inattendue) : la suivante pourra essayer."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.stats["failures"] += 1
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.failure_threshold <= 0:
+                return
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.stats["opened"] += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def latency_percentile(self, percentile: float, min_samples: int = 20) -> Optional[float]:
+        """
+        Latence (secondes) des réponses récentes réussies au percentile donné.
+
+        Args:
+            percentile: Entre 0 et 1 (0.95 pour le p95).
+            min_samples: Mesures nécessaires avant de répondre.
+
+        Returns:
+            La latence, ou None s'il n'y a pas encore assez de mesures.
+        """
+        with self._lock:
+            if len(self._latencies) < min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percentile))]
+
+    def reset(self):
+        """Referme le circuit (tests, reprise manuelle)."""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+            self._latencies.clear()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["state"] = self.state
+            stats["consecutive_failures"] = self.failures
+        stats["p95_ms"] = round((self.latency_percentile(0.95, min_samples=1) or 0.0) * 1000, 1)
+        return stats
+
+
+quiz_breaker = CircuitBreaker()
@@ -0,0 +1,230 @@
+import json
+import os
+import threading
+from typing import Optional, Dict, List, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: no lock, one process per journal directory is up to the deployment
+    fcntl = None
+
+from app.game.Game import Game
+
+
+class _Log:
+    __slots__ = ("file", "lock", "since_snapshot")
+
+    def __init__(self, file):
+        self.file = file
+        self.lock = threading.Lock()
+        self.since_snapshot = 0
+
+
+class EventJournal:
+    """Journal append-only des mutations de chaque partie, avec instantanés périodiques.
+
+    Chaque partie a deux fichiers dans le répertoire du journal :
+    `<session>.log`, une ligne JSON compacte par mutation (arrivée, exclusion,
+    configuration, début, question servie, réponse, passage, arrêt...), et
+    `<session>.snap`, le dernier instantané (to_snapshot, joueurs et paquet)
+    avec la position du journal qu'il couvre. Les événements portent leur heure et leurs tirages
+    aléatoires : les rejouer après l'instantané reconstruit exactement la
+    partie. Un instantané tous les `snapshot_every` événements borne le
+    temps de reprise ; le journal, lui, garde tout l'historique de la partie.
+    """
+
+    LOG_SUFFIX = ".log"
+    SNAPSHOT_SUFFIX = ".snap"
+    LOCK_FILE = ".lock"
+
+    def __init__(self, path: str, snapshot_every: int = 200, fsync: bool = False):
+        """
+        Ouvre (ou crée) le répertoire du journal.
+
+        Args:
+            path: Répertoire des journaux et instantanés.
+            snapshot_every: Événements entre deux instantanés d'une partie.
+            fsync: Force l'écriture sur disque à chaque événement (plus lent, survit à une coupure de courant).
+
+        Raises:
+            BlockingIOError: Le répertoire est déjà ouvert par un autre journal (autre processus).
+        """
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        os.makedirs(path, exist_ok=True)
+        # Held until close(): a single journal appends to the logs of a directory
+        self._lock_file = open(os.path.join(path, self.LOCK_FILE), "a")
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self._lock_file.close()
+                raise
+        self._lock = threading.Lock()
+        self._logs: Dict[str, _Log] = {}
+        self.stats = {
+            "events": 0,
+            "snapshots": 0,
+            "replayed_sessions": 0,
+            "replayed_events": 0,
+            "errors": 0,
+        }
+
+    def _file(self, session_id: str, suffix: str) -> str:
+        return os.path.join(self.path, session_id + suffix)
+
+    @staticmethod
+    def _dumps(data) -> bytes:
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n"
+
+    def _count(self, key: str, value: int = 1):
+        with self._lock:
+            self.stats[key] += value
+
+    def attach(self, session, snapshot: bool = True):
+        """
+        Journalise désormais les mutations de la partie de la session.
+
+        Args:
+            session: Session dont la partie est journalisée.
+            snapshot: Écrit d'abord un instantané de l'état courant (nouvelle session).
+        """
+        session_id = session.id_session
+        log = _Log(open(self._file(session_id, self.LOG_SUFFIX), "ab"))
+        with self._lock:
+            previous = self._logs.pop(session_id, None)
+            self._logs[session_id] = log
+        if previous:
+            previous.file.close()
+        # The session is not registered yet: no mutation can run meanwhile
+        if snapshot:
+            self._snapshot(session, log)
+        session.game.journal = lambda event: self._append(session, log, event)
+
+    def _append(self, session, log: _Log, event: Dict):
+        # Called under the game lock: events of one game are written in order
+        try:
+            with log.lock:
+                log.file.write(self._dumps(event))
+                log.file.flush()
+                if self.fsync:
+                    os.fsync(log.file.fileno())
+                log.since_snapshot += 1
+            self._count("events")
+            if log.since_snapshot >= self.snapshot_every:
+                self._snapshot(session, log)
+        except (OSError, ValueError) as e:
+            # Never fail a game because of its journal (closed on deletion, disk full...)
+            self._count("errors")
+            print(f"Erreur lors de l'écriture du journal de la session {session.id_session}: {e}")
+
+    def _snapshot(self, session, log: _Log):
+        game = session.game
+        with log.lock:
+            offset = log.file.tell()
+            log.since_snapshot = 0
+        snapshot = {
+            "offset": offset,
+            "created_at": session.created_at,
+            "header": game.to_snapshot(),
+            "players": [game.player_snapshot(p) for p in game.players],
+            "deck": game.deck_snapshot(),
+        }
+        # Written aside then renamed: a crash never leaves a half-written snapshot
+        path = self._file(session.id_session, self.SNAPSHOT_SUFFIX)
+        with open(path + ".tmp", "wb") as f:
+            f.write(self._dumps(snapshot))
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+        self._count("snapshots")
+
+    def session_ids(self) -> List[Tuple[str, float]]:
+        """(session, dernière écriture) des parties journalisées, de la moins à la plus récemment active."""
+        sessions = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(self.SNAPSHOT_SUFFIX):
+                session_id = entry.name[:-len(self.SNAPSHOT_SUFFIX)]
+                log = self._file(session_id, self.LOG_SUFFIX)
+                mtime = os.path.getmtime(log) if os.path.exists(log) else entry.stat().st_mtime
+                sessions.append((session_id, mtime))
+        sessions.sort(key=lambda s: s[1])
+        return sessions
+
+    def exists(self, session_id: str) -> bool:
+        return os.path.exists(self._file(session_id, self.SNAPSHOT_SUFFIX))
+
+    def replay(self, session_id: str, game: Game) -> Optional[Tuple[float, int]]:
+        """
+        Reconstruit une partie : dernier instantané, puis les événements écrits après.
+
+        Args:
+            session_id: Identifiant de la session.
+            game: Partie neuve à remplir (sa QuizEngine n'est pas sollicitée).
+
+        Returns:
+            Tuple (date de création, événements rejoués), ou None si la session n'est pas journalisée.
+        """
+        try:
+            with open(self._file(session_id, self.SNAPSHOT_SUFFIX), "rb") as f:
+                snapshot = json.loads(f.read())
+        except FileNotFoundError:
+            return None
+        game.restore_snapshot(snapshot["header"], snapshot["players"], snapshot["deck"])
+
+        replayed = 0
+        log_path = self._file(session_id, self.LOG_SUFFIX)
+        if os.path.exists(log_path):
+            with open(log_path, "r+b") as f:
+                f.seek(snapshot["offset"])
+                good = snapshot["offset"]
+                for line in f:
+                    try:
+                        event = json.loads(line) if line.endswith(b"\n") else None
+                    except ValueError:
+                        event = None
+                    if event is None:
+                        # Last line cut by a crash: drop it so that new events follow a complete line
+                        f.truncate(good)
+                        break
+                    game.replay_event(event)
+                    good += len(line)
+                    replayed += 1
+        self._count("replayed_sessions")
+        self._count("replayed_events", replayed)
+        return snapshot["created_at"], replayed
+
+    def detach(self, session_id: str):
+        """Arrête de journaliser la session (les fichiers restent)."""
+        with self._lock:
+            log = self._logs.pop(session_id, None)
+        if log:
+            with log.lock:
+                log.file.close()
+
+    def delete(self, session_id: str):
+        """Supprime le journal et l'instantané d'une session."""
+        self.detach(session_id)
+        for suffix in (self.LOG_SUFFIX, self.SNAPSHOT_SUFFIX):
+            try:
+                os.remove(self._file(session_id, suffix))
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        with self._lock:
+            logs = list(self._logs.values())
+            self._logs.clear()
+        for log in logs:
+            with log.lock:
+                log.file.close()
+        # Closing the file releases the directory lock
+        self._lock_file.close()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["open"] = len(self._logs)
+        return stats
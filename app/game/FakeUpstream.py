@@ -0,0 +1,98 @@
+import itertools
+import random
+import threading
+import time
+from typing import Optional, Dict
+import httpx
+
+
+class FakeUpstream:
+    """Fausse API de quiz en mémoire, pour tester hors-ligne la tolérance aux pannes.
+
+    Branchée sur un client httpx via MockTransport, elle répond au même
+    format que l'API réelle ({"quizzes": [...]}) avec des questions uniques.
+    Latence, erreurs et délais dépassés sont injectables et modifiables à
+    chaud (attributs publics), par exemple pour simuler une panne puis un
+    rétablissement.
+    """
+
+    def __init__(self, latency: float = 0.0, slow_rate: float = 0.0, slow_latency: float = 1.0,
+                 error_rate: float = 0.0, error_status: int = 503, seed: Optional[int] = None):
+        """
+        Initialise la fausse API.
+
+        Args:
+            latency: Latence de base de chaque réponse (secondes).
+            slow_rate: Proportion de réponses lentes (latence de queue).
+            slow_latency: Latence d'une réponse lente (secondes).
+            error_rate: Proportion de réponses en erreur.
+            error_status: Code HTTP des réponses en erreur.
+            seed: Graine du tirage aléatoire, pour des scénarios reproductibles.
+        """
+        self.latency = latency
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.down = False
+        # Raised as is by every request (an error the client does not expect), None: off
+        self.fail_with: Optional[BaseException] = None
+        self._random = random.Random(seed)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "timeouts": 0,
+            "slow": 0,
+        }
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        """Répond à une requête GET /quiz comme l'API réelle."""
+        if self.fail_with is not None:
+            raise self.fail_with
+        with self._lock:
+            self.stats["requests"] += 1
+            slow = self._random.random() < self.slow_rate
+            failed = self.down or self._random.random() < self.error_rate
+            if slow:
+                self.stats["slow"] += 1
+
+        delay = self.slow_latency if slow else self.latency
+        # MockTransport ignores timeouts: honour the request's read timeout here
+        read_timeout = request.extensions.get("timeout", {}).get("read")
+        if read_timeout is not None and delay > read_timeout:
+            time.sleep(read_timeout)
+            with self._lock:
+                self.stats["timeouts"] += 1
+            raise httpx.ReadTimeout("Fausse API : délai dépassé", request=request)
+        if delay:
+            time.sleep(delay)
+
+        if failed:
+            with self._lock:
+                self.stats["errors"] += 1
+            return httpx.Response(self.error_status, json={"error": "Fausse API : erreur injectée"})
+
+        limit = int(request.url.params.get("limit", 10))
+        difficulty = request.url.params.get("difficulty", "normal")
+        category = request.url.params.get("category", "culture_generale")
+        quizzes = []
+        for _ in range(limit):
+            n = next(self._counter)
+            quizzes.append({
+                "question": f"Question {n} ({category}, {difficulty}) ?",
+                "answer": f"Réponse {n}",
+                "badAnswers": [f"Faux {n}a", f"Faux {n}b", f"Faux {n}c"],
+                "difficulty": difficulty,
+                "category": category,
+            })
+        return httpx.Response(200, json={"quizzes": quizzes})
+
+    def client(self, timeout: float = 10.0) -> httpx.Client:
+        """Client httpx servi par cette fausse API (à passer à QuizEngine(client=...))."""
+        return httpx.Client(transport=httpx.MockTransport(self.handler), timeout=timeout)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats)
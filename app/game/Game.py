@@ -1,57 +1,312 @@
-from typing import List, Optional, Dict
-from app.game.Player import Player
+from typing import List, Optional, Dict, Tuple
+from app.game.Player import Player, Avatar
+from app.game.Leaderboard import Leaderboard
 from app.game.QuizEngine import QuizEngine, Quest
+from app.game.QuestionStore import question_hash
+from app.game.Metrics import metrics
+import bisect
+import functools
+import json
 import random
+import threading
+import time
+
+
+def synchronized(method):
+    """Runs a Game method while holding that game's lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def journaled(kind: str):
+    """Records a Game mutation as one `kind` event in the game's journal (outermost call only).
+
+    Goes under @synchronized. Nested journaled calls (timeout_turn ->
+    submit_answer) and replays are part of the current event. The
+    `prepared` keyword (see prepare_start, prepare_turn) carries outcomes
+    computed before taking the lock: _effect uses them instead of producing
+    its own, and records them like any other.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, prepared: Optional[Dict] = None, **kwargs):
+            if self._event is not None:
+                return method(self, *args, **kwargs)
+            before = self.state_version
+            event = {"e": kind, "t": time.time(), "a": list(args)}
+            if kwargs:
+                event["k"] = kwargs
+            self._event = event
+            self._prepared = prepared or {}
+            try:
+                result = method(self, *args, **kwargs)
+            finally:
+                self._event = None
+                self._prepared = {}
+            # Calls that changed nothing (refused answer, stale turn) are not recorded
+            if self.journal is not None and self.state_version != before:
+                event["v"] = self.state_version
+                self.journal(event)
+            return result
+        return wrapper
+    return decorator
+
+
+def _dump_question(question: Optional[Quest]) -> Optional[Dict]:
+    return question.to_dict() if question else None
+
+
+def _load_question(data: Optional[Dict]) -> Optional[Quest]:
+    return Quest.from_dict(data) if data else None
+
 
 class Game:
+    # Maps ratio keys to the difficulty labels used by the quiz API
+    DIFFICULTY_LEVELS = {"easy": "facile", "normal": "normal", "hard": "difficile"}
+    # A turn slower than this had to wait on the network
+    SLOW_TURN_MS = 50
+    # "turns": one player answers per question; "buzzer": everyone answers the same question
+    MODES = ("turns", "buzzer")
+    # Buzzer mode: extra share of the points for an instant answer, decreasing to 0 at the time limit
+    SPEED_BONUS = 0.5
+    # Buzzer mode: waiting clients are woken by an answer at most this often (seconds); scoring always wakes them
+    ANSWER_NOTIFY_INTERVAL = 0.5
+    # Seconds of FEEDBACK before auto_advance moves on
+    AUTO_ADVANCE_DELAY = 3
+    # Draws from the buffer before accepting a repeat, once the deck is used up
+    FALLBACK_ATTEMPTS = 3
+    # Turns skipped in a row for lack of a question before the game waits for questions instead
+    MAX_SKIPPED_TURNS = 2
+    # Journal event kind -> mutation replayed by replay_event
+    JOURNALED = {
+        "join": "add_player",
+        "avatar": "reroll_avatar",
+        "kick": "kick_player",
+        "config": "set_config",
+        "start": "start_game",
+        "answer": "submit_answer",
+        "timeout": "timeout_turn",
+        "continue": "continue_game",
+        "pause": "set_paused",
+        "stop": "stop_game",
+        "reset": "reset_game",
+    }
+
     def __init__(self, quiz: QuizEngine):
+        # Turn order; the dicts index the same Player objects for O(1) lookups
         self.players: List[Player] = []
+        self._players_by_name: Dict[str, Player] = {}
+        self._players_by_id: Dict[int, Player] = {}
+        # Ids of self.players, same order: ids are handed out in join order, so this stays sorted
+        self._player_ids: List[int] = []
+        self._next_player_id = 1
+        # Ranked view of the same players, updated only when a score changes
+        self.leaderboard = Leaderboard()
         self.quiz: QuizEngine = quiz
         self.current_question: Optional[Quest] = None
+        # Every question of the game, drawn at start; turns advance the cursor
+        self.deck: List[Quest] = []
+        self.deck_cursor = 0
+        # state_version when the deck was drawn: with its size, tells stores whether to rewrite it
+        self.deck_version = 0
+        self._deck_hashes: set = set()
+        self.deck_stats = {"planned": 0, "built": 0, "build_ms": 0.0, "fallbacks": 0}
         self.status = "LOBBY" # LOBBY, PLAYING, FEEDBACK, FINISHED
         self.current_round = 0
         self.max_rounds = 0
         self.time_limit = 30
         self.difficulty_ratios = {"easy": 10, "normal": 80, "hard": 10}
         self.auto_advance = False
+        self.mode = "turns"
+        # Buzzer mode: answers to the current question, name -> (answer, time.time())
+        self.buzzer_answers: Dict[str, Tuple[str, float]] = {}
+        self.turn_started_at = 0.0
+        # time.time() at which the TurnScheduler times out the turn (PLAYING) or advances (FEEDBACK)
+        self.deadline: Optional[float] = None
+        self.paused = False
         self.min_players = 2
         self.max_players = 100
         self.current_player_index = 0
         self.waiting_for_answer = False
         self.last_answer_result: Optional[Dict] = None
+        # Identifies the current turn so stale timeout/continue requests are ignored
+        self.turn_id = 0
+        self.turn_stats = {"turns": 0, "total_ms": 0.0, "max_ms": 0.0, "slow_turns": 0, "skipped": 0}
+        # No question for MAX_SKIPPED_TURNS turns in a row: FEEDBACK until continue_game finds one
+        self.skipped_in_a_row = 0
+        self.waiting_for_questions = False
+        # One re-entrant lock per game: sessions never contend with each other
+        self._lock = threading.RLock()
+        # Bumped on every state change; push clients wait on the condition
+        self.state_version = 0
+        self._state_changed = threading.Condition(self._lock)
+        # Random per instance so ETags and blind-mode seeds never collide across games or restarts
+        self.state_epoch = random.getrandbits(32)
+        self._state_json_cache: Optional[Tuple[int, bytes]] = None
+        # Players changed/removed since the last persisted save (see SessionStore)
+        self._dirty_players: set = set()
+        self._removed_players: set = set()
+        # Buzzer answers given since the last save, and whether anything else changed (the header)
+        self._new_answers: List[str] = []
+        self._header_changed = False
+        # time.monotonic() before which a buzzer answer bumps the version without waking clients
+        self._answers_quiet_until = 0.0
+        # Called with every mutation event, under the game lock (see EventJournal); None: not journaled
+        self.journal = None
+        # Event of the mutation in progress, and whether it is being replayed
+        self._event: Optional[Dict] = None
+        self._replaying = False
+        # Outcomes of the mutation in progress fetched before taking the lock, by _effect key
+        self._prepared: Dict = {}
+
+    def _now(self) -> float:
+        """Current time, frozen to the event time during a journaled mutation so that replays match."""
+        return self._event["t"] if self._event is not None else time.time()
+
+    def _effect(self, key: str, produce, dump=None, load=None):
+        """
+        Non-deterministic outcome of the current mutation (random draw, network):
+        produced and recorded in the event live, read back from it on replay.
+
+        Args:
+            key: Name of the outcome in the event.
+            produce: Computes the outcome live.
+            dump: Converts it to JSON-compatible data for the event.
+            load: Converts it back on replay.
+        """
+        event = self._event
+        if self._replaying:
+            value = event["x"][key]
+            return load(value) if load else value
+        value = self._prepared.pop(key) if key in self._prepared else produce()
+        if event is not None and self.journal is not None:
+            event.setdefault("x", {})[key] = dump(value) if dump else value
+        return value
+
+    @synchronized
+    def replay_event(self, event: Dict):
+        """Re-applies a journaled mutation, with its recorded time and outcomes (no network, no randomness)."""
+        method = getattr(self, self.JOURNALED[event["e"]])
+        self._event = event
+        self._replaying = True
+        try:
+            method(*event.get("a", ()), **event.get("k", {}))
+        finally:
+            self._event = None
+            self._replaying = False
+
+    def _mark_changed(self):
+        """Bumps the state version and wakes up clients waiting for a change."""
+        with self._state_changed:
+            self.state_version += 1
+            self._header_changed = True
+            self._state_changed.notify_all()
+
+    def _mark_answered(self, player_name: str):
+        """
+        Bumps the state version for a buzzer answer, which only changes answers_count.
+
+        Waiting clients are woken at most every ANSWER_NOTIFY_INTERVAL: a burst of
+        answers wakes each stream once, and the answers after it show up with the
+        next wake-up (scoring at the latest). Polling clients see every answer.
+        """
+        with self._state_changed:
+            self.state_version += 1
+            self._new_answers.append(player_name)
+            now = time.monotonic()
+            if now >= self._answers_quiet_until:
+                self._answers_quiet_until = now + self.ANSWER_NOTIFY_INTERVAL
+                self._state_changed.notify_all()
+
+    def wait_for_change(self, since_version: int, timeout: Optional[float] = None) -> int:
+        """Blocks until the state version differs from since_version (or timeout). Returns the current version."""
+        with self._state_changed:
+            self._state_changed.wait_for(lambda: self.state_version != since_version, timeout)
+            return self.state_version
+
+    def get_player(self, name: str) -> Optional[Player]:
+        return self._players_by_name.get(name)
+
+    def get_player_by_id(self, player_id: int) -> Optional[Player]:
+        return self._players_by_id.get(player_id)
 
+    def _index_player(self, player: Player):
+        self.players.append(player)
+        self._player_ids.append(player.id)
+        self._players_by_name[player.name] = player
+        self._players_by_id[player.id] = player
+        self.leaderboard.add(player)
+        self._next_player_id = max(self._next_player_id, player.id + 1)
+
+    def _clear_players(self):
+        self.players = []
+        self._player_ids = []
+        self._players_by_name.clear()
+        self._players_by_id.clear()
+        self.leaderboard.clear()
+
+    @synchronized
+    @journaled("join")
     def add_player(self, name: str) -> Optional[Player]:
         # Check if player already exists
-        for p in self.players:
-            if p.name == name:
-                return p
+        existing = self._players_by_name.get(name)
+        if existing:
+            return existing
         
         if len(self.players) >= self.max_players:
             return None # Game full
         
-        new_player = Player(name)
-        new_player.avatar.regenerate_avatar() # Random avatar on join
-        self.players.append(new_player)
+        new_player = Player(name, id=self._next_player_id)
+        new_player.avatar.seed = self._effect("seed", Avatar.random_seed) # Random avatar on join
+        self._index_player(new_player)
+        self._dirty_players.add(name)
+        self._removed_players.discard(name)
+        self._mark_changed()
         return new_player
 
+    @synchronized
+    @journaled("avatar")
     def reroll_avatar(self, player_name: str) -> bool:
-        for p in self.players:
-            if p.name == player_name:
-                p.avatar.regenerate_avatar()
-                return True
-        return False
+        player = self._players_by_name.get(player_name)
+        if not player:
+            return False
+        player.avatar.seed = self._effect("seed", Avatar.random_seed)
+        self._dirty_players.add(player_name)
+        self._mark_changed()
+        return True
 
+    @synchronized
+    @journaled("kick")
     def kick_player(self, player_name: str) -> bool:
         """Remove a player from the game"""
-        for i, p in enumerate(self.players):
-            if p.name == player_name:
-                self.players.pop(i)
-                # Adjust current player index if needed
-                if self.current_player_index >= len(self.players) and len(self.players) > 0:
-                    self.current_player_index = 0
-                return True
-        return False
+        player = self._players_by_name.pop(player_name, None)
+        if not player:
+            return False
+        del self._players_by_id[player.id]
+        self.leaderboard.remove(player)
+        self.buzzer_answers.pop(player_name, None)
+        # Turn order is id order: bisect instead of scanning the list
+        index = bisect.bisect_left(self._player_ids, player.id)
+        del self._player_ids[index]
+        del self.players[index]
+        self._dirty_players.discard(player_name)
+        self._removed_players.add(player_name)
+        # Keep pointing at the same player when someone earlier in the order leaves
+        if index < self.current_player_index:
+            self.current_player_index -= 1
+        elif self.current_player_index >= len(self.players) and len(self.players) > 0:
+            self.current_player_index = 0
+        if self._all_answered():
+            # The last player still expected was the one kicked
+            self._score_buzzer_turn()
+        self._mark_changed()
+        return True
 
+    @synchronized
+    @journaled("config")
     def set_config(self, config: Dict):
         """Sets configuration before game start"""
         self.min_players = config.get('min_players', 2)
@@ -59,16 +314,26 @@ class Game:
         self.time_limit = config.get('time_limit', 30)
         self.difficulty_ratios = config.get('difficulty_ratios', {"easy": 10, "normal": 80, "hard": 10})
         self.auto_advance = config.get('auto_advance', False)
+        mode = config.get('mode', 'turns')
+        self.mode = mode if mode in self.MODES else "turns"
         
         # Store categories and pass to QuizEngine
         self.categories = config.get('categories', [])
         if self.categories and self.quiz:
             self.quiz.set_categories(self.categories)
         
+        # Warm up the question buffer while players join the lobby
+        if self.quiz and not self._replaying:
+            self.quiz.prefetch(self.get_active_difficulties())
+        
         # Store round config
         self._config_min_rounds = config.get('min_rounds', 5)
         self._config_max_rounds = config.get('max_rounds', 10)
+        self._mark_changed()
 
+    @metrics.timed("game_transition_seconds", transition="start")
+    @synchronized
+    @journaled("start")
     def start_game(self, min_rounds: int, max_rounds: int, *args, **kwargs):
         if self.status == "PLAYING":
             return False
@@ -76,15 +341,8 @@ class Game:
         if len(self.players) < self.min_players:
             return False
         
-        # Use stored config if args are 0 (which meant "use default/stored")
-        if min_rounds == 0 and max_rounds == 0:
-             effective_min = getattr(self, '_config_min_rounds', 5)
-             effective_max = getattr(self, '_config_max_rounds', 10)
-        else:
-             effective_min = min_rounds
-             effective_max = max_rounds
-        
-        self.max_rounds = random.randint(effective_min, effective_max)
+        effective_min, effective_max = self._round_range(min_rounds, max_rounds)
+        self.max_rounds = self._effect("max_rounds", lambda: random.randint(effective_min, effective_max))
         
         # Override config if passed via kwargs (unlikely now but safe to keep)
         if 'time_limit' in kwargs: self.time_limit = kwargs['time_limit']
@@ -96,11 +354,72 @@ class Game:
         self.current_player_index = 0
         self.waiting_for_answer = False
         self.last_answer_result = None
+        self.skipped_in_a_row = 0
+        self.waiting_for_questions = False
+        
+        # Draw the whole game's questions now; the buffer only serves late joiners
+        self._build_deck()
+        if not self._replaying:
+            self.quiz.prefetch(self.get_active_difficulties())
         
         # Start first turn
         self.next_turn()
+        self._mark_changed()
         return True
 
+    def _round_range(self, min_rounds: int, max_rounds: int) -> Tuple[int, int]:
+        # Use stored config if args are 0 (which meant "use default/stored")
+        if min_rounds == 0 and max_rounds == 0:
+            return getattr(self, '_config_min_rounds', 5), getattr(self, '_config_max_rounds', 10)
+        return min_rounds, max_rounds
+
+    def _deck_size(self) -> int:
+        # Buzzer mode asks one question per round, turns mode one per player per round
+        return self.max_rounds * (1 if self.mode == "buzzer" else len(self.players))
+
+    def prepare_start(self, min_rounds: int, max_rounds: int) -> Optional[Dict]:
+        """
+        Draws the rounds and the deck of start_game without holding the game lock
+        (the deck may need network requests); pass the result as start_game(..., prepared=...).
+
+        Returns:
+            Outcomes for start_game, or None if the game cannot start now.
+        """
+        with self._lock:
+            if self.status == "PLAYING" or len(self.players) < self.min_players or not self.quiz:
+                return None
+            effective_min, effective_max = self._round_range(min_rounds, max_rounds)
+            rounds = random.randint(effective_min, effective_max)
+            total = rounds * (1 if self.mode == "buzzer" else len(self.players))
+            counts = self.plan_deck(total)
+        started = time.perf_counter()
+        deck = self.quiz.build_deck(counts)
+        prepared = {"max_rounds": rounds, "deck": deck, "build_ms": (time.perf_counter() - started) * 1000}
+        if not deck:
+            # Upstream down: skip the first turn rather than retry it under the lock
+            prepared["question"] = None
+        return prepared
+
+    def prepare_turn(self) -> Optional[Dict]:
+        """
+        Fetches without holding the game lock the question continue_game needs once
+        the deck is used up; pass the result as continue_game(..., prepared=...).
+
+        Returns:
+            Outcomes for continue_game, or None if the next turn comes from the deck (or there is none).
+        """
+        with self._lock:
+            if self.status != "FEEDBACK" or self.deck_cursor < len(self.deck) or not self.quiz:
+                return None
+            last_turn = self.mode == "buzzer" or self.current_player_index + 1 >= len(self.players)
+            if last_turn and self.current_round >= self.max_rounds and not self.waiting_for_questions:
+                return None
+            difficulty = self._fallback_difficulty()
+            avoid = set(self._deck_hashes)
+        return {"question": self._fetch_fallback(difficulty, avoid)}
+
+    @metrics.timed("game_transition_seconds", transition="next_turn")
+    @synchronized
     def next_turn(self):
         if self.status == "FINISHED":
             return
@@ -109,6 +428,103 @@ class Game:
         if not player:
             return
 
+        # Next question of the deck (or a fresh one if the deck ran out)
+        started = time.perf_counter()
+        self.current_question = self._draw_question()
+        self._record_turn_latency((time.perf_counter() - started) * 1000)
+        self.waiting_for_answer = True
+        self.status = "PLAYING"
+        self.turn_id += 1
+        self.buzzer_answers = {}
+        self.turn_started_at = self._now()
+        self.deadline = self.turn_started_at + self.time_limit if self.time_limit else None
+        if self.current_question is None:
+            # Nothing to ask (upstream down, no stale question left): skip a turn or two, then hold the game
+            self._skip_turn(waiting=self.skipped_in_a_row >= self.MAX_SKIPPED_TURNS)
+            return
+        self.skipped_in_a_row = 0
+        self.waiting_for_questions = False
+        self._mark_changed()
+
+    def _skip_turn(self, waiting: bool = False) -> Dict:
+        """
+        Ends a turn that has no question, without scoring.
+
+        Args:
+            waiting: Hold the game on this turn (continue_game retries it) instead of moving on.
+        """
+        result = {
+            "valid": True,
+            "skipped": True,
+            "waiting_for_questions": waiting,
+            "correct": False,
+            "correct_answer": None,
+            "points": 0,
+            "turn_id": self.turn_id,
+        }
+        if self.mode == "buzzer":
+            result.update(mode="buzzer", correct_count=0, answers_count=0, fastest=None, results=[])
+        else:
+            player = self.get_current_player()
+            result.update(player_name=player.name, player_score=player.score)
+        if waiting:
+            self.waiting_for_questions = True
+        else:
+            self.turn_stats["skipped"] += 1
+            self.skipped_in_a_row += 1
+        self.last_answer_result = result
+        self.status = "FEEDBACK"
+        self.waiting_for_answer = False
+        self._set_feedback_deadline()
+        self._mark_changed()
+        return result
+
+    def plan_deck(self, total: int) -> Dict[str, int]:
+        """Splits `total` questions across difficulties following difficulty_ratios (largest remainder)."""
+        weights = {level: max(0, self.difficulty_ratios.get(key, 0)) for key, level in self.DIFFICULTY_LEVELS.items()}
+        if sum(weights.values()) == 0:
+            weights = {level: 1 for level in weights}
+        weight_sum = sum(weights.values())
+        exact = {level: total * weight / weight_sum for level, weight in weights.items()}
+        counts = {level: int(share) for level, share in exact.items()}
+        leftover = total - sum(counts.values())
+        for level in sorted(exact, key=lambda lv: exact[lv] - counts[lv], reverse=True)[:leftover]:
+            counts[level] += 1
+        return counts
+
+    def _build_deck(self):
+        total = self._deck_size()
+        started = time.perf_counter()
+        build_ms = self._prepared.get("build_ms")
+        self.deck = self._effect("deck", lambda: self.quiz.build_deck(self.plan_deck(total)) if self.quiz else [],
+                                 lambda deck: [q.to_dict() for q in deck],
+                                 lambda deck: [Quest.from_dict(q) for q in deck])
+        self.deck_cursor = 0
+        self.deck_version = self.state_version
+        self._deck_hashes = {question_hash(q.question) for q in self.deck}
+        self.deck_stats = {
+            "planned": total,
+            "built": len(self.deck),
+            "build_ms": build_ms if build_ms is not None else (time.perf_counter() - started) * 1000,
+            "fallbacks": 0,
+        }
+
+    def _draw_question(self) -> Optional[Quest]:
+        if self.deck_cursor < len(self.deck):
+            question = self.deck[self.deck_cursor]
+        else:
+            self.deck_stats["fallbacks"] += 1
+            question = self._effect("question",
+                                    lambda: self._fetch_fallback(self._fallback_difficulty(), self._deck_hashes),
+                                    _dump_question, _load_question)
+            if question is None:
+                return None
+            self._deck_hashes.add(question_hash(question.question))
+            self.deck.append(question)
+        self.deck_cursor += 1
+        return question
+
+    def _fallback_difficulty(self) -> str:
         # Select difficulty based on ratios
         difficulties = ["facile", "normal", "difficile"]
         weights = [
@@ -120,16 +536,51 @@ class Game:
         if sum(weights) == 0:
             weights = [33, 33, 33]
             
-        selected_diff = random.choices(difficulties, weights=weights, k=1)[0]
+        return random.choices(difficulties, weights=weights, k=1)[0]
 
-        # Generate a new question for this player
-        self.current_question = self.quiz.generate_question(difficulty=selected_diff)
-        self.waiting_for_answer = True
-        self.status = "PLAYING"
+    def _fetch_fallback(self, difficulty: str, avoid: set) -> Optional[Quest]:
+        """One question from the buffer (may hit the network), avoiding the `avoid` hashes when possible."""
+        question = None
+        for _ in range(self.FALLBACK_ATTEMPTS):
+            question = self.quiz.generate_question(difficulty=difficulty)
+            if question is None or question_hash(question.question) not in avoid:
+                break
+        return question
+
+    def get_active_difficulties(self) -> List[str]:
+        """Returns the API difficulty labels that have a non-zero ratio."""
+        active = [
+            level for key, level in self.DIFFICULTY_LEVELS.items()
+            if self.difficulty_ratios.get(key, 0) > 0
+        ]
+        return active or list(self.DIFFICULTY_LEVELS.values())
 
+    def _record_turn_latency(self, elapsed_ms: float):
+        self.turn_stats["turns"] += 1
+        self.turn_stats["total_ms"] += elapsed_ms
+        self.turn_stats["max_ms"] = max(self.turn_stats["max_ms"], elapsed_ms)
+        if elapsed_ms > self.SLOW_TURN_MS:
+            self.turn_stats["slow_turns"] += 1
+
+    def get_turn_stats(self) -> Dict:
+        """Turn latency counters plus the question buffer and deck counters."""
+        turns = self.turn_stats["turns"]
+        stats = dict(self.turn_stats)
+        stats["avg_ms"] = self.turn_stats["total_ms"] / turns if turns else 0.0
+        stats["buffer"] = self.quiz.buffer.get_stats() if self.quiz else None
+        stats["deck"] = dict(self.deck_stats, cursor=self.deck_cursor, size=len(self.deck))
+        stats["upstream"] = self.quiz.get_fetch_stats() if self.quiz else None
+        return stats
+
+    @metrics.timed("game_transition_seconds", transition="answer")
+    @synchronized
+    @journaled("answer")
     def submit_answer(self, player_name: str, answer: str) -> Dict:
         if self.status != "PLAYING":
             return {"valid": False, "message": "Game not active or in review"}
+
+        if self.mode == "buzzer":
+            return self._record_buzzer_answer(player_name, answer)
         
         current_player = self.get_current_player()
         if not current_player:
@@ -141,19 +592,15 @@ class Game:
         if not self.current_question:
              return {"valid": False, "message": "No active question"}
 
-        # Convert letter answer (A, B, C, D) to actual option text
-        actual_answer = answer
-        letter_map = {'A': 0, 'B': 1, 'C': 2, 'D': 3}
-        if answer in letter_map and self.current_question.options:
-            idx = letter_map[answer]
-            if idx < len(self.current_question.options):
-                actual_answer = self.current_question.options[idx]
-        
-        is_correct = actual_answer == self.current_question.answer
+        is_correct = self._is_correct(answer)
+        if answer != "__TIMEOUT__":
+            self._record_answer(is_correct, self._now() - self.turn_started_at)
         points = 0
         if is_correct:
             points = self.current_question.multiplier * 10
             current_player.score += points
+            self.leaderboard.update(current_player)
+            self._dirty_players.add(current_player.name)
         
         result = {
             "valid": True,
@@ -161,27 +608,185 @@ class Game:
             "correct_answer": self.current_question.answer,
             "points": points,
             "player_score": current_player.score,
-            "player_name": current_player.name
+            "player_name": current_player.name,
+            "turn_id": self.turn_id
         }
         
         self.last_answer_result = result
         self.status = "FEEDBACK" # Pause for feedback
         self.waiting_for_answer = False
+        self._set_feedback_deadline()
+        self._mark_changed()
             
         return result
 
-    def continue_game(self):
+    def _record_answer(self, correct: bool, elapsed: float):
+        """Feeds the answer log that calibrates question difficulty (replayed answers were already counted)."""
+        if self._replaying or not self.quiz:
+            return
+        question = self.current_question
+        self.quiz.answers.record(question_hash(question.question), correct, elapsed * 1000, question.category)
+
+    def _is_correct(self, answer: str) -> bool:
+        # Convert letter answer (A, B, C, D) to actual option text
+        actual_answer = answer
+        letter_map = {'A': 0, 'B': 1, 'C': 2, 'D': 3}
+        if answer in letter_map and self.current_question.options:
+            idx = letter_map[answer]
+            if idx < len(self.current_question.options):
+                actual_answer = self.current_question.options[idx]
+        return actual_answer == self.current_question.answer
+
+    def _record_buzzer_answer(self, player_name: str, answer: str) -> Dict:
+        """Buzzer mode intake: only stores the answer and its time; scoring happens once per question."""
+        if player_name not in self._players_by_name:
+            return {"valid": False, "message": "Unknown player"}
+        if not self.current_question:
+            return {"valid": False, "message": "No active question"}
+        if player_name in self.buzzer_answers:
+            return {"valid": False, "message": "Already answered"}
+
+        self.buzzer_answers[player_name] = (answer, self._now())
+        result = {
+            "valid": True,
+            "accepted": True,
+            "player_name": player_name,
+            "turn_id": self.turn_id,
+            "answers_count": len(self.buzzer_answers),
+        }
+        if self._all_answered():
+            self._score_buzzer_turn()
+        else:
+            self._mark_answered(player_name)
+        return result
+
+    def _all_answered(self) -> bool:
+        return (self.mode == "buzzer" and self.status == "PLAYING" and bool(self.players)
+                and len(self.buzzer_answers) >= len(self.players))
+
+    def _score_buzzer_turn(self) -> Dict:
+        """Single scoring pass over every answer to the current question, then FEEDBACK."""
+        base_points = self.current_question.multiplier * 10
+        results = []
+        for name, (answer, answered_at) in self.buzzer_answers.items():
+            player = self._players_by_name.get(name)
+            if not player:
+                continue
+            elapsed = max(0.0, answered_at - self.turn_started_at)
+            points = 0
+            is_correct = self._is_correct(answer)
+            self._record_answer(is_correct, elapsed)
+            if is_correct:
+                speed = max(0.0, 1 - elapsed / self.time_limit) if self.time_limit else 0.0
+                points = base_points + round(base_points * self.SPEED_BONUS * speed)
+                player.score += points
+                self.leaderboard.update(player)
+                self._dirty_players.add(name)
+            results.append({
+                "player_name": name,
+                "correct": is_correct,
+                "points": points,
+                "player_score": player.score,
+                "response_ms": round(elapsed * 1000),
+            })
+        results.sort(key=lambda r: r["response_ms"])
+        correct_count = sum(r["correct"] for r in results)
+
+        result = {
+            "valid": True,
+            "mode": "buzzer",
+            "correct": correct_count > 0,
+            "correct_answer": self.current_question.answer,
+            "correct_count": correct_count,
+            "answers_count": len(results),
+            "fastest": next((r["player_name"] for r in results if r["correct"]), None),
+            "results": results,
+            "turn_id": self.turn_id,
+        }
+        self.last_answer_result = result
+        self.status = "FEEDBACK"
+        self.waiting_for_answer = False
+        self._set_feedback_deadline()
+        self._mark_changed()
+        return result
+
+    def _set_feedback_deadline(self):
+        if self.auto_advance and not self.paused:
+            self.deadline = self._now() + self.AUTO_ADVANCE_DELAY
+        else:
+            self.deadline = None
+
+    @synchronized
+    def get_deadline(self) -> Optional[Tuple[float, str, int]]:
+        """(deadline, action, turn_id) the scheduler should enforce, or None."""
+        if self.deadline is None or self.status not in ("PLAYING", "FEEDBACK"):
+            return None
+        action = "timeout" if self.status == "PLAYING" else "continue"
+        return self.deadline, action, self.turn_id
+
+    @synchronized
+    def fire_deadline(self, turn_id: int, action: str, deadline: float, prepared: Optional[Dict] = None):
+        """Runs a scheduled action, unless the turn moved on, the game was paused or the deadline changed."""
+        if self.get_deadline() != (deadline, action, turn_id):
+            return False
+        if action == "timeout":
+            return self.timeout_turn(turn_id)
+        return self.continue_game(turn_id, prepared=prepared)
+
+    @synchronized
+    @journaled("pause")
+    def set_paused(self, paused: bool):
+        """Suspends (or resumes) auto_advance; resuming restarts the feedback countdown."""
+        if self.paused == paused:
+            return False
+        self.paused = paused
+        if self.status == "FEEDBACK":
+            self._set_feedback_deadline()
+        self._mark_changed()
+        return True
+
+    @metrics.timed("game_transition_seconds", transition="timeout")
+    @synchronized
+    @journaled("timeout")
+    def timeout_turn(self, turn_id: Optional[int] = None) -> Dict:
+        """Ends the current turn with a null answer, unless it was already answered or turn_id is stale."""
+        if turn_id is not None and turn_id != self.turn_id:
+            return {"valid": False, "message": "Stale turn"}
+        if self.mode == "buzzer":
+            # Time is up: score whatever answers came in
+            if self.status != "PLAYING" or not self.current_question:
+                return {"valid": False, "message": "No active turn"}
+            return self._score_buzzer_turn()
+        current_player = self.get_current_player()
+        if not current_player or self.status != "PLAYING":
+            return {"valid": False, "message": "No active turn"}
+        return self.submit_answer(current_player.name, "__TIMEOUT__")
+
+    @metrics.timed("game_transition_seconds", transition="continue")
+    @synchronized
+    @journaled("continue")
+    def continue_game(self, turn_id: Optional[int] = None):
         """Advances from FEEDBACK state to the next turn"""
         if self.status != "FEEDBACK":
             return False
+        if turn_id is not None and turn_id != self.turn_id:
+            return False
+
+        if self.waiting_for_questions:
+            # Retry the held turn: the skipped ones already moved the game on
+            self.next_turn()
+            self._mark_changed()
+            return True
 
-        next_player_index = self.current_player_index + 1
+        # Buzzer mode: one question per round, answered by everyone
+        next_player_index = len(self.players) if self.mode == "buzzer" else self.current_player_index + 1
         
         if next_player_index >= len(self.players):
              # End of round
             if self.current_round >= self.max_rounds:
                 self.status = "FINISHED"
                 self.current_question = None
+                self.deadline = None
             else:
                 self.current_round += 1
                 self.current_player_index = 0
@@ -191,6 +796,7 @@ class Game:
             self.current_player_index = next_player_index
             self.next_turn()
             
+        self._mark_changed()
         return True
 
     def get_current_player(self) -> Optional[Player]:
@@ -198,10 +804,16 @@ class Game:
             return None
         return self.players[self.current_player_index]
 
-    def get_leaderboard(self) -> List[Dict]:
-        sorted_players = sorted(self.players, key=lambda p: p.score, reverse=True)
+    def is_blind_mode(self) -> bool:
+        # Blind Mode Logic: Active if past 50% of rounds
+        return self.max_rounds > 0 and self.current_round > (self.max_rounds / 2)
+
+    @synchronized
+    def get_leaderboard(self, limit: Optional[int] = None) -> List[Dict]:
+        sorted_players = self.leaderboard.top(limit)
         return [
             {
+                "id": player.id,
                 "name": player.name,
                 "score": player.score,
                 "avatar_url": player.avatar.avatar_url
@@ -209,51 +821,294 @@ class Game:
             for player in sorted_players
         ]
 
+    @synchronized
+    def get_player_rank(self, player_name: str) -> Optional[Dict]:
+        """Rank and score of one player, masked like the leaderboard in blind mode."""
+        player = self._players_by_name.get(player_name)
+        if not player:
+            return None
+        hidden = self.is_blind_mode() and self.status != "FINISHED"
+        return {
+            "name": player.name,
+            "rank": None if hidden else self.leaderboard.rank_of(player),
+            "score": "???" if hidden else player.score,
+            "players_count": len(self.players),
+            "is_blind_mode": hidden,
+        }
+
+    @synchronized
+    def get_player_view(self, player_name: str) -> Optional[Dict]:
+        """Compact state for one player's phone: no leaderboard, no question text or answer."""
+        rank = self.get_player_rank(player_name)
+        if not rank:
+            return None
+        current_player = self._current_player_name()
+        question = self.current_question
+
+        my_result = None
+        last_result = self.last_answer_result
+        if self.status == "FEEDBACK" and last_result:
+            if last_result.get("results") is not None:
+                mine = next((r for r in last_result["results"] if r["player_name"] == player_name), None)
+                if mine:
+                    my_result = {"correct": mine["correct"], "points": mine["points"], "response_ms": mine["response_ms"]}
+            elif last_result.get("player_name") == player_name:
+                my_result = {"correct": last_result["correct"], "points": last_result["points"]}
+
+        return {
+            "version": self.state_version,
+            "status": self.status,
+            "is_finished": self.status == "FINISHED",
+            "mode": self.mode,
+            "turn_id": self.turn_id,
+            "current_round": self.current_round,
+            "max_rounds": self.max_rounds,
+            "players_count": len(self.players),
+            "max_players": self.max_players,
+            "current_player": current_player,
+            "is_my_turn": self.status == "PLAYING" and (self.mode == "buzzer" or current_player == player_name),
+            "waiting_for_questions": self.waiting_for_questions,
+            "has_answered": player_name in self.buzzer_answers,
+            "options": question.options if question and self.status == "PLAYING" else None,
+            "deadline": self.deadline,
+            "score": rank["score"],
+            "rank": rank["rank"],
+            "my_result": my_result,
+        }
+
+    def _current_player_name(self) -> Optional[str]:
+        if self.mode == "buzzer":
+            return None
+        player = self.get_current_player()
+        return player.name if player else None
+
+    @synchronized
     def get_game_state(self) -> Dict:
-        # Blind Mode Logic: Active if past 50% of rounds
-        is_blind_mode = False
-        if self.max_rounds > 0 and self.current_round > (self.max_rounds / 2):
-            is_blind_mode = True
+        is_blind_mode = self.is_blind_mode()
             
         # Prepare Leaderboard
         leaderboard = self.get_leaderboard()
         
         # If Blind Mode is active AND game is not finished, corrupt the leaderboard
         if is_blind_mode and self.status != "FINISHED":
-            # Shuffle to hide ranks
-            random.shuffle(leaderboard)
+            # Shuffle to hide ranks, seeded per version so a cached state stays consistent
+            random.Random(self.state_epoch ^ self.state_version).shuffle(leaderboard)
             # Mask scores
             for p in leaderboard:
                 p['score'] = "???"
 
+        last_result = self.last_answer_result
+        if is_blind_mode and self.status != "FINISHED" and last_result and last_result.get("results"):
+            # Buzzer results would give every score away
+            last_result = dict(last_result, results=[
+                dict(r, player_score="???") for r in last_result["results"]
+            ])
+
         return {
             "status": self.status,
             "is_started": self.status in ["PLAYING", "FEEDBACK"], 
             "is_finished": self.status == "FINISHED",
             "current_round": self.current_round,
+            "turn_id": self.turn_id,
             "max_rounds": self.max_rounds,
             "time_limit": self.time_limit,
             "min_players": self.min_players,
             "max_players": self.max_players,
             "auto_advance": self.auto_advance,
+            "mode": self.mode,
             "is_blind_mode": is_blind_mode,
             "current_question": self.current_question.to_dict() if self.current_question else None,
-            "current_player": self.get_current_player().name if self.get_current_player() else None,
+            "current_player": self._current_player_name(),
+            "answers_count": len(self.buzzer_answers),
+            "deadline": self.deadline,
+            "paused": self.paused,
             "players_count": len(self.players),
+            "waiting_for_questions": self.waiting_for_questions,
             "leaderboard": leaderboard,
-            "last_result": self.last_answer_result
+            "last_result": last_result
         }
 
+    def get_state_etag(self, version: Optional[int] = None) -> str:
+        """Entity tag identifying a given state version of this game."""
+        if version is None:
+            version = self.state_version
+        return f"{self.state_epoch:08x}-{version}"
+
+    @synchronized
+    def get_state_json(self) -> Tuple[int, bytes]:
+        """
+        Returns the serialized game state, built at most once per state version.
+
+        Returns:
+            Tuple (state version, UTF-8 JSON bytes).
+        """
+        cached = self._state_json_cache
+        version = self.state_version
+        if cached and cached[0] == version:
+            metrics.inc("game_state_cache_total", result="hit")
+            return cached
+
+        metrics.inc("game_state_cache_total", result="miss")
+        with metrics.timer("game_state_build_seconds"):
+            body = json.dumps(self.get_game_state(), separators=(",", ":")).encode("utf-8")
+        metrics.observe("game_state_bytes", len(body))
+        # Only cache if nothing changed while the state was being built
+        if self.state_version == version:
+            self._state_json_cache = (version, body)
+        return version, body
+
+    @synchronized
+    @journaled("reset")
     def reset_game(self):
         self.status = "LOBBY"
         self.current_round = 0
         self.current_question = None
         self.current_player_index = 0
         self.last_answer_result = None
-        self.players = [] # Reset players too? Usually yes for a new game session.
+        self.buzzer_answers = {}
+        self.deadline = None
+        self.skipped_in_a_row = 0
+        self.waiting_for_questions = False
+        self.deck = []
+        self.deck_cursor = 0
+        self.deck_version = self.state_version
+        self._deck_hashes = set()
+        self._removed_players.update(p.name for p in self.players)
+        self._dirty_players.clear()
+        self._clear_players() # Reset players too? Usually yes for a new game session.
+        self._mark_changed()
 
+    @synchronized
+    @journaled("stop")
     def stop_game(self):
         """Forces the game to end immediately."""
         self.status = "FINISHED"
         self.current_question = None
+        self.deadline = None
+        self._mark_changed()
+
+    @synchronized
+    def to_snapshot(self) -> Dict:
+        """Serializable game header (everything except the players and the deck, see deck_snapshot)."""
+        return {
+            "status": self.status,
+            "current_round": self.current_round,
+            "max_rounds": self.max_rounds,
+            "time_limit": self.time_limit,
+            "difficulty_ratios": self.difficulty_ratios,
+            "auto_advance": self.auto_advance,
+            "mode": self.mode,
+            "buzzer_answers": self.buzzer_answers,
+            "turn_started_at": self.turn_started_at,
+            "deadline": self.deadline,
+            "paused": self.paused,
+            "min_players": self.min_players,
+            "max_players": self.max_players,
+            "current_player_index": self.current_player_index,
+            "waiting_for_answer": self.waiting_for_answer,
+            "last_answer_result": self.last_answer_result,
+            "turn_id": self.turn_id,
+            "skipped_in_a_row": self.skipped_in_a_row,
+            "waiting_for_questions": self.waiting_for_questions,
+            "categories": getattr(self, 'categories', []),
+            "config_min_rounds": getattr(self, '_config_min_rounds', 5),
+            "config_max_rounds": getattr(self, '_config_max_rounds', 10),
+            "current_question": self.current_question.to_dict() if self.current_question else None,
+            "deck_cursor": self.deck_cursor,
+            "deck_version": self.deck_version,
+            "deck_size": len(self.deck),
+            "next_player_id": self._next_player_id,
+            "state_version": self.state_version,
+            "state_epoch": self.state_epoch,
+        }
+
+    @synchronized
+    def deck_snapshot(self, start: int = 0) -> List[Dict]:
+        """Serialized questions of the deck from `start` on; only changes when a deck is drawn or a fallback appended."""
+        return [q.to_dict() for q in self.deck[start:]]
+
+    @staticmethod
+    def player_snapshot(player: Player) -> Dict:
+        return {"id": player.id, "name": player.name, "score": player.score, "avatar_url": player.avatar.avatar_url}
+
+    @synchronized
+    def pop_changes(self) -> Tuple[List[Dict], List[str]]:
+        """Returns (changed players, removed player names) since the last call, and resets them."""
+        by_name = self._players_by_name
+        changed = [self.player_snapshot(by_name[name]) for name in self._dirty_players if name in by_name]
+        removed = list(self._removed_players)
+        self._dirty_players.clear()
+        self._removed_players.clear()
+        return changed, removed
+
+    @synchronized
+    def pop_answers(self) -> Tuple[List[Tuple[str, str, float]], bool]:
+        """
+        Returns the buzzer answers given since the last call as (name, answer, time) rows,
+        and whether anything else changed since then (False: only answers, the header is unchanged).
+        """
+        answers = self.buzzer_answers
+        rows = [(name, *answers[name]) for name in self._new_answers if name in answers]
+        header_changed = self._header_changed
+        self._new_answers = []
+        self._header_changed = False
+        return rows, header_changed
+
+    @synchronized
+    def restore_snapshot(self, header: Dict, players: List[Dict], deck: Optional[List[Dict]] = None):
+        """
+        Replaces this game's state in place with a persisted snapshot.
+
+        Args:
+            header: Game header (to_snapshot).
+            players: Players in turn order (player_snapshot).
+            deck: Questions of the deck (deck_snapshot), or None to keep the current one
+                (same deck_version and deck_size).
+        """
+        self.status = header["status"]
+        self.current_round = header["current_round"]
+        self.max_rounds = header["max_rounds"]
+        self.time_limit = header["time_limit"]
+        self.difficulty_ratios = header["difficulty_ratios"]
+        self.auto_advance = header["auto_advance"]
+        self.mode = header["mode"]
+        self.buzzer_answers = {name: tuple(entry) for name, entry in header["buzzer_answers"].items()}
+        self.turn_started_at = header["turn_started_at"]
+        self.deadline = header["deadline"]
+        self.paused = header["paused"]
+        self.min_players = header["min_players"]
+        self.max_players = header["max_players"]
+        self.current_player_index = header["current_player_index"]
+        self.waiting_for_answer = header["waiting_for_answer"]
+        self.last_answer_result = header["last_answer_result"]
+        self.turn_id = header["turn_id"]
+        self.skipped_in_a_row = header["skipped_in_a_row"]
+        self.waiting_for_questions = header["waiting_for_questions"]
+        self.categories = header["categories"]
+        self._config_min_rounds = header["config_min_rounds"]
+        self._config_max_rounds = header["config_max_rounds"]
+        question = header["current_question"]
+        self.current_question = Quest.from_dict(question) if question else None
+        if deck is not None:
+            self.deck = [Quest.from_dict(q) for q in deck]
+            self._deck_hashes = {question_hash(q.question) for q in self.deck}
+        self.deck_cursor = header["deck_cursor"]
+        self.deck_version = header["deck_version"]
+        if self.categories and self.quiz:
+            self.quiz.set_categories(self.categories)
+
+        self._clear_players()
+        for data in players:
+            player = Player(data["name"], data["score"], id=data["id"])
+            player.avatar.seed = Avatar.seed_from_url(data["avatar_url"])
+            self._index_player(player)
+        self._next_player_id = max(self._next_player_id, header["next_player_id"])
+        self._dirty_players.clear()
+        self._removed_players.clear()
+        self._new_answers = []
+        self._header_changed = False
 
+        self.state_version = header["state_version"]
+        self.state_epoch = header["state_epoch"]
+        self._state_json_cache = None
+        self._state_changed.notify_all()
@@ -0,0 +1,120 @@
+import atexit
+import importlib.util
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict
+import httpx
+
+
+class HttpPool:
+    """Client HTTP unique et borné, partagé par tous les QuizEngine du processus.
+
+    Les connexions keep-alive (et HTTP/2 si le paquet `h2` est installé)
+    sont réutilisées d'une session de jeu à l'autre au lieu d'ouvrir un
+    pool et une poignée de main TLS par partie.
+    """
+
+    def __init__(self, max_connections: int = 20, max_keepalive: int = 10,
+                 keepalive_expiry: float = 30.0, timeout: float = 10.0, http2: bool = True):
+        self._lock = threading.Lock()
+        self._client: Optional[httpx.Client] = None
+        self.configure(max_connections, max_keepalive, keepalive_expiry, timeout, http2)
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "in_flight": 0,
+            "peak_in_flight": 0,
+            "total_ms": 0.0,
+            "clients_created": 0,
+        }
+
+    def configure(self, max_connections: int = 20, max_keepalive: int = 10,
+                  keepalive_expiry: float = 30.0, timeout: float = 10.0, http2: bool = True):
+        """
+        Règle les limites du pool. Le client courant est fermé et sera recréé à la prochaine demande.
+
+        Args:
+            max_connections: Nombre maximal de connexions ouvertes.
+            max_keepalive: Nombre maximal de connexions inactives conservées.
+            keepalive_expiry: Durée (secondes) de conservation d'une connexion inactive.
+            timeout: Délai par défaut des requêtes (secondes).
+            http2: Active HTTP/2 si le paquet `h2` est disponible.
+        """
+        with self._lock:
+            self.limits = httpx.Limits(max_connections=max_connections,
+                                       max_keepalive_connections=max_keepalive,
+                                       keepalive_expiry=keepalive_expiry)
+            self.timeout = timeout
+            self.http2 = http2 and importlib.util.find_spec("h2") is not None
+            self._close_client()
+
+    def init_app(self, app):
+        """Configure le pool depuis la config Flask et le ferme à l'arrêt du processus."""
+        self.configure(
+            max_connections=app.config.get('HTTP_POOL_MAX_CONNECTIONS', 20),
+            max_keepalive=app.config.get('HTTP_POOL_MAX_KEEPALIVE', 10),
+            keepalive_expiry=app.config.get('HTTP_POOL_KEEPALIVE_EXPIRY', 30.0),
+            timeout=app.config.get('HTTP_TIMEOUT', 10.0),
+            http2=app.config.get('HTTP_POOL_HTTP2', True),
+        )
+        app.extensions['http_pool'] = self
+        atexit.register(self.close)
+
+    def get_client(self) -> httpx.Client:
+        """Retourne le client partagé, créé à la première demande."""
+        with self._lock:
+            if self._client is None or self._client.is_closed:
+                self._client = httpx.Client(timeout=self.timeout, limits=self.limits, http2=self.http2)
+                self.stats["clients_created"] += 1
+            return self._client
+
+    @contextmanager
+    def track(self):
+        """Compte une requête en cours, sa durée et son éventuel échec."""
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["in_flight"] += 1
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.stats["in_flight"])
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self.stats["in_flight"] -= 1
+                self.stats["total_ms"] += elapsed_ms
+
+    def _open_connections(self) -> Optional[int]:
+        # httpcore does not expose this publicly; best effort only
+        try:
+            return len(self._client._transport._pool.connections)
+        except AttributeError:
+            return None
+
+    def get_stats(self) -> Dict:
+        """Compteurs d'utilisation du pool."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["avg_ms"] = stats["total_ms"] / stats["requests"] if stats["requests"] else 0.0
+            stats["max_connections"] = self.limits.max_connections
+            stats["http2"] = self.http2
+            stats["open_connections"] = self._open_connections() if self._client else 0
+        return stats
+
+    def _close_client(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def close(self):
+        """Ferme le client partagé et toutes ses connexions."""
+        with self._lock:
+            self._close_client()
+
+
+http_pool = HttpPool()
@@ -0,0 +1,66 @@
+import bisect
+from typing import Optional, List, Dict, Tuple
+from app.game.Player import Player
+
+
+class Leaderboard:
+    """Classement tenu à jour incrémentalement (liste triée par bisect).
+
+    Chaque joueur y figure sous la clé (-score, id) : meilleur score en
+    tête, puis ordre d'arrivée à égalité, comme l'ancien tri stable. Un
+    changement de score ne déplace qu'une entrée au lieu de retrier toute
+    la partie à chaque lecture de l'état.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[int, int]] = []
+        self._key_by_id: Dict[int, Tuple[int, int]] = {}
+        self._players: Dict[int, Player] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, player: Player):
+        """Ajoute un joueur (ou le replace si son score a changé)."""
+        if player.id in self._key_by_id:
+            self.update(player)
+            return
+        key = (-player.score, player.id)
+        bisect.insort(self._keys, key)
+        self._key_by_id[player.id] = key
+        self._players[player.id] = player
+
+    def update(self, player: Player):
+        """À appeler après chaque modification du score d'un joueur."""
+        old_key = self._key_by_id.get(player.id)
+        if old_key is None:
+            return
+        new_key = (-player.score, player.id)
+        if new_key == old_key:
+            return
+        del self._keys[bisect.bisect_left(self._keys, old_key)]
+        bisect.insort(self._keys, new_key)
+        self._key_by_id[player.id] = new_key
+
+    def remove(self, player: Player):
+        key = self._key_by_id.pop(player.id, None)
+        if key is not None:
+            del self._keys[bisect.bisect_left(self._keys, key)]
+            del self._players[player.id]
+
+    def clear(self):
+        self._keys.clear()
+        self._key_by_id.clear()
+        self._players.clear()
+
+    def top(self, limit: Optional[int] = None) -> List[Player]:
+        """Les `limit` premiers joueurs (tous si None), du meilleur au moins bon."""
+        keys = self._keys if limit is None else self._keys[:limit]
+        return [self._players[player_id] for _, player_id in keys]
+
+    def rank_of(self, player: Player) -> Optional[int]:
+        """Position (à partir de 1) du joueur dans le classement, ou None s'il n'y figure pas."""
+        key = self._key_by_id.get(player.id)
+        if key is None:
+            return None
+        return bisect.bisect_left(self._keys, key) + 1
@@ -0,0 +1,214 @@
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Tuple, Callable
+
+# Seconds: from half a millisecond (in-memory transitions) to 10 s (quiz API timeout)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Bytes: a 304 / a player view / a room state with a few hundred players
+SIZE_BUCKETS = (0, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _format_value(value) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = labels + (extra,) if extra else labels
+    if not pairs:
+        return ""
+    escaped = (f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for key, value in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+class Metrics:
+    """Compteurs, histogrammes et jauges du processus, exposés au format texte de Prometheus.
+
+    Une mesure coûte une prise de verrou et quelques accès de dictionnaire ;
+    désactivé (PROFILING=False), chaque appel revient immédiatement et les
+    hooks Flask ne sont pas installés.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self._counters: Dict[str, Dict[Tuple, float]] = {}
+        self._histograms: Dict[str, Dict[Tuple, _Histogram]] = {}
+        self._gauges: Dict[str, Callable[[], object]] = {}
+
+    def counter(self, name: str, help_text: str):
+        """Déclare un compteur (valeur croissante, suffixe _total)."""
+        self._help[name] = ("counter", help_text)
+        self._counters.setdefault(name, {})
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        """Déclare un histogramme et ses bornes de classes."""
+        self._help[name] = ("histogram", help_text)
+        self._buckets[name] = buckets
+        self._histograms.setdefault(name, {})
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], object]):
+        """
+        Déclare une jauge lue au moment de l'export.
+
+        Args:
+            name: Nom de la métrique.
+            help_text: Description.
+            read: Retourne un nombre, ou un dictionnaire {valeur de label: nombre}
+                (le label s'appelle alors « state »).
+        """
+        self._help[name] = ("gauge", help_text)
+        self._gauges[name] = read
+
+    def inc(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms[name]
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self._buckets[name])
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Mesure la durée du bloc (secondes) dans l'histogramme `name`."""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timed(self, name: str, **labels):
+        """Décorateur équivalent à timer() autour de toute la fonction."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - started, **labels)
+            return wrapper
+        return decorator
+
+    def init_app(self, app):
+        """Lit PROFILING et mesure chaque requête Flask (durée et taille de réponse par route)."""
+        self.enabled = app.config.get('PROFILING', True)
+        app.extensions['metrics'] = self
+        if not self.enabled:
+            return
+
+        from flask import g, request
+
+        @app.before_request
+        def _start_timer():
+            g.metrics_started = time.perf_counter()
+
+        @app.after_request
+        def _record_request(response):
+            started = g.pop('metrics_started', None)
+            if started is None:
+                return response
+            route = request.url_rule.rule if request.url_rule else "<unmatched>"
+            self.observe("http_request_duration_seconds", time.perf_counter() - started,
+                         route=route, method=request.method)
+            self.inc("http_requests_total", route=route, method=request.method, status=response.status_code)
+            # Streams (SSE) have no length until they end
+            if not response.is_streamed:
+                self.observe("http_response_bytes", response.calculate_content_length() or 0, route=route)
+            return response
+
+    def render(self) -> str:
+        """Export au format texte de Prometheus (version 0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {key: (list(h.counts), h.sum, h.count) for key, h in series.items()}
+                          for name, series in self._histograms.items()}
+        for name, (kind, help_text) in self._help.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for key, value in counters[name].items():
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+            elif kind == "histogram":
+                buckets = self._buckets[name]
+                for key, (counts, total, count) in histograms[name].items():
+                    cumulative = 0
+                    for bound, bucket_count in zip(buckets, counts):
+                        cumulative += bucket_count
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_value(total)}")
+                    lines.append(f"{name}_count{_format_labels(key)} {count}")
+            else:
+                try:
+                    value = self._gauges[name]()
+                except Exception as e:
+                    print(f"Erreur lors de la lecture de la jauge {name}: {e}")
+                    continue
+                if isinstance(value, dict):
+                    for state, state_value in value.items():
+                        lines.append(f"{name}{_format_labels((('state', state),))} {_format_value(state_value)}")
+                elif value is not None:
+                    lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Remet à zéro compteurs et histogrammes (les déclarations restent)."""
+        with self._lock:
+            for series in self._counters.values():
+                series.clear()
+            for series in self._histograms.values():
+                series.clear()
+
+
+metrics = Metrics()
+
+metrics.counter("http_requests_total", "Requêtes HTTP par route, méthode et code de réponse.")
+metrics.histogram("http_request_duration_seconds", "Durée de traitement des requêtes HTTP par route.")
+metrics.histogram("http_response_bytes", "Taille des réponses HTTP par route.", SIZE_BUCKETS)
+metrics.histogram("quiz_fetch_seconds", "Latence des requêtes vers l'API de quiz (par résultat).")
+metrics.counter("quiz_fetch_coalesced_total", "Requêtes vers l'API de quiz évitées en partageant une requête identique en cours.")
+metrics.counter("quiz_questions_total", "Questions servies par source (local, api, stale).")
+metrics.counter("question_buffer_total", "Retraits du tampon de questions (hit ou miss).")
+metrics.histogram("game_transition_seconds", "Durée des transitions de partie (start, next_turn, answer, timeout, continue).")
+metrics.histogram("game_state_build_seconds", "Construction et encodage JSON de l'état complet d'une partie.")
+metrics.histogram("game_state_bytes", "Taille de l'état JSON complet d'une partie.", SIZE_BUCKETS)
+metrics.counter("game_state_cache_total", "Lectures de l'état JSON en cache (hit) ou reconstruit (miss).")
@@ -1,19 +1,96 @@
-import random
+import colorsys
+import hashlib
+import secrets
 
 class Player:
-    def __init__(self, name: str, score: int = 0, id_session: str = None):
+    def __init__(self, name: str, score: int = 0, id_session: str = None, id: int = None):
         self.name = name
+        # Stable within a game: assigned in join order, never reused
+        self.id = id
         self.score = score
         self.id_session = id_session
         self.avatar = Avatar(self)
 
 class Avatar:
-    def __init__(self, player:Player):
+    """Avatar pixel-art généré localement : seule la graine est stockée, l'image est servie par /avatars/<graine>.svg."""
+
+    URL_PREFIX = "/avatars/"
+    # Sprite of GRID x GRID pixels, symmetric around its vertical axis
+    GRID = 8
+
+    def __init__(self, player:Player, seed: str = None):
         self.player = player
-        self.avatar_url = f"https://api.dicebear.com/7.x/pixel-art/svg?seed={self.player.name}"
-    
+        self.seed = seed or self.default_seed(player.name)
+
+    @staticmethod
+    def default_seed(name: str) -> str:
+        return hashlib.sha256(name.encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def avatar_url(self) -> str:
+        return f"{self.URL_PREFIX}{self.seed}.svg"
+
+    @staticmethod
+    def random_seed() -> str:
+        return secrets.token_hex(6)
+
     def regenerate_avatar(self):
-        self.avatar_url = f"https://api.dicebear.com/7.x/pixel-art/svg?seed={self.player.name}_{random.randint(0, 1000000)}"
+        self.seed = self.random_seed()
+
+    @classmethod
+    def seed_from_url(cls, url: str) -> str:
+        """Graine d'une URL d'avatar (les anciennes URL externes donnent une graine dérivée)."""
+        if url.startswith(cls.URL_PREFIX) and url.endswith(".svg"):
+            return url[len(cls.URL_PREFIX):-len(".svg")]
+        return cls.default_seed(url)
+
+    @classmethod
+    def render_svg(cls, seed: str) -> str:
+        """
+        Dessine l'avatar d'une graine : toujours le même pour une même graine.
+
+        Args:
+            seed: Graine de l'avatar.
+
+        Returns:
+            Document SVG (quelques centaines d'octets).
+        """
+        digest = hashlib.sha256(seed.encode("utf-8")).digest()
+        hue = digest[0] / 255
+        body = cls._hex_color(hue, 0.55, 0.65)
+        shade = cls._hex_color(hue, 0.40, 0.55)
+        background = cls._hex_color((hue + 0.5) % 1, 0.90, 0.35)
+
+        half = cls.GRID // 2
+        bits = int.from_bytes(digest[1:5], "big")
+        rects = []
+        for y in range(1, cls.GRID - 1):
+            row = [(bits >> (y * half + x)) & 1 for x in range(half)]
+            # Mirror the left half, keep a solid core so every sprite looks like a character
+            row = row + row[::-1]
+            row[half - 1] = row[half] = 1
+            fill = shade if y >= cls.GRID - 3 else body
+            x = 0
+            while x < cls.GRID:
+                if row[x]:
+                    start = x
+                    while x < cls.GRID and row[x]:
+                        x += 1
+                    rects.append(f'<rect x="{start}" y="{y}" width="{x - start}" height="1" fill="{fill}"/>')
+                else:
+                    x += 1
+        eye_y = 2 + digest[5] % 2
+        for eye_x in (half - 2, half + 1):
+            rects.append(f'<rect x="{eye_x}" y="{eye_y}" width="1" height="1" fill="#1b1b1b"/>')
+
+        return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {cls.GRID} {cls.GRID}" '
+                f'shape-rendering="crispEdges"><rect width="{cls.GRID}" height="{cls.GRID}" fill="{background}"/>'
+                + "".join(rects) + "</svg>")
+
+    @staticmethod
+    def _hex_color(hue: float, lightness: float, saturation: float) -> str:
+        r, g, b = colorsys.hls_to_rgb(hue, lightness, saturation)
+        return f"#{round(r * 255):02x}{round(g * 255):02x}{round(b * 255):02x}"
     
     def __str__(self) -> str:
         return f"Avatar: {self.avatar_url}"
@@ -22,7 +99,7 @@ class Avatar:
         return f"Avatar: {self.avatar_url}"
 
     def __eq__(self, other: 'Avatar') -> bool:
-        return self.avatar_url == other.avatar_url
+        return self.seed == other.seed
 
     def __hash__(self) -> int:
-        return hash(self.avatar_url)
\ No newline at end of file
+        return hash(self.seed)
\ No newline at end of file
@@ -0,0 +1,182 @@
+import random
+import threading
+from collections import deque
+from concurrent.futures import Future, wait as wait_futures
+from typing import Optional, List, Dict, Tuple, Deque
+from app.game.Metrics import metrics
+
+
+class QuestionBuffer:
+    """Tampon de questions pré-chargées, indexé par (difficulté, catégorie).
+
+    Les files sont remplies en masse avant la partie puis rechargées en
+    arrière-plan dès qu'elles passent sous le seuil bas, de sorte qu'un
+    changement de tour ne fait que dépiler une question. Les rechargements
+    passent par l'exécuteur de requêtes partagé du processus (un seul en
+    cours par file) : le nombre de requêtes simultanées reste borné quel
+    que soit le nombre de parties.
+    """
+
+    LOW_WATER = 3
+    HIGH_WATER = 10
+
+    def __init__(self, quiz, low_water: int = LOW_WATER, high_water: int = HIGH_WATER):
+        """
+        Initialise le tampon.
+
+        Args:
+            quiz: Le QuizEngine utilisé pour récupérer les questions.
+            low_water: Seuil sous lequel une file est rechargée en arrière-plan.
+            high_water: Taille cible d'une file après rechargement.
+        """
+        self.quiz = quiz
+        self.low_water = max(0, low_water)
+        self.high_water = max(self.low_water + 1, high_water)
+        self.queues: Dict[Tuple[str, Optional[str]], Deque[Dict]] = {}
+        self._lock = threading.Lock()
+        # Refill in flight for each queue
+        self._refilling: Dict[Tuple[str, Optional[str]], Future] = {}
+        self._closed = False
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "refills": 0,
+            "fetched": 0,
+        }
+
+    def _queue(self, key: Tuple[str, Optional[str]]) -> Deque[Dict]:
+        queue = self.queues.get(key)
+        if queue is None:
+            queue = self.queues.setdefault(key, deque())
+        return queue
+
+    def _categories(self) -> List[Optional[str]]:
+        return list(self.quiz.selected_categories) or [None]
+
+    def fill(self, difficulties: List[str], wait: bool = False):
+        """
+        Remplit jusqu'au seuil haut les files des difficultés demandées.
+
+        Args:
+            difficulties: Niveaux de difficulté ("facile", "normal", "difficile").
+            wait: Si True, bloque jusqu'à la fin du remplissage.
+        """
+        keys = [(difficulty, category) for difficulty in difficulties for category in self._categories()]
+        futures = [self._schedule_refill(key) for key in keys]
+        if wait:
+            wait_futures([future for future in futures if future])
+
+    def take(self, difficulty: str) -> Optional[Dict]:
+        """
+        Retire une question brute (format API) du tampon.
+
+        Tente d'abord une catégorie au hasard parmi celles sélectionnées, puis
+        les autres. En cas de tampon vide, récupère une question de manière
+        synchrone (compté comme un « miss »).
+
+        Returns:
+            Dictionnaire de la question au format API, ou None en cas d'erreur.
+        """
+        categories = self._categories()
+        random.shuffle(categories)
+
+        for category in categories:
+            key = (difficulty, category)
+            with self._lock:
+                queue = self._queue(key)
+                question = queue.popleft() if queue else None
+                remaining = len(queue)
+            if remaining < self.low_water:
+                self._schedule_refill(key)
+            if question is not None:
+                self.stats["hits"] += 1
+                metrics.inc("question_buffer_total", result="hit")
+                return question
+
+        self.stats["misses"] += 1
+        metrics.inc("question_buffer_total", result="miss")
+        questions = self.quiz.fetch_questions(limit=1, difficulty=difficulty, category=categories[0])
+        if not questions:
+            return None
+        return questions[0]
+
+    def drain(self, difficulty: str, limit: int) -> List[Dict]:
+        """
+        Retire jusqu'à `limit` questions déjà en tampon, sans requête synchrone.
+
+        Les catégories sélectionnées sont parcourues à tour de rôle pour varier
+        les questions ; les files entamées sont rechargées en arrière-plan.
+        """
+        categories = self._categories()
+        random.shuffle(categories)
+        taken: List[Dict] = []
+        with self._lock:
+            queues = [self._queue((difficulty, category)) for category in categories]
+            while len(taken) < limit and any(queues):
+                for queue in queues:
+                    if queue and len(taken) < limit:
+                        taken.append(queue.popleft())
+            self.stats["hits"] += len(taken)
+        if taken:
+            metrics.inc("question_buffer_total", len(taken), result="hit")
+        for category in categories:
+            self._schedule_refill((difficulty, category))
+        return taken
+
+    def _schedule_refill(self, key: Tuple[str, Optional[str]]) -> Optional[Future]:
+        with self._lock:
+            if self._closed:
+                return None
+            if key in self._refilling:
+                return self._refilling[key]
+            if len(self._queue(key)) >= self.high_water:
+                return None
+            future = self._refilling[key] = self.quiz.submit(self._refill, key)
+        return future
+
+    def _refill(self, key: Tuple[str, Optional[str]]):
+        difficulty, category = key
+        try:
+            with self._lock:
+                missing = self.high_water - len(self._queue(key))
+            if missing <= 0:
+                return
+            questions = self.quiz.fetch_questions(limit=missing, difficulty=difficulty, category=category)
+            if not questions:
+                return
+            with self._lock:
+                if self._closed:
+                    return
+                self._queue(key).extend(questions)
+                self.stats["refills"] += 1
+                self.stats["fetched"] += len(questions)
+        finally:
+            with self._lock:
+                self._refilling.pop(key, None)
+
+    def retain_categories(self, categories: List[str]):
+        """Supprime les files des catégories qui ne sont plus sélectionnées."""
+        wanted = set(categories) if categories else {None}
+        with self._lock:
+            for key in list(self.queues):
+                if key[1] not in wanted:
+                    del self.queues[key]
+
+    def size(self) -> int:
+        """Nombre total de questions en attente dans le tampon."""
+        with self._lock:
+            return sum(len(queue) for queue in self.queues.values())
+
+    def get_stats(self) -> Dict:
+        """Retourne les compteurs du tampon (hits, misses, rechargements)."""
+        stats = dict(self.stats)
+        stats["buffered"] = self.size()
+        stats["low_water"] = self.low_water
+        stats["high_water"] = self.high_water
+        return stats
+
+    def close(self):
+        """Arrête les rechargements et vide le tampon."""
+        with self._lock:
+            self._closed = True
+            self.queues.clear()
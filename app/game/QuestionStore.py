@@ -0,0 +1,209 @@
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+from typing import Optional, List, Dict, Tuple
+
+
+def question_hash(text: str) -> str:
+    """Empreinte stable d'une question, insensible à la casse et aux espaces."""
+    normalized = " ".join(text.split()).casefold()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+class QuestionStore:
+    """Banque de questions locale (SQLite) indexée par catégorie et difficulté.
+
+    Les questions sont stockées au format de l'API (question, answer,
+    badAnswers) et dédupliquées par empreinte du texte. Les tirages
+    aléatoires se font sur un index en mémoire chargé à la première
+    demande pour chaque couple (catégorie, difficulté).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS questions (
+            id INTEGER PRIMARY KEY,
+            hash TEXT NOT NULL UNIQUE,
+            category TEXT NOT NULL,
+            difficulty TEXT NOT NULL,
+            question TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            bad_answers TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_questions_category_difficulty
+            ON questions (category, difficulty);
+    """
+
+    def __init__(self, path: str):
+        """
+        Ouvre (ou crée) la banque de questions.
+
+        Args:
+            path: Chemin du fichier SQLite (":memory:" pour une banque éphémère).
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(self.SCHEMA)
+        self._index: Dict[Tuple[Optional[str], Optional[str]], List[Dict]] = {}
+
+    def add_questions(self, questions: List[Dict], category: Optional[str] = None,
+                      difficulty: Optional[str] = None) -> int:
+        """
+        Ajoute des questions au format API, en ignorant les doublons.
+
+        Args:
+            questions: Dictionnaires au format de l'API de quiz.
+            category: Catégorie à utiliser si la question n'en précise pas.
+            difficulty: Difficulté à utiliser si la question n'en précise pas.
+
+        Returns:
+            Nombre de questions réellement ajoutées.
+        """
+        rows = []
+        for q in questions:
+            text = q.get("question")
+            q_category = q.get("category") or category
+            q_difficulty = q.get("difficulty") or difficulty
+            if not text or not q.get("answer") or not q_category or not q_difficulty:
+                continue
+            rows.append((
+                question_hash(text), q_category, q_difficulty, text,
+                q["answer"], json.dumps(q.get("badAnswers", []), ensure_ascii=False),
+            ))
+        if not rows:
+            return 0
+
+        with self._lock:
+            added = []
+            with self._conn:
+                for row in rows:
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO questions "
+                        "(hash, category, difficulty, question, answer, bad_answers) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        row,
+                    )
+                    if cursor.rowcount:
+                        added.append(row)
+            for _, q_category, q_difficulty, text, answer, bad_answers in added:
+                entry = self._row(q_category, q_difficulty, text, answer, bad_answers)
+                # Only the filters this row matches change; sample() reads a list's length
+                # once, so appending under the lock is safe for concurrent draws
+                for key in ((q_category, q_difficulty), (q_category, None), (None, q_difficulty), (None, None)):
+                    cached = self._index.get(key)
+                    if cached is not None:
+                        cached.append(entry)
+        return len(added)
+
+    @staticmethod
+    def _row(category: str, difficulty: str, question: str, answer: str, bad_answers: str) -> Dict:
+        return {
+            "question": question,
+            "answer": answer,
+            "badAnswers": json.loads(bad_answers),
+            "category": category,
+            "difficulty": difficulty,
+        }
+
+    def _load(self, category: Optional[str], difficulty: Optional[str]) -> List[Dict]:
+        key = (category, difficulty)
+        rows = self._index.get(key)
+        if rows is not None:
+            return rows
+
+        query = "SELECT category, difficulty, question, answer, bad_answers FROM questions"
+        clauses, params = [], []
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+        if difficulty:
+            clauses.append("difficulty = ?")
+            params.append(difficulty)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+
+        rows = [self._row(*row) for row in self._conn.execute(query, params)]
+        self._index[key] = rows
+        return rows
+
+    def sample(self, limit: int = 10, difficulty: Optional[str] = None,
+               category: Optional[str] = None) -> List[Dict]:
+        """
+        Tire des questions au hasard, sans remise.
+
+        Args:
+            limit: Nombre maximal de questions.
+            difficulty: Niveau de difficulté ou None pour tous.
+            category: Catégorie ou None pour toutes.
+
+        Returns:
+            Liste de dictionnaires au format API (copies indépendantes).
+        """
+        with self._lock:
+            rows = self._load(category, difficulty)
+        if not rows:
+            return []
+        picked = random.sample(rows, min(limit, len(rows)))
+        return [dict(q, badAnswers=list(q["badAnswers"])) for q in picked]
+
+    def count(self, difficulty: Optional[str] = None, category: Optional[str] = None) -> int:
+        """Nombre de questions stockées pour ce filtre."""
+        with self._lock:
+            return len(self._load(category, difficulty))
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Nombre de questions par catégorie puis par difficulté."""
+        stats: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT category, difficulty, COUNT(*) FROM questions GROUP BY category, difficulty"
+            )
+            for category, difficulty, total in cursor:
+                stats.setdefault(category, {})[difficulty] = total
+        return stats
+
+    def sync_from_api(self, quiz, categories: Optional[List[str]] = None,
+                      difficulties: Optional[List[str]] = None, batch_size: int = 50,
+                      max_rounds: int = 20, patience: int = 2) -> int:
+        """
+        Importe en masse des questions depuis l'API de quiz.
+
+        L'API renvoie des questions au hasard : chaque couple (catégorie,
+        difficulté) est interrogé jusqu'à ce que `patience` vagues
+        consécutives n'apportent plus rien de nouveau.
+
+        Args:
+            quiz: QuizEngine utilisé pour interroger l'API.
+            categories: Catégories à importer (toutes par défaut).
+            difficulties: Difficultés à importer (toutes par défaut).
+            batch_size: Nombre de questions demandées par requête.
+            max_rounds: Nombre maximal de vagues de requêtes.
+            patience: Vagues sans nouveauté avant d'abandonner un couple.
+
+        Returns:
+            Nombre total de questions ajoutées.
+        """
+        categories = categories or [c["id"] for c in quiz.CATEGORIES]
+        difficulties = difficulties or ["facile", "normal", "difficile"]
+        pending = {(cat, diff): 0 for cat in categories for diff in difficulties}
+        total = 0
+
+        for _ in range(max_rounds):
+            if not pending:
+                break
+            keys = list(pending)
+            requests = [(batch_size, diff, cat) for cat, diff in keys]
+            for (cat, diff), questions in zip(keys, quiz.fetch_many(requests)):
+                added = self.add_questions(questions or [], category=cat, difficulty=diff)
+                total += added
+                pending[(cat, diff)] = 0 if added else pending[(cat, diff)] + 1
+                if pending[(cat, diff)] >= patience:
+                    del pending[(cat, diff)]
+        return total
+
+    def close(self):
+        """Ferme la connexion SQLite."""
+        with self._lock:
+            self._conn.close()
@@ -1,12 +1,60 @@
 import httpx
 import random
-from typing import Optional, List, Dict
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional, List, Dict, Tuple
+from app.game.QuestionBuffer import QuestionBuffer
+from app.game.QuestionStore import QuestionStore, question_hash
+from app.game.HttpPool import http_pool
+from app.game.CircuitBreaker import CircuitBreaker, quiz_breaker
+from app.game.Metrics import metrics
+from app.game.SingleFlight import SingleFlight, quiz_flights
+from app.game.AnswerLog import AnswerLog, answer_log
+
+# Runs hedged requests; separate from the fetch_many executor so a hedge never waits behind its own caller
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_lock = threading.Lock()
+
+# Runs fetch_many requests for every engine of the process: threads stay bounded however many games run
+_fetch_executor: Optional[ThreadPoolExecutor] = None
+_fetch_lock = threading.Lock()
+FETCH_WORKERS = 64
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _hedge_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=64, thread_name_prefix="quiz-hedge")
+        return _hedge_executor
+
+
+def _get_fetch_executor() -> ThreadPoolExecutor:
+    global _fetch_executor
+    with _fetch_lock:
+        if _fetch_executor is None:
+            _fetch_executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="quiz-fetch")
+        return _fetch_executor
 
 
 class Quest:
-    """Classe de base représentant une question de quiz."""
+    """Classe de base représentant une question de quiz.
+
+    Enregistrement compact (`__slots__`, options en tuple) : la difficulté et
+    le multiplicateur sont des attributs de classe. La forme sérialisée n'est
+    pas conservée : seule la question en cours est sérialisée, une fois par
+    version de l'état (voir Game.get_state_json).
+    """
+
+    __slots__ = ("question", "answer", "options", "category")
+
+    # Overridden by each difficulty subclass
+    difficulty: Optional[str] = None
+    multiplier = 1
     
-    def __init__(self, question: str, answer: str, options: List[str]):
+    def __init__(self, question: str, answer: str, options: List[str], category: Optional[str] = None):
         """
         Initialise une question de quiz.
         
@@ -14,23 +62,50 @@ class Quest:
             question: Le texte de la question.
             answer: La réponse correcte.
             options: Liste des options de réponse (incluant la bonne réponse).
+            category: Catégorie de la question, si connue.
         """
         self.question = question
         self.answer = answer
-        self.options = options
+        self.options = tuple(options)
+        self.category = category
 
     def to_dict(self) -> Dict:
         """
         Convertit la question en dictionnaire.
         
         Returns:
-            Dictionnaire contenant la question, la réponse et les options.
+            Dictionnaire contenant la question, la réponse et les options, plus la
+            difficulté et le multiplicateur pour les sous-classes et la catégorie si connue.
         """
-        return {
+        data = {
             "question": self.question,
             "answer": self.answer,
             "options": self.options
         }
+        if self.category is not None:
+            data["category"] = self.category
+        if self.difficulty is not None:
+            data["difficulty"] = self.difficulty
+            data["multiplier"] = self.multiplier
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Quest':
+        """
+        Reconstruit une question à partir de to_dict(), en conservant l'ordre des options.
+        
+        Args:
+            data: Dictionnaire produit par to_dict().
+        
+        Returns:
+            Objet Quest de la classe correspondant à la difficulté.
+        """
+        question_class = {
+            "easy": EasyQuestion,
+            "medium": MediumQuestion,
+            "hard": HardQuestion,
+        }.get(data.get("difficulty"), Quest)
+        return question_class(data["question"], data["answer"], data["options"], data.get("category"))
     
     def __str__(self) -> str:
         """
@@ -39,95 +114,31 @@ class Quest:
         Returns:
             Chaîne de caractères contenant la question, la réponse et les options.
         """
-        return f"Question: {self.question}\nRéponse: {self.answer}\nOptions: {self.options}"
+        return f"Question: {self.question}\nRéponse: {self.answer}\nOptions: {list(self.options)}"
 
 
 class EasyQuestion(Quest):
     """Question de difficulté facile avec un multiplicateur de points de 1."""
-    
-    def __init__(self, question: str, answer: str, options: List[str]):
-        """
-        Initialise une question facile.
-        
-        Args:
-            question: Le texte de la question.
-            answer: La réponse correcte.
-            options: Liste des options de réponse (incluant la bonne réponse).
-        """
-        super().__init__(question, answer, options)
-        self.difficulty = "easy"
-        self.multiplier = 1
 
-    def to_dict(self) -> Dict:
-        """
-        Convertit la question en dictionnaire avec sa difficulté et son multiplicateur.
-        
-        Returns:
-            Dictionnaire contenant la question, la réponse, les options, la difficulté et le multiplicateur.
-        """
-        data = super().to_dict()
-        data["difficulty"] = self.difficulty
-        data["multiplier"] = self.multiplier
-        return data
-    
+    __slots__ = ()
+    difficulty = "easy"
+    multiplier = 1
 
 
 class MediumQuestion(Quest):
     """Question de difficulté moyenne avec un multiplicateur de points de 2."""
-    
-    def __init__(self, question: str, answer: str, options: List[str]):
-        """
-        Initialise une question de difficulté moyenne.
-        
-        Args:
-            question: Le texte de la question.
-            answer: La réponse correcte.
-            options: Liste des options de réponse (incluant la bonne réponse).
-        """
-        super().__init__(question, answer, options)
-        self.difficulty = "medium"
-        self.multiplier = 2
 
-    def to_dict(self) -> Dict:
-        """
-        Convertit la question en dictionnaire avec sa difficulté et son multiplicateur.
-        
-        Returns:
-            Dictionnaire contenant la question, la réponse, les options, la difficulté et le multiplicateur.
-        """
-        data = super().to_dict()
-        data["difficulty"] = self.difficulty
-        data["multiplier"] = self.multiplier
-        return data
+    __slots__ = ()
+    difficulty = "medium"
+    multiplier = 2
 
 
 class HardQuestion(Quest):
     """Question de difficulté élevée avec un multiplicateur de points de 3."""
-    
-    def __init__(self, question: str, answer: str, options: List[str]):
-        """
-        Initialise une question difficile.
-        
-        Args:
-            question: Le texte de la question.
-            answer: La réponse correcte.
-            options: Liste des options de réponse (incluant la bonne réponse).
-        """
-        super().__init__(question, answer, options)
-        self.difficulty = "hard"
-        self.multiplier = 3
 
-    def to_dict(self) -> Dict:
-        """
-        Convertit la question en dictionnaire avec sa difficulté et son multiplicateur.
-        
-        Returns:
-            Dictionnaire contenant la question, la réponse, les options, la difficulté et le multiplicateur.
-        """
-        data = super().to_dict()
-        data["difficulty"] = self.difficulty
-        data["multiplier"] = self.multiplier
-        return data
+    __slots__ = ()
+    difficulty = "hard"
+    multiplier = 3
 
 
 class QuizEngine:
@@ -149,11 +160,95 @@ class QuizEngine:
         {"id": "jeux_videos", "name": "Jeux Vidéo", "emoji": "🎮"},
     ]
     
-    def __init__(self):
-        """Initialise le moteur de quiz avec l'URL de l'API et un client HTTP."""
+    # Difficulty labels of the API, from easiest to hardest
+    LEVELS = ("facile", "normal", "difficile")
+    
+    # "api": live upstream only, "local": QuestionStore only (offline),
+    # "hybrid": QuestionStore first, upstream to top up and populate the store
+    BACKENDS = ("api", "local", "hybrid")
+    
+    # Hedge a request still running after the p95 latency of the upstream
+    HEDGE_PERCENTILE = 0.95
+    HEDGE_MIN_DELAY = 0.05
+    
+    # Largest request sent on behalf of several games at once (see _fetch_shared)
+    SHARED_LIMIT = 50
+    
+    # Recently fetched questions, shared by every engine: served when the upstream is down
+    RECENT_SIZE = 500
+    _recent: Dict[Optional[str], deque] = {}
+    _recent_lock = threading.Lock()
+    
+    def __init__(self, buffer_low_water: int = QuestionBuffer.LOW_WATER,
+                 buffer_high_water: int = QuestionBuffer.HIGH_WATER,
+                 max_concurrency: int = 8, request_deadline: float = 5.0,
+                 backend: str = "api", store: Optional[QuestionStore] = None,
+                 client: Optional[httpx.Client] = None, retries: int = 2,
+                 retry_backoff: float = 0.2, hedge: bool = True,
+                 breaker: Optional[CircuitBreaker] = None, coalesce: bool = True,
+                 flights: Optional[SingleFlight] = None, answers: Optional[AnswerLog] = None):
+        """
+        Initialise le moteur de quiz avec l'URL de l'API, un client HTTP et un tampon de questions.
+
+        Par défaut, le client HTTP est celui du pool partagé par tout le processus.
+
+        Args:
+            buffer_low_water: Seuil sous lequel une file du tampon est rechargée.
+            buffer_high_water: Taille cible d'une file du tampon.
+            max_concurrency: Nombre maximal de requêtes simultanées lors d'un chargement groupé.
+            request_deadline: Délai maximal (secondes) accordé à chaque requête d'un chargement groupé.
+            backend: Source des questions ("api", "local" ou "hybrid").
+            store: Banque de questions locale, requise pour "local" et "hybrid".
+            client: Client HTTP dédié à ce moteur (fermé avec lui), ou None pour le pool partagé.
+            retries: Nouvelles tentatives après une erreur passagère (réseau, 429, 5xx).
+            retry_backoff: Attente (secondes) avant la première nouvelle tentative, doublée ensuite.
+            hedge: Double une requête plus lente que le p95 de l'API et garde la première réponse.
+            breaker: Disjoncteur de l'API, ou None pour celui partagé par le processus.
+            coalesce: Partage une requête en cours identique (même difficulté et catégorie)
+                lancée par une autre partie au lieu d'en envoyer une nouvelle.
+            flights: Registre des requêtes en cours, ou None pour celui partagé par le processus.
+            answers: Journal des réponses dont la difficulté calibrée fixe le niveau des questions,
+                ou None pour celui partagé par le processus.
+        """
         self.api_url = "https://quizzapi.jomoreschi.fr/api/v2/quiz"
-        self.client = httpx.Client(timeout=10.0)
+        self._client = client
         self.selected_categories = []  # Will be set via config
+        self.max_concurrency = max(1, max_concurrency)
+        self.request_deadline = request_deadline
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Backend de questions inconnu: {backend}")
+        if backend != "api" and store is None:
+            raise ValueError(f"Le backend '{backend}' nécessite une banque de questions locale")
+        self.backend = backend
+        self.store = store
+        self.buffer = QuestionBuffer(self, buffer_low_water, buffer_high_water)
+        self.retries = max(0, retries)
+        self.retry_backoff = retry_backoff
+        self.hedge = hedge
+        self.breaker = breaker if breaker is not None else quiz_breaker
+        self.coalesce = coalesce
+        self.flights = flights if flights is not None else quiz_flights
+        self.answers = answers if answers is not None else answer_log
+        self._stats_lock = threading.Lock()
+        self.fetch_stats = {
+            "requests": 0,
+            "retries": 0,
+            "failures": 0,
+            "short_circuited": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "stale_served": 0,
+            "coalesced": 0,
+        }
+
+    @property
+    def client(self) -> httpx.Client:
+        """Client HTTP dédié s'il y en a un, sinon celui du pool partagé."""
+        return self._client if self._client is not None else http_pool.get_client()
+
+    @client.setter
+    def client(self, client: Optional[httpx.Client]):
+        self._client = client
 
     @classmethod
     def get_available_categories(cls) -> List[Dict]:
@@ -163,40 +258,325 @@ class QuizEngine:
     def set_categories(self, categories: List[str]):
         """Set the categories to use for question generation."""
         self.selected_categories = categories
+        self.buffer.retain_categories(categories)
+
+    def prefetch(self, difficulties: List[str], wait: bool = False):
+        """
+        Pré-charge le tampon de questions pour les difficultés données.
+
+        Args:
+            difficulties: Niveaux de difficulté ("facile", "normal", "difficile").
+            wait: Si True, attend la fin du pré-chargement.
+        """
+        self.buffer.fill(difficulties, wait=wait)
+
+    def submit(self, fn, *args) -> Future:
+        """Exécute fn(*args) sur l'exécuteur de requêtes partagé par tout le processus (FETCH_WORKERS threads)."""
+        return _get_fetch_executor().submit(fn, *args)
 
     def fetch_questions(self, limit: int = 10, difficulty: Optional[str] = None, 
-                       category: Optional[str] = None) -> Optional[List[Dict]]:
+                       category: Optional[str] = None, timeout: Optional[float] = None) -> Optional[List[Dict]]:
         """
-        Récupère des questions depuis l'API de quiz.
+        Récupère des questions depuis l'API de quiz ou la banque locale selon le backend.
+        
+        Les erreurs passagères de l'API sont retentées (attente exponentielle)
+        tant que le délai n'est pas écoulé. Si l'API reste indisponible ou que
+        le disjoncteur est ouvert, des questions récemment reçues (ou de la
+        banque locale) sont servies à la place.
         
         Args:
             limit: Nombre de questions à récupérer (par défaut: 10).
             difficulty: Niveau de difficulté ("facile", "normal", "difficile") ou None pour tous.
             category: Catégorie de questions ou None pour toutes.
+            timeout: Délai maximal en secondes, nouvelles tentatives comprises, ou None pour celui du client.
         
         Returns:
-            Liste de dictionnaires contenant les données des questions, ou None en cas d'erreur.
+            Liste de dictionnaires contenant les données des questions, ou None si rien n'est disponible.
         """
+        local = []
+        if self.backend != "api":
+            local = self.store.sample(limit, difficulty, category)
+            if self.backend == "local" or len(local) >= limit:
+                metrics.inc("quiz_questions_total", len(local), source="local")
+                return local
+
         params = {"limit": limit}
         if difficulty:
             params["difficulty"] = difficulty
         if category:
             params["category"] = category
 
+        questions, shared = self._fetch_shared(params, timeout)
+        if questions is None:
+            # In hybrid mode a partial local sample beats nothing
+            return local or self._stale_questions(limit, difficulty, category)
+
+        if not shared:
+            self._remember(questions, difficulty)
+        metrics.inc("quiz_questions_total", len(questions), source="api")
+        if self.backend == "hybrid":
+            self.store.add_questions(questions, category=category, difficulty=difficulty)
+        return questions
+
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self.fetch_stats[key] += n
+
+    def _fetch_shared(self, params: Dict, timeout: Optional[float]) -> Tuple[Optional[List[Dict]], bool]:
+        """
+        _fetch_remote, partagé avec les requêtes identiques déjà en cours dans les autres parties.
+
+        La requête commune demande assez de questions pour les parties qui
+        l'attendent (jusqu'à SHARED_LIMIT) et chacune en reçoit une tranche
+        disjointe : deux salles qui démarrent ensemble n'ont pas les mêmes questions.
+
+        Returns:
+            Tuple (questions ou None, True si elles viennent de la requête d'une autre partie).
+        """
+        if timeout is None:
+            timeout = self.client.timeout.read or http_pool.timeout
+        if not self.coalesce:
+            return self._fetch_remote(params, timeout), False
+
+        # Only calls going to the same upstream through the same client are interchangeable
+        key = (self.api_url, id(self.client), params.get("difficulty"), params.get("category"))
         try:
-            response = self.client.get(self.api_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("quizzes", [])
-        except httpx.HTTPError as e:
+            questions, shared = self.flights.split(
+                key, lambda total: self._fetch_remote(dict(params, limit=total), timeout),
+                size=params["limit"], max_size=max(params["limit"], self.SHARED_LIMIT), timeout=timeout)
+        except TimeoutError as e:
             print(f"Erreur lors de la récupération des questions: {e}")
+            return None, True
+        if shared:
+            self._count("coalesced")
+            metrics.inc("quiz_fetch_coalesced_total")
+        return questions, shared
+
+    def _fetch_remote(self, params: Dict, timeout: float) -> Optional[List[Dict]]:
+        """GET sur l'API avec nouvelles tentatives bornées par le délai ; None si elle reste indisponible."""
+        deadline = time.monotonic() + timeout
+        error: Optional[Exception] = None
+        for attempt in range(self.retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if not self.breaker.allow():
+                self._count("short_circuited")
+                return None
+            if attempt:
+                self._count("retries")
+            self._count("requests")
+            started = time.monotonic()
+            try:
+                questions = self._hedged_get(params, remaining)
+            except (httpx.HTTPError, ValueError) as e:
+                self._count("failures")
+                error = e
+                if not self._is_transient(e):
+                    # The API answered (bad category, malformed payload): not a reason to cut it off for every game
+                    self.breaker.record_success()
+                    break
+                self.breaker.record_failure()
+                # Exponential backoff with jitter, so retries from many games do not line up
+                delay = self.retry_backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+                if time.monotonic() + delay >= deadline:
+                    break
+                time.sleep(delay)
+                continue
+            except BaseException:
+                # Neither success nor failure: free the half-open probe, or the breaker would never close again
+                self.breaker.release_probe()
+                raise
+            self.breaker.record_success(time.monotonic() - started)
+            return questions
+        if error is not None:
+            print(f"Erreur lors de la récupération des questions: {error}")
+        return None
+
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        if isinstance(error, httpx.HTTPStatusError):
+            status = error.response.status_code
+            return status == 429 or status >= 500
+        return isinstance(error, httpx.TransportError)
+
+    def _get(self, params: Dict, timeout: float) -> List[Dict]:
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            with http_pool.track():
+                response = self.client.get(self.api_url, params=params, timeout=timeout)
+                response.raise_for_status()
+            questions = response.json().get("quizzes", [])
+            outcome = "ok"
+            return questions
+        finally:
+            metrics.observe("quiz_fetch_seconds", time.perf_counter() - started, outcome=outcome)
+
+    def _hedged_get(self, params: Dict, timeout: float) -> List[Dict]:
+        """
+        Un GET, doublé s'il dépasse le p95 de l'API ; la première réponse valide l'emporte.
+
+        Ne double qu'environ 5 % des requêtes, mais coupe la queue de latence
+        due à une connexion ou un serveur amont ponctuellement lent.
+        """
+        delay = self.breaker.latency_percentile(self.HEDGE_PERCENTILE) if self.hedge else None
+        if delay is None or max(delay, self.HEDGE_MIN_DELAY) >= timeout:
+            return self._get(params, timeout)
+        delay = max(delay, self.HEDGE_MIN_DELAY)
+
+        executor = _get_hedge_executor()
+        started = time.monotonic()
+        primary = executor.submit(self._get, params, timeout)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        self._count("hedges")
+        hedge = executor.submit(self._get, params, timeout - (time.monotonic() - started))
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _remember(self, questions: List[Dict], difficulty: Optional[str]):
+        if not questions:
+            return
+        with self._recent_lock:
+            recent = self._recent.get(difficulty)
+            if recent is None:
+                recent = self._recent[difficulty] = deque(maxlen=self.RECENT_SIZE)
+            recent.extend(questions)
+
+    def _stale_questions(self, limit: int, difficulty: Optional[str],
+                         category: Optional[str]) -> Optional[List[Dict]]:
+        """Questions déjà vues (même catégorie de préférence), puis banque locale, quand l'API ne répond pas."""
+        with self._recent_lock:
+            recent = list(self._recent.get(difficulty, ()))
+        if category:
+            same_category = [q for q in recent if q.get("category") == category]
+            recent = same_category or recent
+        questions = random.sample(recent, min(limit, len(recent)))
+        if len(questions) < limit and self.store is not None:
+            questions += self.store.sample(limit - len(questions), difficulty, category)
+        if not questions:
             return None
+        self._count("stale_served", len(questions))
+        metrics.inc("quiz_questions_total", len(questions), source="stale")
+        return questions
+
+    def get_fetch_stats(self) -> Dict:
+        """Compteurs de ce moteur (tentatives, doublements, questions de secours) et état de l'API."""
+        with self._stats_lock:
+            stats = dict(self.fetch_stats)
+        stats["breaker"] = self.breaker.get_stats()
+        return stats
+
+    def fetch_many(self, requests: List[Tuple[int, Optional[str], Optional[str]]]) -> List[Optional[List[Dict]]]:
+        """
+        Exécute plusieurs appels à fetch_questions en parallèle.
+        
+        Au plus max_concurrency requêtes sont en vol sur l'exécuteur partagé
+        par tout le processus (FETCH_WORKERS threads) : dès qu'une se termine,
+        la suivante part. L'ensemble dispose de request_deadline secondes ;
+        chaque requête reçoit le temps restant, et une requête en retard ou
+        jamais partie est traitée comme une erreur.
+        
+        Args:
+            requests: Liste de tuples (limit, difficulty, category).
+        
+        Returns:
+            Liste des résultats de fetch_questions, dans l'ordre des requêtes.
+        """
+        if not requests:
+            return []
+        if len(requests) == 1:
+            limit, difficulty, category = requests[0]
+            return [self.fetch_questions(limit, difficulty, category, timeout=self.request_deadline)]
+
+        executor = _get_fetch_executor()
+        deadline = time.monotonic() + self.request_deadline
+        results: List[Optional[List[Dict]]] = [None] * len(requests)
+        pending: Dict[Future, int] = {}
+        next_index = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            # Sliding window: refill up to max_concurrency as soon as a slot frees up
+            while next_index < len(requests) and len(pending) < self.max_concurrency and remaining > 0:
+                limit, difficulty, category = requests[next_index]
+                pending[executor.submit(self.fetch_questions, limit, difficulty, category, remaining)] = next_index
+                next_index += 1
+            if not pending or remaining <= 0:
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                if future.exception() is None:
+                    results[index] = future.result()
+        # Past the deadline: queued requests are dropped, running ones end on their own timeout
+        for future in pending:
+            future.cancel()
+        return results
+
+    def _resolve_categories(self, categories: Optional[List[str]]) -> List[str]:
+        if not categories:
+            categories = self.selected_categories if self.selected_categories else [c['id'] for c in self.CATEGORIES]
+        return categories
+
+    def fetch_questions_by_difficulty(self, counts: Dict[Optional[str], int],
+                                      categories: Optional[List[str]] = None) -> Dict[Optional[str], List[Dict]]:
+        """
+        Récupère en une seule vague parallèle des questions pour plusieurs difficultés.
+        
+        Chaque difficulté est répartie sur les catégories comme dans
+        fetch_questions_from_categories, puis mélangée et tronquée à son quota.
+        
+        Args:
+            counts: Nombre de questions voulu par difficulté (None pour toutes).
+            categories: List of category IDs to fetch from. If None, uses all.
+        
+        Returns:
+            Dictionnaire difficulté -> liste de dictionnaires de questions.
+        """
+        categories = self._resolve_categories(categories)
+        wanted = {difficulty: count for difficulty, count in counts.items() if count > 0}
+
+        requests = []
+        for difficulty, count in wanted.items():
+            if not categories:
+                # Fallback to fetching without category filter
+                requests.append((count, difficulty, None))
+                continue
+            # Calculate questions per category
+            per_category = max(1, count // len(categories))
+            requests.extend((per_category, difficulty, cat) for cat in categories)
+
+        grouped: Dict[Optional[str], List[Dict]] = {difficulty: [] for difficulty in wanted}
+        for (_, difficulty, _), questions in zip(requests, self.fetch_many(requests)):
+            if questions:
+                grouped[difficulty].extend(questions)
+
+        # Shuffle and trim to limit
+        for difficulty, questions in grouped.items():
+            random.shuffle(questions)
+            grouped[difficulty] = questions[:wanted[difficulty]]
+        return grouped
 
     def fetch_questions_from_categories(self, limit: int = 10, difficulty: Optional[str] = None,
                                         categories: Optional[List[str]] = None) -> List[Dict]:
         """
         Fetch questions from multiple categories.
         
+        Categories are fetched concurrently, so the call lasts as long as the
+        slowest request rather than the sum of all of them.
+        
         Args:
             limit: Total number of questions to fetch.
             difficulty: Difficulty level.
@@ -205,25 +585,21 @@ class QuizEngine:
         Returns:
             List of question dictionaries.
         """
-        if not categories:
-            categories = self.selected_categories if self.selected_categories else [c['id'] for c in self.CATEGORIES]
-        
-        if not categories:
-            # Fallback to fetching without category filter
-            return self.fetch_questions(limit, difficulty) or []
-        
-        all_questions = []
-        # Calculate questions per category
-        per_category = max(1, limit // len(categories))
+        return self.fetch_questions_by_difficulty({difficulty: limit}, categories).get(difficulty, [])
+
+    def calibrated_difficulty(self, api_question: Dict, difficulty: str) -> str:
+        """
+        Difficulté mesurée d'une question (taux de réussite des joueurs), ou celle de l'API à défaut.
         
-        for cat in categories:
-            questions = self.fetch_questions(per_category, difficulty, cat)
-            if questions:
-                all_questions.extend(questions)
+        Args:
+            api_question: Dictionnaire contenant les données de la question depuis l'API.
+            difficulty: Niveau annoncé par l'API ("facile", "normal", "difficile").
         
-        # Shuffle and trim to limit
-        random.shuffle(all_questions)
-        return all_questions[:limit]
+        Returns:
+            Niveau de difficulté calibré si la question a reçu assez de réponses, sinon `difficulty`.
+        """
+        text = api_question.get("question")
+        return (self.answers.level_of(question_hash(text)) if text else None) or difficulty
 
     def _create_question_object(self, api_question: Dict, difficulty: str) -> Quest:
         """
@@ -231,7 +607,8 @@ class QuizEngine:
         
         Args:
             api_question: Dictionnaire contenant les données de la question depuis l'API.
-            difficulty: Niveau de difficulté de la question ("facile", "normal", "difficile").
+            difficulty: Niveau de difficulté de la question ("facile", "normal", "difficile"),
+                remplacé par la difficulté calibrée quand elle est connue.
         
         Returns:
             Objet Quest (EasyQuestion, MediumQuestion, HardQuestion ou Quest) avec les options mélangées.
@@ -239,18 +616,88 @@ class QuizEngine:
         question_text = api_question.get("question", "")
         correct_answer = api_question.get("answer", "")
         incorrect_answers = api_question.get("badAnswers", [])
+        category = api_question.get("category")
+        difficulty = self.calibrated_difficulty(api_question, difficulty)
         
         options = [correct_answer] + incorrect_answers
         random.shuffle(options)
         
         if difficulty == "facile":
-            return EasyQuestion(question_text, correct_answer, options)
+            return EasyQuestion(question_text, correct_answer, options, category)
         elif difficulty == "normal":
-            return MediumQuestion(question_text, correct_answer, options)
+            return MediumQuestion(question_text, correct_answer, options, category)
         elif difficulty == "difficile":
-            return HardQuestion(question_text, correct_answer, options)
+            return HardQuestion(question_text, correct_answer, options, category)
         else:
-            return Quest(question_text, correct_answer, options)
+            return Quest(question_text, correct_answer, options, category)
+
+    def build_deck(self, counts: Dict[str, int], exclude: Optional[set] = None,
+                   max_rounds: int = 3) -> List[Quest]:
+        """
+        Tire d'un coup toutes les questions d'une partie, sans doublon.
+
+        Le tampon est vidé en premier, puis le reste est demandé en quelques
+        requêtes groupées (une par difficulté et catégorie, en parallèle).
+        Les doublons (même texte) sont écartés et redemandés, avec une marge.
+        Une question dont la difficulté calibrée diffère de celle de l'API
+        compte pour sa difficulté calibrée, ou est écartée si celle-ci est
+        déjà complète ; une difficulté encore incomplète après une vague est
+        aussi cherchée sous les niveaux voisins de l'API (un de plus par vague).
+
+        Args:
+            counts: Nombre de questions par difficulté ("facile", "normal", "difficile").
+            exclude: Empreintes (question_hash) de questions déjà utilisées.
+            max_rounds: Vagues de requêtes au plus pour compléter le paquet.
+
+        Returns:
+            Questions mélangées ; éventuellement moins que demandé si l'API n'en a pas assez.
+        """
+        seen = set(exclude or ())
+        picked: Dict[str, List[Quest]] = {difficulty: [] for difficulty in counts}
+
+        def add(difficulty: str, questions: List[Dict]):
+            for data in questions or []:
+                # Later questions of the batch may calibrate into a level still short
+                if all(len(picked[level]) >= count for level, count in counts.items()):
+                    return
+                text = data.get("question")
+                if not text:
+                    continue
+                digest = question_hash(text)
+                if digest in seen:
+                    continue
+                level = self.calibrated_difficulty(data, difficulty)
+                if len(picked.get(level, ())) >= counts.get(level, 0):
+                    # Players found it easier/harder than labelled, and that level is full
+                    continue
+                seen.add(digest)
+                picked[level].append(self._create_question_object(data, level))
+
+        for difficulty, count in counts.items():
+            if count > 0:
+                add(difficulty, self.buffer.drain(difficulty, count))
+
+        for wave in range(max_rounds):
+            missing = {difficulty: count - len(picked[difficulty])
+                       for difficulty, count in counts.items() if count > len(picked[difficulty])}
+            if not missing:
+                break
+            wanted: Dict[str, int] = {}
+            for difficulty, n in missing.items():
+                # Ask for a few more than needed: some will be duplicates
+                wanted[difficulty] = wanted.get(difficulty, 0) + n + max(2, n // 5)
+                if wave and self.answers.enabled and difficulty in self.LEVELS:
+                    # Still short: only a share of each label calibrates into this level, ask for more of it
+                    rank = self.LEVELS.index(difficulty)
+                    for label in self.LEVELS:
+                        if abs(self.LEVELS.index(label) - rank) <= wave:
+                            wanted[label] = wanted.get(label, 0) + n * len(self.LEVELS)
+            for difficulty, questions in self.fetch_questions_by_difficulty(wanted).items():
+                add(difficulty, questions)
+
+        deck = [question for questions in picked.values() for question in questions]
+        random.shuffle(deck)
+        return deck
 
     def generate_question(self, difficulty: str = "normal") -> Optional[Quest]:
         """
@@ -262,18 +709,12 @@ class QuizEngine:
         Returns:
             Objet Quest correspondant à la difficulté demandée, ou None en cas d'erreur.
         """
-        # Use categories if set
-        if self.selected_categories:
-            # Pick a random category from selected ones
-            category = random.choice(self.selected_categories)
-            questions_data = self.fetch_questions(limit=1, difficulty=difficulty, category=category)
-        else:
-            questions_data = self.fetch_questions(limit=1, difficulty=difficulty)
-            
-        if not questions_data or len(questions_data) == 0:
+        # Served from the prefetch buffer; only blocks on HTTP when it is empty
+        question_data = self.buffer.take(difficulty)
+        if not question_data:
             return None
         
-        return self._create_question_object(questions_data[0], difficulty)
+        return self._create_question_object(question_data, difficulty)
 
     def generate_questions(self, count: int = 10, difficulty: Optional[str] = None,
                            categories: Optional[List[str]] = None) -> List[Quest]:
@@ -313,31 +754,29 @@ class QuizEngine:
         Returns:
             Liste d'objets Quest mélangés de différents niveaux de difficulté.
         """
-        all_questions = []
-        
-        if easy_count > 0:
-            easy_questions = self.generate_questions(easy_count, "facile")
-            all_questions.extend(easy_questions)
+        counts = {"facile": easy_count, "normal": medium_count, "difficile": hard_count}
+        # All difficulties and categories go out in a single concurrent wave
+        grouped = self.fetch_questions_by_difficulty(counts)
         
-        if medium_count > 0:
-            medium_questions = self.generate_questions(medium_count, "normal")
-            all_questions.extend(medium_questions)
-        
-        if hard_count > 0:
-            hard_questions = self.generate_questions(hard_count, "difficile")
-            all_questions.extend(hard_questions)
+        all_questions = []
+        for difficulty, questions_data in grouped.items():
+            for q_data in questions_data:
+                q_difficulty = q_data.get("difficulty", difficulty)
+                all_questions.append(self._create_question_object(q_data, q_difficulty))
         
         random.shuffle(all_questions)
         return all_questions
 
     def close(self):
-        """Ferme le client HTTP et libère les ressources."""
-        self.client.close()
+        """Libère les ressources du moteur. Le client du pool partagé reste ouvert."""
+        self.buffer.close()
+        if self._client is not None:
+            self._client.close()
 
     def __del__(self):
-        """Destructeur qui ferme le client HTTP si nécessaire."""
-        if hasattr(self, 'client'):
+        """Destructeur qui ferme le client HTTP dédié si nécessaire."""
+        if getattr(self, '_client', None) is not None:
             try:
-                self.client.close()
+                self._client.close()
             except:
                 pass
@@ -1,37 +1,108 @@
+import time
 from typing import Optional, Dict
 from app.game.Game import Game
 
 
 class Session:
-    def __init__(self, id_session: str, game: Game):
+    def __init__(self, id_session: str, game: Game, store=None, scheduler=None):
         self.id_session = id_session
         self.game = game
-        self.created_at = None
-        self.last_activity = None
+        self.created_at = time.time()
+        self.last_activity = self.created_at
+        # SessionStore persisting every mutation (None: memory only)
+        self.store = store
+        # TurnScheduler enforcing turn timeouts and auto_advance (None: clients drive them)
+        self.scheduler = scheduler
+        self._scheduled = None
+
+    def _mutate(self, method, *args, **kwargs):
+        """Runs a Game mutation inside a store transaction so other workers see it.
+
+        Anything slow (network) must happen before, see Game.prepare_start:
+        the transaction holds the store's write lock for every session.
+        """
+        if self.store is None:
+            result = method(*args, **kwargs)
+        else:
+            result = self.store.mutate(self, lambda: method(*args, **kwargs))
+        self.schedule_deadline()
+        return result
+
+    def schedule_deadline(self):
+        """Hands the game's current deadline to the scheduler (once per distinct deadline)."""
+        if self.scheduler is None:
+            return
+        deadline = self.game.get_deadline()
+        if deadline is None or deadline == self._scheduled:
+            return
+        self._scheduled = deadline
+        at, action, turn_id = deadline
+        self.scheduler.schedule(at, self.id_session, turn_id, action)
+
+    def fire_deadline(self, turn_id: int, action: str, deadline: float):
+        prepared = self.game.prepare_turn() if action == "continue" else None
+        return self._mutate(self.game.fire_deadline, turn_id, action, deadline, prepared=prepared)
+
+    def set_paused(self, paused: bool):
+        return self._mutate(self.game.set_paused, paused)
+
+    def touch(self):
+        """Records activity on the session (used for idle expiry and LRU eviction)."""
+        self.last_activity = time.time()
+
+    def idle_for(self, now: Optional[float] = None) -> float:
+        """Seconds since the last recorded activity."""
+        return (now if now is not None else time.time()) - self.last_activity
+
+    def close(self):
+        """Releases the resources held by the game's quiz engine."""
+        if self.game.quiz:
+            self.game.quiz.close()
 
     def get_game_state(self):
         return self.game.get_game_state()
 
+    def get_state_json(self):
+        return self.game.get_state_json()
+
+    def get_leaderboard(self, limit: Optional[int] = None):
+        return self.game.get_leaderboard(limit)
+
+    def get_player_rank(self, player_name: str):
+        return self.game.get_player_rank(player_name)
+
+    def get_player_view(self, player_name: str):
+        return self.game.get_player_view(player_name)
+
     def add_player(self, name: str):
-        return self.game.add_player(name)
+        return self._mutate(self.game.add_player, name)
 
     def set_config(self, config: Dict):
-        self.game.set_config(config)
+        self._mutate(self.game.set_config, config)
 
     def reroll_avatar(self, player_name: str) -> bool:
-        return self.game.reroll_avatar(player_name)
+        return self._mutate(self.game.reroll_avatar, player_name)
 
     def start_game(self, min_rounds: int, max_rounds: int):
-        return self.game.start_game(min_rounds, max_rounds)
+        # The deck is fetched before the transaction and the game lock
+        prepared = self.game.prepare_start(min_rounds, max_rounds)
+        return self._mutate(self.game.start_game, min_rounds, max_rounds, prepared=prepared)
+
+    def continue_game(self, turn_id: Optional[int] = None):
+        prepared = self.game.prepare_turn()
+        return self._mutate(self.game.continue_game, turn_id, prepared=prepared)
 
-    def continue_game(self):
-        return self.game.continue_game()
+    def timeout_turn(self, turn_id: Optional[int] = None):
+        return self._mutate(self.game.timeout_turn, turn_id)
 
     def stop_game(self):
-        return self.game.stop_game()
+        return self._mutate(self.game.stop_game)
+
+    def kick_player(self, player_name: str) -> bool:
+        return self._mutate(self.game.kick_player, player_name)
 
     def submit_answer(self, player_name: str, answer: str):
-        return self.game.submit_answer(player_name, answer)
+        return self._mutate(self.game.submit_answer, player_name, answer)
 
     def is_finished(self):
         return self.game.status == "FINISHED"
@@ -1,18 +1,125 @@
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from typing import Dict, Optional, List
 from app.game.Session import Session
 from app.game.Game import Game
 from app.game.Player import Player
 from app.game.QuizEngine import QuizEngine
+from app.game.QuestionStore import QuestionStore
+from app.game.SessionStore import MemorySessionStore, SqliteSessionStore
+from app.game.EventJournal import EventJournal
+from app.game.TurnScheduler import TurnScheduler
 
 
 class SessionManager:
-    def __init__(self):
-        self.sessions: Dict[str, Session] = {}
+    def __init__(self, session_ttl: float = 2 * 3600, finished_ttl: float = 15 * 60,
+                 max_sessions: int = 200, evict_idle: float = 10 * 60):
+        # Ordered from least to most recently active, for LRU eviction
+        self.sessions: Dict[str, Session] = OrderedDict()
+        self.quiz_options: Dict = {}
+        self.question_store: Optional[QuestionStore] = None
+        self.store = MemorySessionStore()
+        # Event journal of every game, replayed on boot (None: games die with the process)
+        self.journal: Optional[EventJournal] = None
+        self.scheduler: Optional[TurnScheduler] = None
+        self.session_ttl = session_ttl
+        self.finished_ttl = finished_ttl
+        self.max_sessions = max_sessions
+        # Without a store or journal to reload from, only sessions idle this long may make room
+        self.evict_idle = evict_idle
+        self._lock = threading.RLock()
+        self._reaper: Optional[threading.Thread] = None
+        self._reaper_stop = threading.Event()
+        # Config read by start(); recovery and background threads run once, in the serving process
+        self._config = {}
+        self._started = False
+        self.stats = {
+            "created": 0,
+            "deleted": 0,
+            "evicted_idle": 0,
+            "evicted_finished": 0,
+            "evicted_lru": 0,
+            "refused": 0,
+            "loaded": 0,
+            "replayed": 0,
+        }
 
-    def create_session(self, player_names: List[str] = None, quiz: Optional[QuizEngine] = None) -> str:
+    def configure(self, config, start: bool = True):
+        """
+        Reads the QuizEngine and session settings from the Flask config.
+
+        Args:
+            config: Flask config (or any mapping).
+            start: Also call start(). create_app defers it to the first request, because
+                the reloader's watcher process runs create_app too but never serves.
+        """
+        backend = config.get('QUESTION_BACKEND', 'api')
+        if backend != 'api' and self.question_store is None:
+            # One store shared by every session of the process
+            self.question_store = QuestionStore(config['QUESTION_DB_PATH'])
+        self.quiz_options = {
+            'backend': backend,
+            'store': self.question_store,
+            'buffer_low_water': config.get('QUESTION_BUFFER_LOW_WATER', 3),
+            'buffer_high_water': config.get('QUESTION_BUFFER_HIGH_WATER', 10),
+            'max_concurrency': config.get('QUIZ_MAX_CONCURRENCY', 8),
+            'request_deadline': config.get('QUIZ_REQUEST_DEADLINE', 5.0),
+            'retries': config.get('QUIZ_RETRIES', 2),
+            'retry_backoff': config.get('QUIZ_RETRY_BACKOFF', 0.2),
+            'hedge': config.get('QUIZ_HEDGE', True),
+            'coalesce': config.get('QUIZ_COALESCE', True),
+        }
+        if config.get('SESSION_STORE', 'memory') == 'sqlite':
+            self.store = SqliteSessionStore(config['SESSION_STORE_PATH'])
+        self.session_ttl = config.get('SESSION_TTL', self.session_ttl)
+        self.finished_ttl = config.get('SESSION_FINISHED_TTL', self.finished_ttl)
+        self.max_sessions = config.get('SESSION_MAX_LIVE', self.max_sessions)
+        self.evict_idle = config.get('SESSION_EVICT_IDLE', self.evict_idle)
+        self._config = config
+        if start:
+            self.start()
+
+    def start(self):
+        """Starts the turn scheduler, replays the event journal and starts the reaper (first call only)."""
+        if self._started:
+            return
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        config = self._config
+        if config.get('TURN_SCHEDULER', True) and self.scheduler is None:
+            self.scheduler = TurnScheduler(self._on_deadline, workers=config.get('TURN_SCHEDULER_WORKERS', 4))
+        if config.get('SESSION_JOURNAL', False) and self.journal is None:
+            if self.store.shared:
+                # The SQLite store already persists every mutation
+                print("SESSION_JOURNAL ignoré : SESSION_STORE=sqlite persiste déjà les parties")
+            else:
+                try:
+                    self.journal = EventJournal(config['SESSION_JOURNAL_PATH'],
+                                                snapshot_every=config.get('SESSION_SNAPSHOT_EVERY', 200),
+                                                fsync=config.get('SESSION_JOURNAL_FSYNC', False))
+                except BlockingIOError:
+                    # Both would append to the same logs and rewrite the same snapshots
+                    print("SESSION_JOURNAL ignoré : le journal est déjà utilisé par un autre processus")
+                else:
+                    self.recover_sessions()
+        reap_interval = config.get('SESSION_REAP_INTERVAL', 60)
+        if reap_interval > 0:
+            self.start_reaper(reap_interval)
+
+    def create_session(self, player_names: List[str] = None, quiz: Optional[QuizEngine] = None) -> Optional[str]:
+        """
+        Creates a lobby session.
+
+        Returns:
+            The new session id, or None when SESSION_MAX_LIVE is reached and no live
+            session can be dropped without losing a game in progress.
+        """
         if quiz is None:
-            quiz = QuizEngine()
+            quiz = QuizEngine(**self.quiz_options)
         
         # Game init no longer takes players
         game = Game(quiz=quiz)
@@ -22,29 +129,242 @@ class SessionManager:
                 game.add_player(name)
                 
         session_id = str(uuid.uuid4())
-        session = Session(id_session=session_id, game=game)
-        self.sessions[session_id] = session
+        session = Session(id_session=session_id, game=game, store=self.store, scheduler=self.scheduler)
+        with self._lock:
+            if not self._make_room():
+                self.stats["refused"] += 1
+                game.quiz.close()
+                return None
+            self.store.create(session)
+            if self.journal:
+                self.journal.attach(session)
+            self._register(session)
+            self.stats["created"] += 1
         return session_id
 
-    def get_session(self, session_id: str) -> Optional[Session]:
-        return self.sessions.get(session_id)
+    def _make_room(self) -> bool:
+        """Evicts least recently active sessions until one more fits; False if none may go."""
+        # With a shared store or a journal an evicted session is reloaded on its next request
+        reloadable = self.store.shared or self.journal is not None
+        now = time.time()
+        while self.max_sessions and len(self.sessions) >= self.max_sessions:
+            victim = next((
+                session_id for session_id, session in self.sessions.items()
+                if reloadable or session.is_finished() or session.idle_for(now) > self.evict_idle
+            ), None)
+            if victim is None:
+                return False
+            self._evict(victim, "evicted_lru")
+        return True
+
+    def _register(self, session: Session):
+        with self._lock:
+            # Loaded and replayed sessions can always be reloaded, so make_room never refuses them
+            self._make_room()
+            self.sessions[session.id_session] = session
+
+    def _load_session(self, session_id: str) -> Optional[Session]:
+        """Rebuilds a session persisted by another worker (or before a restart)."""
+        data = self.store.load(session_id)
+        if data is None:
+            return None
+        header, players, deck, created_at = data
+        game = Game(quiz=QuizEngine(**self.quiz_options))
+        game.restore_snapshot(header, players, deck)
+        if game.status != "FINISHED":
+            game.quiz.prefetch(game.get_active_difficulties())
+        session = Session(id_session=session_id, game=game, store=self.store, scheduler=self.scheduler)
+        session.created_at = created_at
+        with self._lock:
+            # Another thread may have loaded it meanwhile
+            existing = self.sessions.get(session_id)
+            if existing:
+                game.quiz.close()
+                return existing
+            self._register(session)
+            self.stats["loaded"] += 1
+        # Take over the pending timeout/auto-advance (e.g. after a restart)
+        session.schedule_deadline()
+        return session
+
+    def _replay_session(self, session_id: str) -> Optional[Session]:
+        """Rebuilds a session from its event journal (after a restart or an LRU eviction)."""
+        game = Game(quiz=QuizEngine(**self.quiz_options))
+        try:
+            replayed = self.journal.replay(session_id, game)
+        except Exception as e:
+            print(f"Erreur lors de la relecture du journal de la session {session_id}: {e}")
+            replayed = None
+        if replayed is None:
+            game.quiz.close()
+            return None
+        created_at, _ = replayed
+        if game.status != "FINISHED":
+            game.quiz.prefetch(game.get_active_difficulties())
+        session = Session(id_session=session_id, game=game, store=self.store, scheduler=self.scheduler)
+        session.created_at = created_at
+        with self._lock:
+            existing = self.sessions.get(session_id)
+            if existing:
+                game.quiz.close()
+                return existing
+            # New snapshot: the next replay starts from here
+            self.journal.attach(session)
+            self._register(session)
+            self.stats["replayed"] += 1
+        session.schedule_deadline()
+        return session
+
+    def recover_sessions(self) -> int:
+        """
+        Replays every journaled session on boot, dropping the ones that expired meanwhile.
+
+        Returns:
+            Number of sessions rebuilt.
+        """
+        now = time.time()
+        recovered = 0
+        # Least recently active first, so that LRU eviction keeps the most recent ones
+        for session_id, last_write in self.journal.session_ids():
+            if now - last_write > self.session_ttl:
+                self.journal.delete(session_id)
+                continue
+            session = self._replay_session(session_id)
+            if session is None:
+                continue
+            session.last_activity = last_write
+            if session.is_finished() and now - last_write > self.finished_ttl:
+                self._evict(session_id, "evicted_finished")
+                continue
+            recovered += 1
+        return recovered
+
+    def _on_deadline(self, session_id: str, turn_id: int, action: str, deadline: float):
+        """TurnScheduler callback: runs the action if the session still exists."""
+        # Timers alone do not keep an abandoned game alive
+        session = self.get_session(session_id, touch=False)
+        if session:
+            session.fire_deadline(turn_id, action, deadline)
+
+    def _sync_with_store(self, session_id: str, session: Optional[Session]) -> Optional[Session]:
+        stored = self.store.get_version(session_id)
+        if stored is None:
+            if session:
+                # Deleted by another worker
+                self._evict(session_id, "deleted", persist=False)
+            return None
+        if session is None:
+            return self._load_session(session_id)
+        version, epoch = stored
+        # A local version ahead of the store is a mutation of ours still committing: keep it
+        if epoch != session.game.state_epoch or version > session.game.state_version:
+            self.store.refresh(session)
+        return session
+
+    def get_session(self, session_id: str, touch: bool = True) -> Optional[Session]:
+        with self._lock:
+            session = self.sessions.get(session_id)
+        if self.store.shared:
+            session = self._sync_with_store(session_id, session)
+        elif session is None and self.journal and self.journal.exists(session_id):
+            session = self._replay_session(session_id)
+        if session and touch:
+            with self._lock:
+                session.touch()
+                if session_id in self.sessions:
+                    self.sessions.move_to_end(session_id)
+        return session
+
+    def _evict(self, session_id: str, reason: str, persist: bool = True,
+               idle_before: Optional[float] = None) -> bool:
+        with self._lock:
+            session = self.sessions.pop(session_id, None)
+            if session is None:
+                return False
+            self.stats[reason] += 1
+        session.close()
+        # LRU eviction only drops the local copy; the store (or journal) keeps the session
+        if persist and reason != "evicted_lru":
+            self.store.delete(session_id, idle_before=idle_before)
+            if self.journal:
+                self.journal.delete(session_id)
+        elif self.journal:
+            self.journal.detach(session_id)
+        return True
 
     def delete_session(self, session_id: str) -> bool:
-        if session_id in self.sessions:
-            del self.sessions[session_id]
-            return True
-        return False
+        return self._evict(session_id, "deleted")
 
     def session_exists(self, session_id: str) -> bool:
-        return session_id in self.sessions
+        if session_id in self.sessions:
+            return True
+        if self.journal and self.journal.exists(session_id):
+            return True
+        return self.store.shared and self.store.get_version(session_id) is not None
 
     def get_all_sessions(self) -> Dict[str, Session]:
-        return self.sessions.copy()
+        with self._lock:
+            return dict(self.sessions)
 
     def cleanup_finished_sessions(self):
-        finished_sessions = [
-            session_id for session_id, session in self.sessions.items()
-            if session.is_finished()
-        ]
+        with self._lock:
+            finished_sessions = [
+                session_id for session_id, session in self.sessions.items()
+                if session.is_finished()
+            ]
         for session_id in finished_sessions:
             self.delete_session(session_id)
+
+    def reap(self, now: Optional[float] = None) -> int:
+        """
+        Evicts idle sessions and finished sessions past their grace period.
+
+        Returns:
+            Number of evicted sessions.
+        """
+        now = now if now is not None else time.time()
+        expired = []
+        with self._lock:
+            for session_id, session in self.sessions.items():
+                idle = session.idle_for(now)
+                if session.is_finished() and idle > self.finished_ttl:
+                    expired.append((session_id, "evicted_finished"))
+                elif idle > self.session_ttl:
+                    expired.append((session_id, "evicted_idle"))
+        for session_id, reason in expired:
+            ttl = self.finished_ttl if reason == "evicted_finished" else self.session_ttl
+            # Another worker may still be serving it: only drop it from the store if idle there too
+            self._evict(session_id, reason, idle_before=now - ttl)
+        return len(expired)
+
+    def start_reaper(self, interval: float = 60):
+        """Starts the background thread that calls reap() every `interval` seconds."""
+        if self._reaper and self._reaper.is_alive():
+            return
+        self._reaper_stop.clear()
+
+        def run():
+            while not self._reaper_stop.wait(interval):
+                try:
+                    self.reap()
+                except Exception as e:
+                    print(f"Erreur lors du nettoyage des sessions: {e}")
+
+        self._reaper = threading.Thread(target=run, name="session-reaper", daemon=True)
+        self._reaper.start()
+
+    def stop_reaper(self):
+        self._reaper_stop.set()
+        if self._reaper:
+            self._reaper.join()
+            self._reaper = None
+
+    def get_stats(self) -> Dict:
+        """Live and evicted session counters."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["live"] = len(self.sessions)
+            stats["finished"] = sum(1 for s in self.sessions.values() if s.is_finished())
+            stats["players"] = sum(len(s.game.players) for s in self.sessions.values())
+            stats["max_sessions"] = self.max_sessions
+        return stats
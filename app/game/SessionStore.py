@@ -0,0 +1,406 @@
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Optional, Dict, List, Tuple, Callable, Any
+
+
+class MemorySessionStore:
+    """Stockage par défaut : les sessions ne vivent que dans la mémoire du processus."""
+
+    # True when several processes may write the same sessions
+    shared = False
+    # Seconds between checks for changes made by other processes (None: never)
+    poll_interval: Optional[float] = None
+
+    def create(self, session):
+        pass
+
+    @contextmanager
+    def transaction(self, session):
+        """Encadre une mutation de la session (aucune persistance en mémoire)."""
+        yield
+
+    def mutate(self, session, func: Callable[[], Any]) -> Any:
+        """Exécute une mutation de la session dans une transaction et renvoie son résultat."""
+        with self.transaction(session):
+            return func()
+
+    def refresh(self, session):
+        pass
+
+    def get_version(self, session_id: str) -> Optional[Tuple[int, int]]:
+        return None
+
+    def load(self, session_id: str) -> Optional[Tuple[Dict, List[Dict], List[Dict], float]]:
+        return None
+
+    def delete(self, session_id: str, idle_before: Optional[float] = None) -> bool:
+        return False
+
+    def close(self):
+        pass
+
+
+class _Call:
+    __slots__ = ("func", "result", "error")
+
+    def __init__(self, func: Callable[[], Any]):
+        self.func = func
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _Batch:
+    __slots__ = ("calls", "done")
+
+    def __init__(self):
+        self.calls: List[_Call] = []
+        self.done = threading.Event()
+
+
+class SqliteSessionStore(MemorySessionStore):
+    """Sessions persistées dans SQLite, partageables entre plusieurs workers.
+
+    L'en-tête de la partie (statut, tour, question courante...) est une
+    ligne JSON compacte et chaque joueur une ligne à part : une réponse ne
+    réécrit que l'en-tête et le joueur concerné. Les réponses du mode buzzer
+    ont leur propre table : chacune n'ajoute qu'une ligne et ne met à jour
+    que la version de la session, sans réécrire l'en-tête. Les questions du paquet ont
+    leur propre table, écrite au tirage du paquet (puis une ligne par
+    question de secours) et relue seulement quand il a changé ; l'en-tête
+    n'en garde que la position. Chaque mutation s'exécute
+    dans une transaction `BEGIN IMMEDIATE` qui recharge d'abord la session
+    si un autre processus l'a modifiée. Les mutations simultanées d'une même
+    session (une salle où tout le monde répond à la fois) partagent une
+    seule transaction : une salle chargée ne monopolise pas le verrou
+    d'écriture dont toutes les autres ont besoin.
+    """
+
+    shared = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            epoch INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_activity REAL NOT NULL,
+            header TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS players (
+            session_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            player_id INTEGER NOT NULL,
+            score INTEGER NOT NULL,
+            avatar_url TEXT NOT NULL,
+            PRIMARY KEY (session_id, name)
+        );
+        CREATE TABLE IF NOT EXISTS answers (
+            session_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            answered_at REAL NOT NULL,
+            PRIMARY KEY (session_id, name)
+        );
+        CREATE TABLE IF NOT EXISTS decks (
+            session_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            question TEXT NOT NULL,
+            PRIMARY KEY (session_id, position)
+        );
+    """
+
+    def __init__(self, path: str, poll_interval: float = 1.0, busy_timeout: float = 5.0):
+        """
+        Ouvre (ou crée) le stockage.
+
+        Args:
+            path: Chemin du fichier SQLite partagé par les workers.
+            poll_interval: Intervalle (secondes) de détection des changements faits par d'autres workers.
+            busy_timeout: Attente maximale (secondes) du verrou d'écriture SQLite.
+        """
+        self.path = path
+        self.poll_interval = poll_interval
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        # Mutations waiting for the write lock, by session: the first caller commits them all
+        self._batches: Dict[str, _Batch] = {}
+        self._batches_lock = threading.Lock()
+        self.stats = {"transactions": 0, "mutations": 0}
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(self.SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread: SQLite does the cross-thread/process locking
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _dumps(data) -> str:
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+    def _write_header(self, conn, session, header: Dict):
+        # Buzzer answers live in their own table, rewritten with the header
+        answers = header.pop("buzzer_answers")
+        conn.execute("DELETE FROM answers WHERE session_id = ?", (session.id_session,))
+        self._write_answers(conn, session.id_session,
+                            [(name, answer, answered_at) for name, (answer, answered_at) in answers.items()])
+        conn.execute(
+            "INSERT INTO sessions (session_id, version, epoch, created_at, last_activity, header) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (session_id) DO UPDATE SET version = excluded.version, epoch = excluded.epoch, "
+            "last_activity = excluded.last_activity, header = excluded.header",
+            (session.id_session, header["state_version"], header["state_epoch"],
+             session.created_at, session.last_activity, self._dumps(header)),
+        )
+
+    def _write_answers(self, conn, session_id: str, answers: List[Tuple[str, str, float]]):
+        conn.executemany("INSERT OR REPLACE INTO answers (session_id, name, answer, answered_at) VALUES (?, ?, ?, ?)",
+                         [(session_id, *row) for row in answers])
+
+    def _write_version(self, conn, session):
+        conn.execute("UPDATE sessions SET version = ?, last_activity = ? WHERE session_id = ?",
+                     (session.game.state_version, session.last_activity, session.id_session))
+
+    def _write_players(self, conn, session_id: str, changed: List[Dict], removed: List[str]):
+        if removed:
+            conn.executemany("DELETE FROM players WHERE session_id = ? AND name = ?",
+                             [(session_id, name) for name in removed])
+        for player in changed:
+            conn.execute(
+                "INSERT INTO players (session_id, name, player_id, score, avatar_url) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (session_id, name) DO UPDATE SET score = excluded.score, avatar_url = excluded.avatar_url",
+                (session_id, player["name"], player["id"], player["score"], player["avatar_url"]),
+            )
+
+    def _write_deck(self, conn, session, start: int):
+        # From 0: a new deck replaces the stored one; otherwise fallback questions appended to it
+        if start == 0:
+            conn.execute("DELETE FROM decks WHERE session_id = ?", (session.id_session,))
+        conn.executemany(
+            "INSERT OR REPLACE INTO decks (session_id, position, question) VALUES (?, ?, ?)",
+            [(session.id_session, position, self._dumps(question))
+             for position, question in enumerate(session.game.deck_snapshot(start), start)],
+        )
+
+    @staticmethod
+    def _deck_key(game) -> Tuple[int, int, int]:
+        return game.state_epoch, game.deck_version, len(game.deck)
+
+    def _write_full(self, conn, session):
+        game = session.game
+        conn.execute("DELETE FROM players WHERE session_id = ?", (session.id_session,))
+        self._write_header(conn, session, game.to_snapshot())
+        self._write_deck(conn, session, 0)
+        game.pop_changes()
+        game.pop_answers()
+        players = [game.player_snapshot(p) for p in game.players]
+        self._write_players(conn, session.id_session, players, [])
+
+    def create(self, session):
+        """Écrit une nouvelle session en entier."""
+        conn = self._conn()
+        with self._immediate(conn):
+            self._write_full(conn, session)
+
+    @contextmanager
+    def _immediate(self, conn):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @contextmanager
+    def transaction(self, session):
+        """
+        Encadre une mutation : recharge la session si elle est périmée, puis
+        n'écrit que l'en-tête, les joueurs et les réponses modifiés si la version a changé.
+        """
+        conn = self._conn()
+        try:
+            with self._immediate(conn):
+                row = conn.execute("SELECT version, epoch FROM sessions WHERE session_id = ?",
+                                   (session.id_session,)).fetchone()
+                if row and tuple(row) != (session.game.state_version, session.game.state_epoch):
+                    self._refresh(conn, session)
+                before = session.game.state_version
+                deck = self._deck_key(session.game)
+                yield
+                self._save(conn, session, before, deck, row is not None)
+        except BaseException:
+            # Rolled back: drop the half-applied in-memory mutation too
+            self.refresh(session)
+            raise
+
+    def mutate(self, session, func: Callable[[], Any]) -> Any:
+        """
+        Exécute une mutation de la session dans une transaction, regroupée avec
+        celles de la même session arrivées pendant l'attente du verrou d'écriture.
+
+        Le premier appelant prend le verrou et applique toutes les mutations en
+        attente, dans leur ordre d'arrivée, puis écrit une seule fois. Une
+        exception annule tout le lot et est renvoyée à chacun de ses appelants.
+
+        Returns:
+            Le résultat de func.
+        """
+        call = _Call(func)
+        with self._batches_lock:
+            batch = self._batches.get(session.id_session)
+            leader = batch is None
+            if leader:
+                batch = self._batches[session.id_session] = _Batch()
+            batch.calls.append(call)
+        if leader:
+            self._run_batch(session, batch)
+        else:
+            batch.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def _run_batch(self, session, batch: _Batch):
+        calls: List[_Call] = []
+        try:
+            with self.transaction(session):
+                # Write lock held: later mutations start the next batch
+                with self._batches_lock:
+                    del self._batches[session.id_session]
+                    calls = batch.calls
+                for call in calls:
+                    call.result = call.func()
+            with self._batches_lock:
+                self.stats["transactions"] += 1
+                self.stats["mutations"] += len(calls)
+        except BaseException as e:
+            with self._batches_lock:
+                if self._batches.get(session.id_session) is batch:
+                    # BEGIN IMMEDIATE itself failed (store busy)
+                    del self._batches[session.id_session]
+                    calls = batch.calls
+            for call in calls:
+                call.error = e
+        finally:
+            batch.done.set()
+
+    def _save(self, conn, session, before: int, deck: Tuple[int, int, int], persisted: bool):
+        if not persisted:
+            # Not persisted yet (or dropped meanwhile): write it whole
+            self._write_full(conn, session)
+        elif session.game.state_version != before:
+            changed, removed = session.game.pop_changes()
+            answers, header_changed = session.game.pop_answers()
+            if header_changed:
+                self._write_header(conn, session, session.game.to_snapshot())
+            else:
+                self._write_version(conn, session)
+                self._write_answers(conn, session.id_session, answers)
+            self._write_players(conn, session.id_session, changed, removed)
+            epoch, version, size = self._deck_key(session.game)
+            if (epoch, version) != deck[:2]:
+                self._write_deck(conn, session, 0)
+            elif size > deck[2]:
+                self._write_deck(conn, session, deck[2])
+
+    def _read_deck(self, conn, session_id: str) -> List[Dict]:
+        return [json.loads(question) for question, in conn.execute(
+            "SELECT question FROM decks WHERE session_id = ? ORDER BY position", (session_id,))]
+
+    def _read(self, conn, session_id: str) -> Optional[Tuple[Dict, List[Dict], float]]:
+        row = conn.execute("SELECT header, created_at, version FROM sessions WHERE session_id = ?",
+                           (session_id,)).fetchone()
+        if row is None:
+            return None
+        header = json.loads(row[0])
+        # Buzzer answers only bump the version column, not the header
+        header["state_version"] = row[2]
+        header["buzzer_answers"] = {
+            name: (answer, answered_at) for name, answer, answered_at in conn.execute(
+                "SELECT name, answer, answered_at FROM answers WHERE session_id = ?", (session_id,))
+        }
+        # Player ids are handed out in join order, which is also the turn order
+        players = [
+            {"id": player_id, "name": name, "score": score, "avatar_url": avatar_url}
+            for player_id, name, score, avatar_url in conn.execute(
+                "SELECT player_id, name, score, avatar_url FROM players WHERE session_id = ? ORDER BY player_id",
+                (session_id,))
+        ]
+        return header, players, row[1]
+
+    def _refresh(self, conn, session):
+        data = self._read(conn, session.id_session)
+        if data:
+            header, players, _ = data
+            game = session.game
+            # The deck only changes at start and on fallbacks: most refreshes keep it
+            deck = None
+            if (header["state_epoch"], header["deck_version"], header["deck_size"]) != self._deck_key(game):
+                deck = self._read_deck(conn, session.id_session)
+            game.restore_snapshot(header, players, deck)
+
+    def refresh(self, session):
+        """Recharge la session depuis le stockage (modifiée par un autre worker)."""
+        conn = self._conn()
+        # Deferred read transaction so header and players are consistent
+        conn.execute("BEGIN")
+        try:
+            self._refresh(conn, session)
+        finally:
+            conn.execute("COMMIT")
+
+    def get_version(self, session_id: str) -> Optional[Tuple[int, int]]:
+        """(version, epoch) persistés de la session, ou None si elle n'existe plus."""
+        row = self._conn().execute("SELECT version, epoch FROM sessions WHERE session_id = ?",
+                                   (session_id,)).fetchone()
+        return tuple(row) if row else None
+
+    def load(self, session_id: str) -> Optional[Tuple[Dict, List[Dict], List[Dict], float]]:
+        """Lit (en-tête, joueurs dans l'ordre de passage, paquet, date de création) d'une session."""
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            data = self._read(conn, session_id)
+            if data is None:
+                return None
+            header, players, created_at = data
+            return header, players, self._read_deck(conn, session_id), created_at
+        finally:
+            conn.execute("COMMIT")
+
+    def delete(self, session_id: str, idle_before: Optional[float] = None) -> bool:
+        """
+        Supprime une session persistée.
+
+        Args:
+            session_id: Identifiant de la session.
+            idle_before: Si fourni, ne supprime que si la dernière écriture est antérieure
+                (un autre worker peut encore servir la session).
+        """
+        conn = self._conn()
+        with self._immediate(conn):
+            if idle_before is not None:
+                cursor = conn.execute("DELETE FROM sessions WHERE session_id = ? AND last_activity < ?",
+                                      (session_id, idle_before))
+            else:
+                cursor = conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            if cursor.rowcount:
+                conn.execute("DELETE FROM players WHERE session_id = ?", (session_id,))
+                conn.execute("DELETE FROM answers WHERE session_id = ?", (session_id,))
+                conn.execute("DELETE FROM decks WHERE session_id = ?", (session_id,))
+        return cursor.rowcount > 0
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,175 @@
+import threading
+from typing import Optional, Dict, List, Tuple, Callable, Hashable, Any
+
+
+class _Flight:
+    __slots__ = ("size", "claimed", "callers", "overflow", "done", "result", "error")
+
+    def __init__(self, size: int):
+        self.size = size
+        # split(): results handed out so far, callers served and callers turned away (flight full)
+        self.claimed = 0
+        self.callers = 0
+        self.overflow = 0
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Regroupe les appels identiques simultanés : un seul part, les autres attendent son résultat.
+
+    Partagé par tous les QuizEngine du processus : quand plusieurs salles
+    démarrent en même temps, une seule requête par (difficulté, catégorie)
+    part vers l'API au lieu d'une par salle. Avec do(), un appel ne rejoint
+    un appel en cours que si celui-ci demande au moins autant de résultats
+    (`size`) et tous reçoivent le même résultat ; avec split(), chacun reçoit
+    sa propre tranche d'une liste demandée assez grande pour tous.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        # split(): callers the last flight of each key had to serve, to size the next one
+        self._demand: Dict[Hashable, int] = {}
+        self.stats = {
+            "calls": 0,
+            "executed": 0,
+            "coalesced": 0,
+            "timeouts": 0,
+        }
+
+    def do(self, key: Hashable, func: Callable[[], Any], size: int = 0,
+           timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """
+        Exécute func, ou attend le résultat d'un appel identique déjà en cours.
+
+        Args:
+            key: Identifie les appels interchangeables.
+            func: L'appel à exécuter (sans argument).
+            size: Nombre de résultats demandés ; un appel en cours plus petit n'est pas rejoint.
+            timeout: Attente maximale (secondes) du résultat d'un autre appel.
+
+        Returns:
+            Tuple (résultat, partagé) ; partagé vaut True si le résultat vient d'un autre appel,
+            à ne pas modifier.
+
+        Raises:
+            TimeoutError: L'appel rejoint n'a pas répondu à temps.
+        """
+        with self._lock:
+            self.stats["calls"] += 1
+            flight = self._flights.get(key)
+            if flight is not None and flight.size >= size:
+                self.stats["coalesced"] += 1
+                leader = False
+            else:
+                # Later callers join the biggest call in flight
+                flight = self._flights[key] = _Flight(size)
+                self.stats["executed"] += 1
+                leader = True
+
+        if leader:
+            try:
+                flight.result = func()
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                with self._lock:
+                    if self._flights.get(key) is flight:
+                        del self._flights[key]
+                flight.done.set()
+            return flight.result, False
+
+        if not flight.done.wait(timeout):
+            with self._lock:
+                self.stats["timeouts"] += 1
+            raise TimeoutError(f"Appel partagé {key!r} sans réponse après {timeout}s")
+        if flight.error is not None:
+            raise flight.error
+        return flight.result, True
+
+    def split(self, key: Hashable, func: Callable[[int], List], size: int, max_size: int,
+              timeout: Optional[float] = None) -> Tuple[List, bool]:
+        """
+        Comme do(), mais chaque appelant reçoit une tranche disjointe du résultat.
+
+        Le premier appel demande `size` résultats par appelant attendu (ceux
+        qu'a dû servir le dernier appel de la même clé), dans la limite de
+        `max_size`. Les suivants rejoignent l'appel en cours tant qu'il reste
+        de la place ; sinon ils en lancent un nouveau, prévu pour deux fois
+        plus d'appelants que le précédent.
+
+        Args:
+            key: Identifie les appels interchangeables.
+            func: L'appel à exécuter, avec le nombre de résultats à demander.
+            size: Nombre de résultats voulus par cet appelant.
+            max_size: Nombre maximal de résultats demandés par un appel.
+            timeout: Attente maximale (secondes) du résultat d'un autre appel.
+
+        Returns:
+            Tuple (tranche du résultat, éventuellement plus courte que `size`, ou None si
+            l'appel a renvoyé None ; partagé).
+
+        Raises:
+            TimeoutError: L'appel rejoint n'a pas répondu à temps.
+        """
+        with self._lock:
+            self.stats["calls"] += 1
+            flight = self._flights.get(key)
+            if flight is not None and flight.claimed + size <= flight.size:
+                self.stats["coalesced"] += 1
+                leader = False
+            else:
+                expected = self._demand.get(key, 1)
+                if flight is not None:
+                    # Full: the next flight makes room for twice as many callers as this one
+                    flight.overflow += 1
+                    expected = max(expected, flight.callers * 2)
+                flight = self._flights[key] = _Flight(max(size, min(size * expected, max_size)))
+                self.stats["executed"] += 1
+                leader = True
+            start = flight.claimed
+            flight.claimed += size
+            flight.callers += 1
+
+        if leader:
+            try:
+                flight.result = func(flight.size)
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                with self._lock:
+                    if self._flights.get(key) is flight:
+                        del self._flights[key]
+                    self._demand[key] = flight.callers + flight.overflow
+                flight.done.set()
+            return self._slice(flight.result, start, size), False
+
+        if not flight.done.wait(timeout):
+            with self._lock:
+                self.stats["timeouts"] += 1
+            raise TimeoutError(f"Appel partagé {key!r} sans réponse après {timeout}s")
+        if flight.error is not None:
+            raise flight.error
+        return self._slice(flight.result, start, size), True
+
+    @staticmethod
+    def _slice(result: Optional[List], start: int, size: int) -> Optional[List]:
+        # None (nothing available) stays None for every caller
+        return result[start:start + size] if result is not None else None
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["in_flight"] = len(self._flights)
+        return stats
+
+
+quiz_flights = SingleFlight()
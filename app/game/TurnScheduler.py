@@ -0,0 +1,105 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Tuple, Callable
+
+
+class TurnScheduler:
+    """Échéances de toutes les parties (fin du temps de réponse, passage automatique).
+
+    Un seul thread attend la prochaine échéance d'un tas trié par date :
+    programmer une échéance coûte O(log n), quel que soit le nombre de
+    sessions. Les échéances périmées ne sont pas retirées du tas ; le
+    callback vérifie qu'elles correspondent toujours au tour en cours, ce
+    qui rend aussi sans effet les doublons (plusieurs workers, onglets...).
+    """
+
+    def __init__(self, callback: Callable[[str, int, str, float], object], workers: int = 4):
+        """
+        Initialise l'ordonnanceur (le thread démarre à la première échéance).
+
+        Args:
+            callback: Appelé avec (session_id, turn_id, action, deadline) à l'échéance.
+            workers: Threads exécutant les callbacks, pour qu'un tour lent (question
+                récupérée sur le réseau) ne retarde pas les autres parties.
+        """
+        self.callback = callback
+        self._heap: List[Tuple[float, int, str, int, str]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="turn-action")
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.stats = {
+            "scheduled": 0,
+            "fired": 0,
+            "errors": 0,
+            "max_late_ms": 0.0,
+        }
+
+    def schedule(self, deadline: float, session_id: str, turn_id: int, action: str):
+        """
+        Programme une action à une date donnée (secondes, horloge time.time()).
+
+        Args:
+            deadline: Date d'échéance.
+            session_id: Session concernée.
+            turn_id: Tour auquel l'action s'applique.
+            action: "timeout" ou "continue".
+        """
+        with self._cond:
+            if self._closed:
+                return
+            heapq.heappush(self._heap, (deadline, next(self._seq), session_id, turn_id, action))
+            self.stats["scheduled"] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="turn-scheduler", daemon=True)
+                self._thread.start()
+            elif self._heap[0][0] == deadline:
+                # New earliest deadline: wake the thread up so it sleeps less
+                self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and (not self._heap or self._heap[0][0] > time.time()):
+                    timeout = self._heap[0][0] - time.time() if self._heap else None
+                    self._cond.wait(timeout)
+                if self._closed:
+                    return
+                deadline, _, session_id, turn_id, action = heapq.heappop(self._heap)
+                late_ms = (time.time() - deadline) * 1000
+                self.stats["fired"] += 1
+                self.stats["max_late_ms"] = max(self.stats["max_late_ms"], late_ms)
+            self._executor.submit(self._fire, session_id, turn_id, action, deadline)
+
+    def _fire(self, session_id: str, turn_id: int, action: str, deadline: float):
+        try:
+            self.callback(session_id, turn_id, action, deadline)
+        except Exception as e:
+            with self._cond:
+                self.stats["errors"] += 1
+            print(f"Erreur lors de l'échéance {action} de la session {session_id}: {e}")
+
+    def pending(self) -> int:
+        """Nombre d'échéances en attente (périmées comprises)."""
+        with self._cond:
+            return len(self._heap)
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            stats = dict(self.stats)
+            stats["pending"] = len(self._heap)
+        return stats
+
+    def close(self):
+        """Arrête le thread et abandonne les échéances en attente."""
+        with self._cond:
+            self._closed = True
+            self._heap.clear()
+            self._cond.notify()
+        if self._thread:
+            self._thread.join()
+        self._executor.shutdown(wait=False)
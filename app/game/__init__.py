@@ -1,7 +1,18 @@
 from app.game.Player import Player, Avatar
+from app.game.Metrics import Metrics
+from app.game.CircuitBreaker import CircuitBreaker
+from app.game.SingleFlight import SingleFlight
+from app.game.AnswerLog import AnswerLog
+from app.game.FakeUpstream import FakeUpstream
 from app.game.QuizEngine import QuizEngine, Quest, EasyQuestion, MediumQuestion, HardQuestion
+from app.game.QuestionBuffer import QuestionBuffer
+from app.game.QuestionStore import QuestionStore
+from app.game.Leaderboard import Leaderboard
+from app.game.TurnScheduler import TurnScheduler
 from app.game.Game import Game
+from app.game.SessionStore import MemorySessionStore, SqliteSessionStore
+from app.game.EventJournal import EventJournal
 from app.game.Session import Session
 from app.game.SessionManager import SessionManager
 
-__all__ = ['Player', 'Avatar', 'QuizEngine', 'Quest', 'EasyQuestion', 'MediumQuestion', 'HardQuestion', 'Game', 'Session', 'SessionManager']
+__all__ = ['Player', 'Avatar', 'Metrics', 'CircuitBreaker', 'SingleFlight', 'AnswerLog', 'FakeUpstream', 'QuizEngine', 'Quest', 'EasyQuestion', 'MediumQuestion', 'HardQuestion', 'QuestionBuffer', 'QuestionStore', 'Leaderboard', 'TurnScheduler', 'Game', 'MemorySessionStore', 'SqliteSessionStore', 'EventJournal', 'Session', 'SessionManager']
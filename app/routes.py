@@ -1,15 +1,55 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, jsonify, make_response
+from flask import Blueprint, render_template, request, redirect, url_for, session, jsonify, make_response, Response, stream_with_context, current_app
+import functools
+import hashlib
+import json
+import re
 import socket
+import sqlite3
+import time
 import qrcode
+import qrcode.image.svg
 import io
-import base64
 from app.game.SessionManager import SessionManager
+from app.game.HttpPool import http_pool
+from app.game.CircuitBreaker import quiz_breaker
+from app.game.SingleFlight import quiz_flights
+from app.game.AnswerLog import answer_log
+from app.game.Metrics import metrics
+from app.game.Player import Avatar
 
 bp = Blueprint('main', __name__)
 session_manager = SessionManager()
 
+# Read when /metrics is scraped, not on every request
+metrics.gauge("sessions_live", "Parties en mémoire dans ce processus.", lambda: session_manager.get_stats()["live"])
+metrics.gauge("players_live", "Joueurs des parties en mémoire.", lambda: session_manager.get_stats()["players"])
+metrics.gauge("http_pool_in_flight", "Requêtes en cours vers l'API de quiz.", lambda: http_pool.get_stats()["in_flight"])
+metrics.gauge("quiz_breaker_state", "État du disjoncteur de l'API de quiz (1 pour l'état courant).",
+              lambda: {state: int(quiz_breaker.state == state)
+                       for state in (quiz_breaker.CLOSED, quiz_breaker.OPEN, quiz_breaker.HALF_OPEN)})
+metrics.gauge("scheduler_pending", "Échéances en attente dans le minuteur serveur.",
+              lambda: session_manager.scheduler.pending() if session_manager.scheduler else None)
+
+# Seconds between SSE keep-alive comments on an idle stream
+SSE_KEEPALIVE = 15
+
+# The QR URL carries a content hash, so browsers may keep it for a year
+QR_MAX_AGE = 365 * 24 * 3600
+
+# Rendered avatars kept in memory (a few hundred bytes each); a seed always draws the same image
+AVATAR_CACHE_SIZE = 4096
+AVATAR_MAX_AGE = 365 * 24 * 3600
+AVATAR_SEED = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+@bp.before_app_request
+def start_session_manager():
+    # Not in create_app: the reloader's watcher process runs it too, but never serves a request
+    session_manager.start()
+
 # --- Helpers ---
+@functools.lru_cache(maxsize=None)
 def get_local_ip():
+    # Detected once per process: this opens a UDP socket
     try:
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         s.connect(("8.8.8.8", 80))
@@ -19,6 +59,30 @@ def get_local_ip():
     except:
         return "127.0.0.1"
 
+def get_join_url(session_id):
+    """URL à scanner pour rejoindre une partie (JOIN_HOST/JOIN_PORT ou IP détectée)."""
+    host = current_app.config.get('JOIN_HOST') or get_local_ip()
+    port = current_app.config.get('JOIN_PORT', 5000)
+    return f"http://{host}:{port}/join/{session_id}"
+
+@functools.lru_cache(maxsize=256)
+def render_qr_svg(data):
+    """
+    Génère (une seule fois par URL) le QR code SVG - sans dépendance à Pillow.
+
+    Returns:
+        Tuple (contenu SVG, empreinte utilisée comme ETag).
+    """
+    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    qr.add_data(data)
+    qr.make(fit=True)
+    img = qr.make_image(image_factory=qrcode.image.svg.SvgPathImage)
+
+    buffer = io.BytesIO()
+    img.save(buffer)
+    svg = buffer.getvalue()
+    return svg, hashlib.sha1(svg).hexdigest()[:16]
+
 # --- Admin Routes ---
 @bp.route('/admin/login', methods=['GET', 'POST'])
 def admin_login():
@@ -39,6 +103,10 @@ def admin_dashboard():
     if request.method == 'POST':
         # Create a new session (Lobby)
         session_id = session_manager.create_session(player_names=[])
+        if session_id is None:
+            # SESSION_MAX_LIVE reached and every live game is still being played
+            error = "Trop de parties en cours, réessayez dans quelques minutes"
+            return render_template('admin_dashboard.html', error=error), 503, {"Retry-After": "60"}
         game_session = session_manager.get_session(session_id)
         
         # Read categories (checkboxes return list)
@@ -59,7 +127,8 @@ def admin_dashboard():
                 'hard': int(request.form.get('ratio_hard', 10))
             },
             'categories': categories,
-            'auto_advance': request.form.get('auto_advance') == 'on'
+            'auto_advance': request.form.get('auto_advance') == 'on',
+            'mode': request.form.get('mode', 'turns')
         }
         game_session.set_config(config)
         
@@ -79,29 +148,47 @@ def display_view(session_id):
     
     # If game is playing or finished, show the Game View
     if state['status'] != "LOBBY":
-        return render_template('display_game.html', state=state, session_id=session_id)
+        return render_template('display_game.html', state=state, session_id=session_id,
+                               server_timers=session_manager.scheduler is not None)
 
-    # LOBBY: Generate QR Code for joining - Using SVG to avoid Pillow dependency
-    import qrcode.image.svg
-    
-    local_ip = get_local_ip()
-    join_url = f"http://{local_ip}:5000/join/{session_id}"
-    
-    factory = qrcode.image.svg.SvgPathImage
-    qr = qrcode.QRCode(version=1, box_size=10, border=5)
-    qr.add_data(join_url)
-    qr.make(fit=True)
-    img = qr.make_image(image_factory=factory)
-    
-    img_byte_arr = io.BytesIO()
-    img.save(img_byte_arr)
-    img_byte_arr = img_byte_arr.getvalue()
-    # SVG is text/xml, but for data URI we can base64 it or just text it.
-    # Base64 is safer for templates.
-    qr_b64 = base64.b64encode(img_byte_arr).decode('utf-8')
-    
-    # Pass mime type to template if needed, or just assume svg+xml
-    return render_template('display_lobby.html', session_id=session_id, qr_code=qr_b64, join_url=join_url, qr_type="image/svg+xml")
+    # LOBBY: the QR code is served (and cached) by display_qr
+    join_url = get_join_url(session_id)
+    _, qr_version = render_qr_svg(join_url)
+    return render_template('display_lobby.html', session_id=session_id, join_url=join_url, qr_version=qr_version)
+
+@bp.route('/display/<session_id>/qr.svg')
+def display_qr(session_id):
+    if not session_manager.session_exists(session_id):
+        return "Session not found", 404
+
+    svg, etag = render_qr_svg(get_join_url(session_id))
+    response = Response(svg, mimetype='image/svg+xml')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f"public, max-age={QR_MAX_AGE}, immutable"
+    return response.make_conditional(request)
+
+@functools.lru_cache(maxsize=AVATAR_CACHE_SIZE)
+def render_avatar_svg(seed):
+    """
+    Dessine (une seule fois par graine tant qu'elle reste dans le cache) l'avatar pixel-art.
+
+    Returns:
+        Tuple (contenu SVG, empreinte utilisée comme ETag).
+    """
+    svg = Avatar.render_svg(seed).encode("utf-8")
+    return svg, hashlib.sha256(svg).hexdigest()[:16]
+
+@bp.route('/avatars/<seed>.svg')
+def avatar_svg(seed):
+    """Self-hosted avatar: no third-party request, cacheable forever by the browsers."""
+    if not AVATAR_SEED.fullmatch(seed):
+        return "Avatar introuvable", 404
+
+    svg, etag = render_avatar_svg(seed)
+    response = Response(svg, mimetype='image/svg+xml')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f"public, max-age={AVATAR_MAX_AGE}, immutable"
+    return response.make_conditional(request)
 
 # --- Mobile Routes (Player) ---
 @bp.route('/join/<session_id>', methods=['GET', 'POST'])
@@ -143,8 +230,148 @@ def api_game_state(session_id):
     game_session = session_manager.get_session(session_id)
     if not game_session:
         return jsonify({"error": "No session"}), 404
-    return jsonify(game_session.get_game_state())
 
+    # Unchanged state: 304 without rebuilding or re-encoding anything
+    etag = game_session.game.get_state_etag()
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        version, body = game_session.get_state_json()
+        etag = game_session.game.get_state_etag(version)
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def state_event_stream(session_id, game_session, build_state):
+    """
+    Server-Sent Events response: full state first, then only the changed keys on each Game change.
+
+    Args:
+        session_id: Identifiant de la session.
+        game_session: Session déjà chargée.
+        build_state: Fonction (session) -> dict de l'état à pousser, ou None pour fermer le flux.
+    """
+    # With a shared session store, also wake up to pick up other workers' changes
+    wake_interval = session_manager.store.poll_interval or SSE_KEEPALIVE
+
+    def stream():
+        nonlocal game_session
+        yield "retry: 3000\n\n"
+        last_state = None
+        last_sent = time.monotonic()
+        version = game_session.game.state_version
+        while True:
+            state = build_state(game_session)
+            if state is None:
+                return
+            if last_state is None:
+                payload = {"version": version, "full": True, "state": state}
+            else:
+                delta = {k: v for k, v in state.items() if last_state.get(k) != v}
+                payload = {"version": version, "delta": delta} if delta else None
+            if payload:
+                yield f"event: state\ndata: {json.dumps(payload)}\n\n"
+                last_sent = time.monotonic()
+            last_state = state
+            if state["is_finished"]:
+                return
+
+            game_session.game.wait_for_change(version, timeout=wake_interval)
+            # An open stream counts as activity; stop once the session was evicted
+            game_session = session_manager.get_session(session_id)
+            if not game_session:
+                return
+            new_version = game_session.game.state_version
+            if new_version == version and time.monotonic() - last_sent >= SSE_KEEPALIVE:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            version = new_version
+
+    response = Response(stream_with_context(stream()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@bp.route('/api/game/<session_id>/events')
+def api_game_events(session_id):
+    """Server-Sent Events stream of the full game state (projector)."""
+    game_session = session_manager.get_session(session_id)
+    if not game_session:
+        return jsonify({"error": "No session"}), 404
+    return state_event_stream(session_id, game_session, lambda s: s.get_game_state())
+
+@bp.route('/api/player/<session_id>/<player_name>/view')
+def api_player_view(session_id, player_name):
+    """Compact state for one phone: own turn, options, score and rank only."""
+    game_session = session_manager.get_session(session_id)
+    if not game_session:
+        return jsonify({"error": "No session"}), 404
+
+    # The view only changes with the game state version
+    etag = game_session.game.get_state_etag()
+    if etag in request.if_none_match and game_session.game.get_player(player_name):
+        response = Response(status=304)
+    else:
+        view = game_session.get_player_view(player_name)
+        if not view:
+            return jsonify({"error": "Player not found"}), 404
+        etag = game_session.game.get_state_etag(view["version"])
+        response = jsonify(view)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@bp.route('/api/player/<session_id>/<player_name>/events')
+def api_player_events(session_id, player_name):
+    """Server-Sent Events stream of one player's compact view (ends if the player is kicked)."""
+    game_session = session_manager.get_session(session_id)
+    if not game_session:
+        return jsonify({"error": "No session"}), 404
+    if not game_session.game.get_player(player_name):
+        return jsonify({"error": "Player not found"}), 404
+    return state_event_stream(session_id, game_session, lambda s: s.get_player_view(player_name))
+
+@bp.route('/api/game/<session_id>/stats')
+def api_game_stats(session_id):
+    """Turn latency and question buffer counters for a session."""
+    game_session = session_manager.get_session(session_id)
+    if not game_session:
+        return jsonify({"error": "No session"}), 404
+    return jsonify(game_session.game.get_turn_stats())
+
+
+@bp.route('/api/stats')
+def api_stats():
+    """Process-wide counters (sessions, event journal, answer log, shared HTTP pool, quiz API breaker and coalescing, turn scheduler)."""
+    scheduler = session_manager.scheduler
+    journal = session_manager.journal
+    return jsonify({
+        "sessions": session_manager.get_stats(),
+        "journal": journal.get_stats() if journal else None,
+        "answers": answer_log.get_stats(),
+        "http_pool": http_pool.get_stats(),
+        "quiz_breaker": quiz_breaker.get_stats(),
+        "quiz_flights": quiz_flights.get_stats(),
+        "scheduler": scheduler.get_stats() if scheduler else None,
+    })
+
+@bp.route('/metrics')
+def metrics_endpoint():
+    """Counters and histograms in the Prometheus text format (404 when PROFILING is off)."""
+    if not metrics.enabled:
+        return "Profiling désactivé", 404
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@bp.app_errorhandler(sqlite3.OperationalError)
+def store_busy(error):
+    """SESSION_STORE=sqlite: another worker held the write lock past busy_timeout; the mutation was rolled back."""
+    message = str(error)
+    if "locked" not in message and "busy" not in message:
+        raise error
+    response = jsonify({"error": "Session store busy, retry"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
 
 @bp.route('/api/game/<session_id>/start', methods=['POST'])
 def api_start_game(session_id):
@@ -159,7 +386,7 @@ def api_start_game(session_id):
     
     # Assuming we update Game.py to hold these values.
     # Let's assume start_game no longer needs args if they were set via set_config
-    if not game_session.game.start_game(0, 0): # dummy args if implementation changes
+    if not game_session.start_game(0, 0): # dummy args if implementation changes
          return jsonify({"error": "Failed to start (Min players not reached?)"}), 400
          
     return jsonify({"success": True})
@@ -169,9 +396,22 @@ def api_continue_game(session_id):
     game_session = session_manager.get_session(session_id)
     if not game_session:
         return jsonify({"error": "No session"}), 404
-        
-    game_session.continue_game()
-    return jsonify({"success": True})
+    
+    # Optional turn_id: a duplicate click from a second display tab is ignored
+    turn_id = (request.get_json(silent=True) or {}).get('turn_id')
+    success = game_session.continue_game(turn_id)
+    return jsonify({"success": success})
+
+@bp.route('/api/game/<session_id>/pause', methods=['POST'])
+def api_pause_game(session_id):
+    """Suspends or resumes auto_advance ({"paused": true|false})."""
+    game_session = session_manager.get_session(session_id)
+    if not game_session:
+        return jsonify({"error": "No session"}), 404
+
+    paused = bool((request.get_json(silent=True) or {}).get('paused', True))
+    game_session.set_paused(paused)
+    return jsonify({"success": True, "paused": paused})
 
 @bp.route('/api/game/<session_id>/stop', methods=['POST'])
 def api_stop_game(session_id):
@@ -189,14 +429,13 @@ def api_timeout(session_id):
     if not game_session:
         return jsonify({"error": "No session"}), 404
     
-    # Get current player and submit a null/timeout answer
-    current_player = game_session.game.get_current_player()
-    if current_player and game_session.game.status == "PLAYING":
-        # Submit wrong answer (empty string) to trigger FEEDBACK
-        result = game_session.game.submit_answer(current_player.name, "__TIMEOUT__")
+    # Check and submit the null answer atomically, so it cannot race the player's answer
+    turn_id = (request.get_json(silent=True) or {}).get('turn_id')
+    result = game_session.timeout_turn(turn_id)
+    if result.get("valid"):
         return jsonify(result)
     
-    return jsonify({"success": False, "message": "No active turn"})
+    return jsonify({"success": False, "message": result.get("message", "No active turn")})
 
 @bp.route('/api/player/avatar/reroll', methods=['POST'])
 def api_reroll_avatar():
@@ -221,7 +460,7 @@ def api_kick_player(session_id):
     if not player_name:
         return jsonify({"error": "Player name required"}), 400
         
-    success = game_session.game.kick_player(player_name)
+    success = game_session.kick_player(player_name)
     return jsonify({"success": success})
 
 @bp.route('/api/player/<session_id>/<player_name>/avatar')
@@ -231,12 +470,36 @@ def api_get_player_avatar(session_id, player_name):
     if not game_session:
         return jsonify({"error": "No session"}), 404
     
-    # Find player in game
-    for player in game_session.game.players:
-        if player.name == player_name:
-            return jsonify({"avatar_url": player.avatar.avatar_url})
-    
-    return jsonify({"error": "Player not found"}), 404
+    player = game_session.game.get_player(player_name)
+    if not player:
+        return jsonify({"error": "Player not found"}), 404
+    return jsonify({"avatar_url": player.avatar.avatar_url})
+
+@bp.route('/api/player/<session_id>/<player_name>/rank')
+def api_get_player_rank(session_id, player_name):
+    """Get one player's rank without downloading the whole leaderboard."""
+    game_session = session_manager.get_session(session_id)
+    if not game_session:
+        return jsonify({"error": "No session"}), 404
+
+    rank = game_session.get_player_rank(player_name)
+    if not rank:
+        return jsonify({"error": "Player not found"}), 404
+    return jsonify(rank)
+
+@bp.route('/api/game/<session_id>/leaderboard')
+def api_get_leaderboard(session_id):
+    """Top-N of the leaderboard (?limit=N, everything by default)."""
+    game_session = session_manager.get_session(session_id)
+    if not game_session:
+        return jsonify({"error": "No session"}), 404
+
+    limit = request.args.get('limit', type=int)
+    state = game_session.get_game_state()
+    if state['is_blind_mode'] and not state['is_finished']:
+        # Same masking and shuffling as the full state
+        return jsonify({"leaderboard": state['leaderboard'][:limit], "is_blind_mode": True})
+    return jsonify({"leaderboard": game_session.get_leaderboard(limit), "is_blind_mode": False})
 
 @bp.route('/api/game/<session_id>/answer', methods=['POST'])
 def api_submit_answer(session_id):
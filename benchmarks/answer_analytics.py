@@ -0,0 +1,129 @@
+"""
+Answer log: recording cost, aggregation over millions of answers, and difficulty calibration.
+
+Usage: python benchmarks/answer_analytics.py [--answers 2000000] [--questions 5000] [--max-seconds 1.0]
+
+Fills an AnswerLog with synthetic answers to questions whose true success
+rate is known (a third easy, a third medium, a third hard, whatever their
+API label says), then times the per-question aggregation and the
+calibration, and checks that the calibrated levels match the true ones.
+Last, a QuizEngine on a local bank whose labels are all "facile" builds a
+deck asking for easy and hard questions: the questions players find
+hard must come out as HardQuestion (multiplier 3) and fill the
+"difficile" share of the deck.
+
+Exits with a non-zero status if the aggregation takes more than
+--max-seconds, if calibration misclassifies more than 5% of the
+questions, if reading a level waits for a recalibration, or if questions
+whose answers were all dropped keep their entry.
+"""
+import argparse
+import random
+import sys
+import time
+
+import common  # noqa: F401  (sets up sys.path)
+from app.game.AnswerLog import AnswerLog, numpy
+from app.game.QuestionStore import QuestionStore, question_hash
+from app.game.QuizEngine import QuizEngine, HardQuestion
+
+# True success rate of each difficulty (the middle of its calibration band)
+TRUE_RATES = {"facile": 0.85, "normal": 0.55, "difficile": 0.2}
+# Questions of each of the two difficulties asked for in the deck
+DECK_SHARE = 5
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--answers", type=int, default=2_000_000)
+    parser.add_argument("--questions", type=int, default=5000)
+    parser.add_argument("--max-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    levels = list(TRUE_RATES)
+    questions = [(f"Question {i} ?", levels[i % 3]) for i in range(args.questions)]
+    digests = [question_hash(text) for text, _ in questions]
+    log = AnswerLog(max_answers=args.answers)
+    errors = []
+
+    started = time.perf_counter()
+    for _ in range(args.answers):
+        code = rng.randrange(args.questions)
+        log.record(digests[code], rng.random() < TRUE_RATES[questions[code][1]],
+                   rng.randint(500, 20000), "histoire")
+    elapsed = time.perf_counter() - started
+    stats = log.get_stats()
+    print(f"{args.answers} réponses enregistrées en {elapsed:.2f}s ({elapsed / args.answers * 1e6:.2f} µs/réponse), "
+          f"{stats['bytes'] / 1024 / 1024:.1f} Mo en colonnes ({stats['bytes'] / args.answers:.0f} o/réponse)")
+    print(f"Agrégation {'numpy' if numpy is not None else 'bibliothèque standard (numpy absent)'}")
+
+    started = time.perf_counter()
+    log.question_counts()
+    counts_elapsed = time.perf_counter() - started
+    started = time.perf_counter()
+    calibrated = log.calibrate()
+    calibrate_elapsed = time.perf_counter() - started
+    started = time.perf_counter()
+    log.question_stats()
+    stats_elapsed = time.perf_counter() - started
+    print(f"Taux de réussite par question : {counts_elapsed * 1000:.0f} ms ; calibration : "
+          f"{calibrate_elapsed * 1000:.0f} ms ; avec temps de réponse moyen : {stats_elapsed * 1000:.0f} ms")
+    if counts_elapsed > args.max_seconds:
+        errors.append(f"aggregation took {counts_elapsed:.2f}s > {args.max_seconds}s")
+
+    wrong = sum(1 for digest, (_, level) in zip(digests, questions) if calibrated.get(digest) != level)
+    print(f"Calibration : {len(calibrated)} questions calibrées, {wrong} mal classées")
+    if wrong > args.questions * 0.05:
+        errors.append(f"{wrong} of {args.questions} questions misclassified")
+
+    # A recalibration is due: the reader gets the current levels, the new ones come from a background thread
+    calibrations = log.get_stats()["calibrations"]
+    started = time.perf_counter()
+    log.level_of(digests[0])
+    level_elapsed = time.perf_counter() - started
+    deadline = time.monotonic() + 30
+    while log.get_stats()["calibrations"] == calibrations and time.monotonic() < deadline:
+        time.sleep(0.01)
+    print(f"level_of pendant une recalibration : {level_elapsed * 1e6:.0f} µs")
+    # Starting the thread may cost a few GIL switch intervals, nothing like a calibration
+    if level_elapsed > max(calibrate_elapsed / 2, 0.05):
+        errors.append(f"level_of took {level_elapsed * 1000:.1f} ms, it waited for the recalibration")
+    if log.get_stats()["calibrations"] == calibrations:
+        errors.append("no background recalibration after level_of")
+
+    # A stream of new questions: dropping old answers also forgets the questions nobody answers any more
+    small = AnswerLog(max_answers=1000)
+    for i in range(20 * small.max_answers):
+        small.record(f"question {i}", rng.random() < 0.5, 1000)
+    kept = small.get_stats()["questions"]
+    print(f"Journal de {small.max_answers} réponses après {20 * small.max_answers} questions différentes : "
+          f"{kept} questions gardées")
+    if kept > small.max_answers:
+        errors.append(f"{kept} questions kept for {len(small)} answers")
+    if set(small.question_stats()) != {f"question {i}" for i in range(20 * small.max_answers - len(small),
+                                                                       20 * small.max_answers)}:
+        errors.append("answers no longer match their questions after dropping the oldest")
+
+    # Feedback into the game: every question of the bank is labelled "facile" by the API
+    store = QuestionStore(":memory:")
+    store.add_questions([{"question": text, "answer": "Oui", "badAnswers": ["Non", "Peut-être", "Jamais"]}
+                         for text, _ in questions], category="histoire", difficulty="facile")
+    quiz = QuizEngine(backend="local", store=store, answers=log)
+    quiz.set_categories(["histoire"])
+    deck = quiz.build_deck({"facile": DECK_SHARE, "normal": 0, "difficile": DECK_SHARE})
+    quiz.close()
+    hard = [q for q in deck if isinstance(q, HardQuestion)]
+    truly_hard = sum(1 for q in hard if questions[int(q.question.split()[1])][1] == "difficile")
+    print(f"Paquet de {len(deck)} questions tirées de la banque « facile » : {len(hard)} difficiles (x3), "
+          f"dont {truly_hard} réellement difficiles")
+    if len(hard) != DECK_SHARE or truly_hard != len(hard):
+        errors.append(f"deck has {len(hard)} hard questions ({truly_hard} truly hard), expected {DECK_SHARE}")
+
+    for error in errors:
+        print(error)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Load test for buzzer mode: every player answers each question at once.
+
+Usage: python benchmarks/buzzer_load.py [--players 200] [--rounds 5] [--threads 32]
+
+A client waiting for changes (a Server-Sent Events stream) counts its
+wake-ups meanwhile. Exits with a non-zero status if an answer was lost or
+scored twice, if the scores do not match the points of the scoring
+passes, if the waiting client was woken by every answer, or if answers
+saved to a SQLite session store rewrite the header, do not load back, or
+each take a write transaction of their own.
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from common import make_offline_quiz
+from app.game.Game import Game
+from app.game.Session import Session
+from app.game.SessionStore import SqliteSessionStore
+
+
+def answer_all(game: Game, names, latencies, lock):
+    """One worker: submits the answer of each of its players as fast as possible."""
+    local = []
+    for name in names:
+        started = time.perf_counter()
+        result = game.submit_answer(name, random.choice("ABCD"))
+        local.append((time.perf_counter() - started) * 1e6)
+        if not result.get("valid"):
+            raise AssertionError(f"{name}: {result}")
+    with lock:
+        latencies.extend(local)
+
+
+def watch(game: Game, wakeups: list, stop: threading.Event):
+    """A waiting client: counts how often a change wakes it up."""
+    version = game.state_version
+    while not stop.is_set():
+        new_version = game.wait_for_change(version, timeout=0.1)
+        if new_version != version:
+            wakeups[0] += 1
+        version = new_version
+
+
+def check_store(players: int, threads: int, errors: list):
+    """Buzzer answers saved to SQLite: one row each, the header untouched, batched, all of them loaded back."""
+    path = tempfile.mkdtemp(prefix="buzzer-")
+    try:
+        store = SqliteSessionStore(os.path.join(path, "sessions.db"))
+        session = Session("buzzer", Game(make_offline_quiz()), store=store)
+        store.create(session)
+        session.set_config({"min_rounds": 2, "max_rounds": 2, "max_players": players,
+                            "categories": ["histoire"], "mode": "buzzer"})
+        for i in range(players):
+            session.add_player(f"joueur{i}")
+        session.start_game(0, 0)
+        conn = store._conn()
+        header = conn.execute("SELECT header FROM sessions").fetchone()[0]
+        before = dict(store.stats)
+        names = [player.name for player in session.game.players[:-1]]
+        workers = [threading.Thread(target=lambda chunk: [session.submit_answer(name, random.choice("ABCD"))
+                                                          for name in chunk], args=(names[i::threads],))
+                   for i in range(threads)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        transactions = store.stats["transactions"] - before["transactions"]
+        print(f"SQLite : {len(names)} réponses simultanées enregistrées en {transactions} transactions")
+        if conn.execute("SELECT header FROM sessions").fetchone()[0] != header:
+            errors.append("buzzer answers rewrote the persisted header")
+        if transactions >= len(names):
+            errors.append(f"{len(names)} simultaneous answers took {transactions} write transactions")
+        loaded, _, _, _ = SqliteSessionStore(store.path).load(session.id_session)
+        if (loaded["state_version"] != session.game.state_version
+                or {name: tuple(entry) for name, entry in loaded["buzzer_answers"].items()} != session.game.buzzer_answers):
+            errors.append(f"{len(loaded['buzzer_answers'])}/{players - 1} buzzer answers loaded back")
+        session.game.quiz.close()
+        store.close()
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--players", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    game = Game(make_offline_quiz())
+    names = [f"joueur{i}" for i in range(args.players)]
+    game.set_config({"min_rounds": args.rounds, "max_rounds": args.rounds, "max_players": args.players,
+                     "categories": ["histoire"], "mode": "buzzer"})
+    for name in names:
+        game.add_player(name)
+    game.start_game(0, 0)
+
+    latencies, lock = [], threading.Lock()
+    errors, points = [], 0
+    wakeups, stop = [0], threading.Event()
+    watcher = threading.Thread(target=watch, args=(game, wakeups, stop))
+    watcher.start()
+    started = time.perf_counter()
+    while game.status == "PLAYING":
+        chunks = [names[i::args.threads] for i in range(args.threads)]
+        threads = [threading.Thread(target=answer_all, args=(game, chunk, latencies, lock)) for chunk in chunks]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # The last answer closes the question: no timeout needed
+        result = game.last_answer_result
+        if game.status != "FEEDBACK" or result["turn_id"] != game.turn_id:
+            errors.append(f"turn {game.turn_id} not scored after every player answered")
+            break
+        if sorted(r["player_name"] for r in result["results"]) != sorted(names):
+            errors.append(f"turn {game.turn_id}: {result['answers_count']} answers scored")
+        points += sum(r["points"] for r in result["results"])
+        game.continue_game(game.turn_id)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    watcher.join()
+
+    scores = sum(p.score for p in game.players)
+    if points != scores:
+        errors.append(f"sum of points {points} != sum of scores {scores}")
+    game.quiz.close()
+
+    answers = len(latencies)
+    print(f"{args.players} joueurs, {args.threads} threads, {game.current_round} questions: "
+          f"{answers} réponses en {elapsed:.2f}s ({answers / elapsed:.0f}/s), "
+          f"{wakeups[0]} réveils d'un client en attente")
+    # Each question: the first answer, one per ANSWER_NOTIFY_INTERVAL, scoring and continue
+    expected = game.current_round * 3 + elapsed / Game.ANSWER_NOTIFY_INTERVAL
+    if wakeups[0] > expected:
+        errors.append(f"a waiting client was woken {wakeups[0]} times for {answers} answers")
+    check_store(min(args.players, 50), args.threads, errors)
+    if latencies:
+        latencies.sort()
+        print(f"submit_answer: p50 {statistics.median(latencies):.0f}µs, "
+              f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.0f}µs")
+    for error in errors:
+        print(error)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Upstream load when many rooms start at once, with and without request coalescing.
+
+Usage: python benchmarks/coalescing.py [--rooms 20] [--players 4] [--rounds 5] [--latency 0.1]
+
+Every room has its own QuizEngine, all talking to the same fake quiz API
+(FakeUpstream). The rooms are configured and started at the same moment,
+as when an admin launches several games. Prints the upstream requests
+per room with and without single-flight; exits with a non-zero status if
+coalescing does not cut them, if a game deck contains a duplicate, or if
+two rooms got the same question (each room gets its own share of a
+coalesced request).
+"""
+import argparse
+import sys
+import threading
+import time
+from collections import Counter
+
+import common  # noqa: F401  (sets up sys.path)
+from app.game.CircuitBreaker import CircuitBreaker
+from app.game.FakeUpstream import FakeUpstream
+from app.game.Game import Game
+from app.game.QuestionStore import question_hash
+from app.game.QuizEngine import QuizEngine
+from app.game.SingleFlight import SingleFlight
+
+
+def start_room(game: Game, args, barrier: threading.Barrier):
+    game.set_config({"min_rounds": args.rounds, "max_rounds": args.rounds, "categories": ["histoire", "sport"]})
+    for i in range(args.players):
+        game.add_player(f"joueur{i}")
+    barrier.wait()
+    game.start_game(0, 0)
+
+
+def run(args, coalesce: bool):
+    """(upstream requests, coalesced calls, duplicate errors, seconds) for one simultaneous start."""
+    upstream = FakeUpstream(latency=args.latency, seed=1)
+    client = upstream.client()
+    flights = SingleFlight()
+    breaker = CircuitBreaker()
+    games = [Game(QuizEngine(client=client, breaker=breaker, coalesce=coalesce, flights=flights, hedge=False))
+             for _ in range(args.rooms)]
+    barrier = threading.Barrier(args.rooms)
+    started = time.perf_counter()
+    threads = [threading.Thread(target=start_room, args=(game, args, barrier)) for game in games]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    errors = []
+    rooms_by_question = Counter()
+    for n, game in enumerate(games):
+        hashes = [question_hash(q.question) for q in game.deck]
+        if len(hashes) != len(set(hashes)):
+            errors.append(f"room {n}: {len(hashes) - len(set(hashes))} duplicate questions in the deck")
+        rooms_by_question.update(set(hashes))
+        # The client is shared by every engine: detach it so that closing an engine does not close it
+        game.quiz.client = None
+        game.quiz.close()
+    # Let the background refills started by the prefetch finish before counting
+    time.sleep(args.latency * 3)
+    client.close()
+    shared = sum(1 for rooms in rooms_by_question.values() if rooms > 1)
+    if shared:
+        errors.append(f"{shared} questions asked in several rooms ({'with' if coalesce else 'without'} coalescing)")
+    return upstream.get_stats()["requests"], flights.get_stats()["coalesced"], errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args()
+
+    results = {}
+    errors = []
+    for label, coalesce in (("sans regroupement", False), ("avec regroupement", True)):
+        requests, coalesced, run_errors, elapsed = run(args, coalesce)
+        results[coalesce] = requests
+        errors.extend(run_errors)
+        print(f"{label:>18}: {requests} requêtes vers l'API pour {args.rooms} salles "
+              f"({requests / args.rooms:.1f}/salle), {coalesced} appels partagés, démarrage en {elapsed:.2f}s")
+    print(f"Charge de l'API divisée par {results[False] / max(1, results[True]):.1f}")
+
+    if results[True] * 2 > results[False]:
+        errors.append(f"coalescing only went from {results[False]} to {results[True]} upstream requests")
+    for error in errors[:10]:
+        print(error)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import os
+import sys
+
+# Ensure we can import from app when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.game.QuizEngine import QuizEngine
+from app.game.QuestionStore import QuestionStore
+
+DIFFICULTIES = ["facile", "normal", "difficile"]
+
+
+def make_question_store(per_bucket: int = 50) -> QuestionStore:
+    """In-memory question bank with `per_bucket` synthetic questions per (category, difficulty)."""
+    store = QuestionStore(":memory:")
+    for category in QuizEngine.CATEGORIES:
+        for difficulty in DIFFICULTIES:
+            store.add_questions([
+                {
+                    "question": f"{category['id']} {difficulty} #{i} ?",
+                    "answer": f"Réponse {i}",
+                    "badAnswers": [f"Faux {i}a", f"Faux {i}b", f"Faux {i}c"],
+                }
+                for i in range(per_bucket)
+            ], category=category["id"], difficulty=difficulty)
+    return store
+
+
+def make_offline_quiz(store: QuestionStore = None) -> QuizEngine:
+    """QuizEngine served entirely from a local bank: no network access."""
+    return QuizEngine(backend="local", store=store or make_question_store())
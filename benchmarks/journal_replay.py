@@ -0,0 +1,241 @@
+"""
+Event journal: cost of recording every mutation, and replay throughput on boot.
+
+Usage: python benchmarks/journal_replay.py [--sessions 200] [--players 6] [--rounds 5] [--snapshot-every 20]
+
+Plays games (turns and buzzer, a late joiner, a kick; every third one
+stopped halfway, still live) through a SessionManager whose event journal
+is on, in a temporary directory. Prints the journal size and the write
+cost per event, the raw replay throughput in events per second (every
+event from the first snapshot), then the boot time of a second
+SessionManager on the same directory, with and without periodic
+snapshots. Exits with a non-zero status if a rebuilt game differs from
+the one that was played, or if a second SessionManager on the same
+directory (another process, the reloader's watcher) replays or attaches
+its games too, or if SESSION_MAX_LIVE drops a game in progress that
+nothing can bring back.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from common import make_offline_quiz, make_question_store
+from app.game.EventJournal import EventJournal
+from app.game.Game import Game
+from app.game.SessionManager import SessionManager
+
+
+def manager_config(path, snapshot_every: int) -> dict:
+    return {
+        "QUESTION_BACKEND": "local",
+        "QUESTION_DB_PATH": ":memory:",
+        "SESSION_REAP_INTERVAL": 0,
+        "TURN_SCHEDULER": False,
+        "SESSION_MAX_LIVE": 0,
+        "SESSION_JOURNAL": path is not None,
+        "SESSION_JOURNAL_PATH": path,
+        "SESSION_SNAPSHOT_EVERY": snapshot_every,
+    }
+
+
+def play(session, args, mode: str, rng: random.Random, max_turns: int):
+    """One game with random answers, a late joiner and a kick, stopped after max_turns turns."""
+    session.set_config({"min_rounds": args.rounds, "max_rounds": args.rounds, "categories": ["histoire"],
+                        "mode": mode})
+    for i in range(args.players):
+        session.add_player(f"joueur{i}")
+    session.reroll_avatar("joueur0")
+    session.start_game(0, 0)
+    game = session.game
+    while game.status != "FINISHED" and game.turn_id <= max_turns:
+        if game.status == "FEEDBACK":
+            if game.current_round == 2 and game.get_player("retard") is None:
+                session.add_player("retard")
+                session.kick_player("joueur1")
+            session.continue_game(game.turn_id)
+        elif mode == "buzzer":
+            for player in list(game.players):
+                if rng.random() < 0.8:
+                    session.submit_answer(player.name, rng.choice("ABCD"))
+            session.timeout_turn(game.turn_id)
+        elif rng.random() < 0.9:
+            session.submit_answer(game.get_current_player().name, rng.choice("ABCD"))
+        else:
+            session.timeout_turn(game.turn_id)
+
+
+def fingerprint(game: Game) -> tuple:
+    header = game.to_snapshot()
+    header["buzzer_answers"] = {name: list(entry) for name, entry in header["buzzer_answers"].items()}
+    return header, [game.player_snapshot(p) for p in game.players], game.deck_snapshot()
+
+
+def record(args, store, path, snapshot_every: int):
+    """Plays the games (journal in `path`, or none); returns (fingerprints, events, seconds)."""
+    manager = SessionManager()
+    manager.configure(manager_config(path, snapshot_every))
+    rng = random.Random(1)
+    played = {}
+    started = time.perf_counter()
+    for n in range(args.sessions):
+        session_id = manager.create_session(quiz=make_offline_quiz(store))
+        max_turns = args.rounds * args.players // 2 if n % 3 == 2 else float("inf")
+        play(manager.get_session(session_id), args, "buzzer" if n % 2 else "turns", rng, max_turns)
+        played[session_id] = fingerprint(manager.sessions[session_id].game)
+    elapsed = time.perf_counter() - started
+    events = 0
+    if manager.journal:
+        events = manager.journal.get_stats()["events"]
+        manager.journal.close()
+    for session in manager.sessions.values():
+        session.close()
+    return played, events, elapsed
+
+
+def check(manager: SessionManager, played: dict, errors: list):
+    for session_id, expected in played.items():
+        session = manager.sessions.get(session_id)
+        if session is None:
+            errors.append(f"{session_id}: not recovered")
+        elif fingerprint(session.game) != expected:
+            errors.append(f"{session_id}: replayed game differs from the one played")
+
+
+def check_single_owner(owner: SessionManager, path, snapshot_every: int, errors: list):
+    """A second SessionManager on the journal `owner` holds must leave it alone."""
+    deferred = SessionManager()
+    deferred.configure(manager_config(path, snapshot_every), start=False)
+    if deferred.journal is not None or deferred.sessions:
+        errors.append("configure(start=False) opened the journal")
+    other = SessionManager()
+    other.configure(manager_config(path, snapshot_every))
+    if other.journal is not None or other.sessions:
+        errors.append(f"two SessionManagers attached the same journal ({len(other.sessions)} games replayed twice)")
+        if other.journal:
+            other.journal.close()
+    if owner.journal.get_stats()["errors"]:
+        errors.append("journal errors while a second SessionManager was configured")
+
+
+def check_eviction(args, store, errors: list):
+    """SESSION_MAX_LIVE: a game in progress only makes room when the journal can replay it."""
+    rng = random.Random(2)
+    # No journal: the new game is refused until one of the live ones ends
+    manager = SessionManager()
+    manager.configure(dict(manager_config(None, 10 ** 9), SESSION_MAX_LIVE=2))
+    first, second = (manager.create_session(quiz=make_offline_quiz(store)) for _ in range(2))
+    for session_id in (first, second):
+        play(manager.get_session(session_id), args, "turns", rng, 2)
+    if manager.create_session(quiz=make_offline_quiz(store)) is not None:
+        errors.append("a game in progress was evicted with no journal to replay it")
+    session = manager.get_session(first)
+    while session.game.status != "FINISHED":
+        if session.game.status == "FEEDBACK":
+            session.continue_game(session.game.turn_id)
+        else:
+            session.timeout_turn(session.game.turn_id)
+    third = manager.create_session(quiz=make_offline_quiz(store))
+    if third is None or first in manager.sessions or second not in manager.sessions:
+        errors.append("the finished game did not make room for a new one")
+    for session in manager.sessions.values():
+        session.close()
+
+    # Journal on: the least recently active game goes and is replayed on its next request
+    path = tempfile.mkdtemp(prefix="journal-")
+    try:
+        manager = SessionManager()
+        manager.configure(dict(manager_config(path, 10 ** 9), SESSION_MAX_LIVE=1))
+        first = manager.create_session(quiz=make_offline_quiz(store))
+        play(manager.get_session(first), args, "turns", rng, 2)
+        expected = fingerprint(manager.sessions[first].game)
+        if manager.create_session(quiz=make_offline_quiz(store)) is None:
+            errors.append("journal on: a new game was refused")
+        session = manager.get_session(first)
+        if session is None or fingerprint(session.game) != expected:
+            errors.append("journal on: the evicted game was not replayed as it was")
+        manager.journal.close()
+        for session in manager.sessions.values():
+            session.close()
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def boot(args, store, snapshot_every: int, errors: list):
+    """Records the games, then boots a SessionManager on their journal; returns (seconds, replayed events)."""
+    path = tempfile.mkdtemp(prefix="journal-")
+    try:
+        played, _, _ = record(args, store, path, snapshot_every)
+        manager = SessionManager()
+        started = time.perf_counter()
+        manager.configure(manager_config(path, snapshot_every))
+        elapsed = time.perf_counter() - started
+        check(manager, played, errors)
+        check_single_owner(manager, path, snapshot_every, errors)
+        replayed = manager.journal.get_stats()["replayed_events"]
+        manager.journal.close()
+        for session in manager.sessions.values():
+            session.close()
+        return elapsed, replayed
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--snapshot-every", type=int, default=20)
+    args = parser.parse_args()
+
+    store = make_question_store()
+    errors = []
+
+    # Write cost: the same games with and without the journal
+    _, _, plain = record(args, store, None, args.snapshot_every)
+    path = tempfile.mkdtemp(prefix="journal-")
+    try:
+        played, events, journaled = record(args, store, path, 10 ** 9)
+        log_size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.name.endswith(".log"))
+        print(f"{args.sessions} parties, {events} événements : {log_size / events:.0f} o/événement, "
+              f"{log_size / 1024:.0f} Ko de journal")
+        print(f"Écriture : {(journaled - plain) / events * 1e6:.1f} µs/événement "
+              f"(parties jouées en {plain:.2f}s sans journal, {journaled:.2f}s avec)")
+
+        # Raw replay: every event of every game, from the first snapshot
+        journal = EventJournal(path)
+        games = {}
+        started = time.perf_counter()
+        for session_id, _ in journal.session_ids():
+            games[session_id] = Game(make_offline_quiz(store))
+            journal.replay(session_id, games[session_id])
+        elapsed = time.perf_counter() - started
+        replayed = journal.get_stats()["replayed_events"]
+        print(f"Relecture : {replayed} événements en {elapsed:.2f}s ({replayed / elapsed:.0f} événements/s)")
+        for session_id, expected in played.items():
+            if session_id not in games or fingerprint(games[session_id]) != expected:
+                errors.append(f"{session_id}: replayed game differs from the one played")
+        for game in games.values():
+            game.quiz.close()
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+    # Boot: what a restart costs, with and without periodic snapshots
+    for label, snapshot_every in (("sans instantané", 10 ** 9), (f"instantané / {args.snapshot_every}", args.snapshot_every)):
+        elapsed, replayed = boot(args, store, snapshot_every, errors)
+        print(f"Démarrage ({label}) : {args.sessions} parties reconstruites en {elapsed:.2f}s, "
+              f"{replayed} événements rejoués")
+
+    check_eviction(args, store, errors)
+
+    for error in errors[:10]:
+        print(error)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Load test of the Flask app: full rooms of phones polling, answering and continuing.
+
+Usage: python benchmarks/load_test.py [--rooms 20] [--players 8] [--rounds 3] [--threads 8]
+                                      [--mode turns|buzzer] [--session-store memory|sqlite]
+                                      [--max-p99 MS] [--save FILE] [--baseline FILE]
+
+Sessions are created through the app's SessionManager with an offline
+QuizEngine; players join through the join form. Each tick then replays
+what the templates send: the projector polls the room state and every
+phone its own view (conditional GETs, as in the polling fallback), then
+the player(s) whose turn it is answer and the projector continues after
+the feedback. Prints p50/p95/p99 per route and the overall throughput.
+
+For CI: exits with a non-zero status on an HTTP error, a room that does
+not finish, a route whose p99 exceeds --max-p99, or whose p95 regressed
+more than --tolerance times the one saved with --save in --baseline.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from common import make_offline_quiz, make_question_store
+from app import create_app
+from app.config import Config
+from app.routes import session_manager
+
+# Timings below this (ms) are noise: never flag them as regressions
+BASELINE_FLOOR_MS = 1.0
+
+
+class LoadTestConfig(Config):
+    TESTING = True
+    SESSION_REAP_INTERVAL = 0
+    # The projector drives timeouts and continues, as without the server-side scheduler
+    TURN_SCHEDULER = False
+
+
+class Room:
+    """Client-side state of one room: what its projector and phones last received."""
+
+    def __init__(self, session_id: str, players):
+        self.session_id = session_id
+        self.players = players
+        self.state = None
+        self.state_etag = None
+        self.view_etags = {}
+        self.answered_turn = {}
+
+
+class Recorder:
+    """Latencies per route, shared by every worker."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = []
+
+    def add(self, route: str, elapsed_ms: float, status: int):
+        with self._lock:
+            self.latencies[route].append(elapsed_ms)
+            if status >= 400:
+                self.errors.append(f"{route}: HTTP {status}")
+
+
+def timed(recorder: Recorder, route: str, call, *args, **kwargs):
+    started = time.perf_counter()
+    response = call(*args, **kwargs)
+    recorder.add(route, (time.perf_counter() - started) * 1000, response.status_code)
+    return response
+
+
+def poll(client, recorder: Recorder, room: Room):
+    """One polling round: projector state, then every phone's view."""
+    headers = {"If-None-Match": room.state_etag} if room.state_etag else {}
+    response = timed(recorder, "GET /api/game/<id>/state", client.get,
+                     f"/api/game/{room.session_id}/state", headers=headers)
+    if response.status_code == 200:
+        room.state = response.get_json()
+        room.state_etag = response.headers.get("ETag")
+    for name in room.players:
+        etag = room.view_etags.get(name)
+        headers = {"If-None-Match": etag} if etag else {}
+        response = timed(recorder, "GET /api/player/<id>/<name>/view", client.get,
+                         f"/api/player/{room.session_id}/{name}/view", headers=headers)
+        if response.status_code == 200:
+            room.view_etags[name] = response.headers.get("ETag")
+
+
+def act(client, recorder: Recorder, room: Room):
+    """What the phones and the projector do after seeing the state."""
+    state = room.state
+    if state["status"] == "PLAYING":
+        turn_id = state["turn_id"]
+        if state["mode"] == "buzzer":
+            answering = [name for name in room.players if room.answered_turn.get(name) != turn_id]
+        else:
+            answering = [state["current_player"]] if room.answered_turn.get(state["current_player"]) != turn_id else []
+        for name in answering:
+            room.answered_turn[name] = turn_id
+            timed(recorder, "POST /api/game/<id>/answer", client.post,
+                  f"/api/game/{room.session_id}/answer",
+                  json={"player_name": name, "answer": random.choice("ABCD")})
+    elif state["status"] == "FEEDBACK":
+        timed(recorder, "POST /api/game/<id>/continue", client.post,
+              f"/api/game/{room.session_id}/continue", json={"turn_id": state["turn_id"]})
+
+
+def drive(app, recorder: Recorder, rooms, polls: int):
+    """One worker: plays its rooms round-robin until they are all finished."""
+    client = app.test_client()
+    active = list(rooms)
+    while active:
+        for room in active:
+            for _ in range(polls):
+                poll(client, recorder, room)
+            act(client, recorder, room)
+        active = [room for room in active if not (room.state and room.state["is_finished"])]
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--polls", type=int, default=2, help="polling rounds between two actions")
+    parser.add_argument("--mode", choices=("turns", "buzzer"), default="turns")
+    parser.add_argument("--session-store", choices=("memory", "sqlite"), default="memory")
+    parser.add_argument("--max-p99", type=float, help="fail if a route's p99 exceeds this (ms)")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file from --save to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    args = parser.parse_args()
+
+    config = LoadTestConfig
+    config.SESSION_MAX_LIVE = args.rooms
+    if args.session_store == "sqlite":
+        config.SESSION_STORE = "sqlite"
+        config.SESSION_STORE_PATH = os.path.join(tempfile.mkdtemp(), "sessions.db")
+    app = create_app(config)
+    store = make_question_store()
+    recorder = Recorder()
+
+    # Rooms are created on the server side, as the admin dashboard does
+    rooms = []
+    client = app.test_client()
+    for _ in range(args.rooms):
+        session_id = session_manager.create_session(quiz=make_offline_quiz(store))
+        session_manager.get_session(session_id).set_config({
+            "min_rounds": args.rounds, "max_rounds": args.rounds, "max_players": args.players,
+            "categories": ["histoire"], "mode": args.mode,
+        })
+        players = [f"joueur{i}" for i in range(args.players)]
+        for name in players:
+            timed(recorder, "POST /join/<id>", client.post, f"/join/{session_id}", data={"player_name": name})
+        timed(recorder, "POST /api/game/<id>/start", client.post, f"/api/game/{session_id}/start")
+        rooms.append(Room(session_id, players))
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=drive, args=(app, recorder, rooms[i::args.threads], args.polls))
+               for i in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    errors = list(dict.fromkeys(recorder.errors))
+    unfinished = [room.session_id for room in rooms if not (room.state and room.state["is_finished"])]
+    if unfinished:
+        errors.append(f"{len(unfinished)} rooms did not finish")
+
+    results = {}
+    total = sum(len(v) for v in recorder.latencies.values())
+    print(f"{args.rooms} salles x {args.players} joueurs ({args.mode}, {args.session_store}), "
+          f"{args.threads} threads : {total} requêtes en {elapsed:.2f}s ({total / elapsed:.0f} req/s)")
+    print(f"{'route':<36} {'requêtes':>9} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for route, latencies in sorted(recorder.latencies.items()):
+        latencies.sort()
+        results[route] = {
+            "count": len(latencies),
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+        }
+        r = results[route]
+        print(f"{route:<36} {r['count']:>9} {r['p50']:>6.2f}ms {r['p95']:>6.2f}ms {r['p99']:>6.2f}ms")
+        if args.max_p99 is not None and r["p99"] > args.max_p99:
+            errors.append(f"{route}: p99 {r['p99']:.2f}ms > {args.max_p99}ms")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["routes"]
+        for route, r in results.items():
+            previous = baseline.get(route)
+            if previous and r["p95"] > max(previous["p95"], BASELINE_FLOOR_MS) * args.tolerance:
+                errors.append(f"{route}: p95 {r['p95']:.2f}ms vs {previous['p95']:.2f}ms in the baseline")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "throughput": total / elapsed, "routes": results}, f, indent=2)
+
+    for error in errors[:20]:
+        print(error)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
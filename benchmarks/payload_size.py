@@ -0,0 +1,48 @@
+"""
+Payload sizes: full room state (projector) vs. compact per-player view (phones).
+
+Usage: python benchmarks/payload_size.py [--players 10,100,500]
+
+Prints the bytes of one response of each endpoint mid-game, and what a
+room where every phone refreshes once per second downloads per second.
+"""
+import argparse
+import json
+
+from common import make_offline_quiz
+from app.game.Game import Game
+
+
+def make_game(n_players: int) -> Game:
+    game = Game(make_offline_quiz())
+    game.set_config({"min_rounds": 10, "max_rounds": 10, "max_players": n_players,
+                     "categories": ["histoire"]})
+    for i in range(n_players):
+        game.add_player(f"joueur{i}")
+    game.start_game(0, 0)
+    return game
+
+
+def view_bytes(game: Game, name: str) -> int:
+    # Same encoding as jsonify in production (compact separators)
+    return len(json.dumps(game.get_player_view(name), separators=(",", ":")).encode("utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--players", default="10,100,500")
+    args = parser.parse_args()
+
+    print(f"{'joueurs':>8} {'état':>10} {'vue':>8} {'ratio':>7} {'état/s':>12} {'vues/s':>10}")
+    for n_players in (int(n) for n in args.players.split(",")):
+        game = make_game(n_players)
+        _, state = game.get_state_json()
+        state_size = len(state)
+        view_size = max(view_bytes(game, p.name) for p in game.players)
+        print(f"{n_players:>8} {state_size:>9}o {view_size:>7}o {state_size / view_size:>6.0f}x "
+              f"{state_size * n_players / 1024:>10.0f}Ko {view_size * n_players / 1024:>8.1f}Ko")
+        game.quiz.close()
+
+
+if __name__ == "__main__":
+    main()
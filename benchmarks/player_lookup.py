@@ -0,0 +1,80 @@
+"""
+Micro-benchmark: cost of player lookups, joins and kicks as the room grows.
+
+Usage: python benchmarks/player_lookup.py [--sizes 2,10,100,1000,10000] [--ops 20000] [--max-ratio 3]
+
+Lookups (avatar reroll, get_player) and kicks should stay flat from 2 to
+10,000 players: a kick finds the player's place in the turn order by
+bisection, only the C-level memmove of the list grows with the room.
+Exits with a non-zero status if kick+join at the largest size costs more
+than --max-ratio times what it costs at the smallest.
+"""
+import argparse
+import random
+import sys
+import time
+
+import common  # noqa: F401  (sets up sys.path)
+from app.game.Game import Game
+
+
+def make_game(n_players: int) -> Game:
+    game = Game(None)
+    game.max_players = n_players + 1
+    for i in range(n_players):
+        game.add_player(f"joueur{i}")
+    return game
+
+
+def per_op_ns(func, names) -> float:
+    started = time.perf_counter_ns()
+    for name in names:
+        func(name)
+    return (time.perf_counter_ns() - started) / len(names)
+
+
+def bench(n_players: int, n_ops: int) -> dict:
+    game = make_game(n_players)
+    names = [f"joueur{random.randrange(n_players)}" for _ in range(n_ops)]
+    results = {
+        "get_player": per_op_ns(game.get_player, names),
+        "reroll_avatar": per_op_ns(game.reroll_avatar, names),
+    }
+
+    # Kick then re-join the same player: the room size stays constant
+    game.current_player_index = n_players // 2
+    churn = names[:min(n_ops, 2000)]
+
+    def kick_and_join(name):
+        game.kick_player(name)
+        game.add_player(name)
+
+    results["kick+join"] = per_op_ns(kick_and_join, churn)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="2,10,100,1000,10000")
+    parser.add_argument("--ops", type=int, default=20000)
+    parser.add_argument("--max-ratio", type=float, default=3.0)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(f"{'joueurs':>8} {'get_player':>12} {'reroll':>12} {'kick+join':>12}   (ns/op)")
+    kicks = {}
+    for size in sizes:
+        r = bench(size, args.ops)
+        kicks[size] = r["kick+join"]
+        print(f"{size:>8} {r['get_player']:>12.0f} {r['reroll_avatar']:>12.0f} {r['kick+join']:>12.0f}")
+
+    smallest, largest = min(sizes), max(sizes)
+    ratio = kicks[largest] / kicks[smallest]
+    print(f"kick+join : x{ratio:.1f} de {smallest} à {largest} joueurs")
+    if ratio > args.max_ratio:
+        print(f"kick+join grows x{ratio:.1f} from {smallest} to {largest} players (max x{args.max_ratio})")
+    sys.exit(1 if ratio > args.max_ratio else 0)
+
+
+if __name__ == "__main__":
+    main()
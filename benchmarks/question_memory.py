@@ -0,0 +1,92 @@
+"""
+Memory benchmark: bytes per in-memory question, previous layout vs. __slots__ Quest.
+
+Usage: python benchmarks/question_memory.py [--count 100000]
+
+Exits with a non-zero status if a serialized Quest keeps more memory than
+the previous layout.
+
+The previous layout (per-instance __dict__, options list, difficulty and
+multiplier stored on every instance, to_dict rebuilt on each call) is
+reproduced here as LegacyQuestion for comparison. Question texts are
+shared by both runs, so only the per-object overhead is measured.
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+
+import common  # noqa: F401  (sets up sys.path)
+from app.game.QuizEngine import HardQuestion
+
+
+class LegacyQuestion:
+    """Layout of HardQuestion before __slots__ (for comparison only)."""
+
+    def __init__(self, question, answer, options):
+        self.question = question
+        self.answer = answer
+        self.options = options
+        self.difficulty = "hard"
+        self.multiplier = 3
+
+    def to_dict(self):
+        return {
+            "question": self.question,
+            "answer": self.answer,
+            "options": self.options,
+            "difficulty": self.difficulty,
+            "multiplier": self.multiplier,
+        }
+
+
+def make_raw(count: int):
+    return [(f"Question numéro {i} ?", f"Réponse {i}", [f"Réponse {i}", f"Faux {i}a", f"Faux {i}b", f"Faux {i}c"])
+            for i in range(count)]
+
+
+def measure(cls, raw, serialize: bool):
+    """Bytes allocated per question to build `raw` as `cls` instances (and serialize each once)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    questions = [cls(question, answer, list(options)) for question, answer, options in raw]
+    if serialize:
+        for q in questions:
+            q.to_dict()
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return allocated / len(raw), questions
+
+
+def time_to_dict(questions, polls: int = 10) -> float:
+    started = time.perf_counter()
+    for _ in range(polls):
+        for q in questions:
+            q.to_dict()
+    return (time.perf_counter() - started) / (polls * len(questions)) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    raw = make_raw(args.count)
+    print(f"{args.count} questions")
+    print(f"{'':>14} {'objets':>10} {'+ to_dict':>10} {'to_dict':>10}")
+    retained = {}
+    for label, cls in (("avant", LegacyQuestion), ("__slots__", HardQuestion)):
+        plain, _ = measure(cls, raw, serialize=False)
+        serialized, questions = measure(cls, raw, serialize=True)
+        retained[cls] = serialized
+        print(f"{label:>14} {plain:>9.0f}o {serialized:>9.0f}o {time_to_dict(questions):>8.0f}ns")
+        del questions
+    if retained[HardQuestion] > retained[LegacyQuestion]:
+        print(f"serialized Quest keeps {retained[HardQuestion]:.0f}o, more than {retained[LegacyQuestion]:.0f}o before")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Load test for the server-side turn scheduler: thousands of unattended games.
+
+Usage: python benchmarks/scheduler_load.py [--sessions 2000] [--rounds 3] [--time-limit 0.5]
+
+Nobody answers: every turn has to be timed out and auto-advanced by the
+single scheduler thread. Exits with a non-zero status if a game does not
+finish in time or a turn was skipped or played twice.
+"""
+import argparse
+import sys
+import time
+
+from common import make_offline_quiz, make_question_store
+from app.game.SessionManager import SessionManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--time-limit", type=float, default=0.5)
+    args = parser.parse_args()
+
+    manager = SessionManager(max_sessions=args.sessions)
+    manager.configure({"SESSION_REAP_INTERVAL": 0, "SESSION_MAX_LIVE": args.sessions})
+    store = make_question_store()
+
+    sessions = []
+    for _ in range(args.sessions):
+        session = manager.get_session(manager.create_session(quiz=make_offline_quiz(store)))
+        session.game.AUTO_ADVANCE_DELAY = args.time_limit
+        session.set_config({"min_rounds": args.rounds, "max_rounds": args.rounds, "categories": ["histoire"],
+                            "time_limit": args.time_limit, "auto_advance": True})
+        for i in range(args.players):
+            session.add_player(f"joueur{i}")
+        sessions.append(session)
+
+    started = time.perf_counter()
+    for session in sessions:
+        session.start_game(0, 0)
+    turns = args.players * args.rounds
+    expected = turns * args.time_limit * 2
+    deadline = time.time() + expected * 3 + 10
+    while time.time() < deadline and not all(s.is_finished() for s in sessions):
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - started
+
+    errors = []
+    for session in sessions:
+        game = session.game
+        if not session.is_finished():
+            errors.append(f"{session.id_session}: stuck in {game.status} at turn {game.turn_id}")
+        elif game.turn_id != turns:
+            errors.append(f"{session.id_session}: {game.turn_id} turns played, expected {turns}")
+    for error in errors[:10]:
+        print(error)
+
+    stats = manager.scheduler.get_stats()
+    print(f"{args.sessions} parties x {turns} tours en {elapsed:.2f}s (minimum théorique {expected:.2f}s), "
+          f"{stats['fired']} échéances, retard max {stats['max_late_ms']:.1f}ms, {len(errors)} en échec")
+    manager.scheduler.close()
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
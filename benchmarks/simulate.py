@@ -0,0 +1,213 @@
+"""
+Headless simulator: thousands of complete games played by bots, CPU and allocations per transition.
+
+Usage: python benchmarks/simulate.py [--games 2000] [--rounds 5] [--mode turns|buzzer]
+                                     [--bots expert:1,average:2,novice:1] [--seed 1]
+                                     [--alloc-games 200] [--save FILE] [--baseline FILE]
+
+Each game goes through the real Game state machine (set_config, start,
+answer or timeout, continue, until FINISHED) with questions from the
+in-memory bank. Bots answer right with the accuracy of their profile and
+after a simulated delay; a delay beyond the time limit is a timeout.
+Nothing sleeps, so the run measures engine cost only.
+
+CPU time is the main thread's (time.thread_time). Allocations are
+measured on a separate, smaller pass with tracemalloc, which would skew
+the timings. With the same --seed the bots make the same choices, so
+--save / --baseline compare engine versions: exits with a non-zero
+status if a transition got more than --tolerance times slower, or if a
+game did not finish or its scores do not add up.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import defaultdict, namedtuple
+from contextlib import contextmanager
+
+from common import make_offline_quiz, make_question_store
+from app.game.Game import Game
+
+# Probability of a right answer, and answer delay range (seconds)
+Profile = namedtuple("Profile", "accuracy min_delay max_delay")
+PROFILES = {
+    "expert": Profile(0.9, 1.0, 5.0),
+    "average": Profile(0.6, 3.0, 12.0),
+    "novice": Profile(0.3, 5.0, 25.0),
+    "afk": Profile(0.0, 60.0, 60.0),
+}
+TIME_LIMIT = 20
+# Transitions below this (µs) are noise: never flag them as regressions
+BASELINE_FLOOR_US = 5.0
+
+
+class Recorder:
+    """CPU time (µs) and, when tracing, bytes allocated per transition."""
+
+    def __init__(self, trace_alloc: bool = False):
+        self.trace_alloc = trace_alloc
+        self.cpu = defaultdict(list)
+        self.alloc = defaultdict(list)
+
+    @contextmanager
+    def measure(self, transition: str):
+        if self.trace_alloc:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            yield
+            self.alloc[transition].append(tracemalloc.get_traced_memory()[1] - before)
+            return
+        started = time.thread_time_ns()
+        yield
+        self.cpu[transition].append((time.thread_time_ns() - started) / 1000)
+
+
+def parse_bots(spec: str):
+    """'expert:1,average:2' -> [profile, profile, profile]."""
+    bots = []
+    for part in spec.split(","):
+        name, _, count = part.partition(":")
+        if name not in PROFILES:
+            raise SystemExit(f"Profil de bot inconnu : {name} (connus : {', '.join(PROFILES)})")
+        bots.extend([PROFILES[name]] * int(count or 1))
+    return bots
+
+
+def decide(game: Game, profile: Profile, rng: random.Random):
+    """(answer letter, delay) of a bot for the current question."""
+    question = game.current_question
+    right = "ABCD"[question.options.index(question.answer)]
+    if rng.random() < profile.accuracy:
+        answer = right
+    else:
+        answer = rng.choice([letter for letter in "ABCD"[:len(question.options)] if letter != right] or [right])
+    return answer, rng.uniform(profile.min_delay, profile.max_delay)
+
+
+def play(store, args, profiles, rng: random.Random, recorder: Recorder) -> list:
+    """Plays one game to the end; returns its errors."""
+    game = Game(make_offline_quiz(store))
+    names = [f"bot{i}" for i in range(len(profiles))]
+    bots = dict(zip(names, profiles))
+    with recorder.measure("set_config"):
+        game.set_config({"min_rounds": args.rounds, "max_rounds": args.rounds, "categories": ["histoire"],
+                         "mode": args.mode, "time_limit": TIME_LIMIT})
+    for name in names:
+        with recorder.measure("add_player"):
+            game.add_player(name)
+    with recorder.measure("start"):
+        game.start_game(0, 0)
+
+    points, errors = 0, []
+    while game.status != "FINISHED":
+        # What a projector poll costs between two moves
+        with recorder.measure("state"):
+            game.get_state_json()
+        if game.status == "FEEDBACK":
+            with recorder.measure("continue"):
+                game.continue_game(game.turn_id)
+            continue
+        if game.status != "PLAYING" or game.current_question is None:
+            errors.append(f"stuck in {game.status} at turn {game.turn_id}")
+            break
+
+        answering = names if game.mode == "buzzer" else [game.get_current_player().name]
+        moves = sorted(((decide(game, bots[name], rng), name) for name in answering), key=lambda m: m[0][1])
+        for (answer, delay), name in moves:
+            if delay > TIME_LIMIT:
+                break
+            with recorder.measure("answer"):
+                result = game.submit_answer(name, answer)
+            if not result.get("valid"):
+                errors.append(f"turn {game.turn_id}: {name} answer refused ({result.get('message')})")
+        if game.status == "PLAYING":
+            with recorder.measure("timeout"):
+                game.timeout_turn(game.turn_id)
+        result = game.last_answer_result or {}
+        points += sum(r["points"] for r in result["results"]) if "results" in result else result.get("points", 0)
+
+    if sum(p.score for p in game.players) != points:
+        errors.append(f"scores {sum(p.score for p in game.players)} != points awarded {points}")
+    game.quiz.close()
+    return errors
+
+
+def summarize(values) -> dict:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "mean": statistics.fmean(values),
+        "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--mode", choices=("turns", "buzzer"), default="turns")
+    parser.add_argument("--bots", default="expert:1,average:2,novice:1")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--alloc-games", type=int, default=200, help="games of the tracemalloc pass (0 to skip)")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file from --save to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    args = parser.parse_args()
+
+    profiles = parse_bots(args.bots)
+    store = make_question_store()
+    errors = []
+
+    # Timing pass
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+    recorder = Recorder()
+    started = time.perf_counter()
+    for n in range(args.games):
+        errors.extend(f"game {n}: {error}" for error in play(store, args, profiles, rng, recorder))
+    elapsed = time.perf_counter() - started
+
+    # Allocation pass, replaying the first games
+    allocs = Recorder(trace_alloc=True)
+    if args.alloc_games:
+        rng = random.Random(args.seed)
+        random.seed(args.seed)
+        tracemalloc.start()
+        for _ in range(min(args.alloc_games, args.games)):
+            play(store, args, profiles, rng, allocs)
+        tracemalloc.stop()
+
+    print(f"{args.games} parties ({args.mode}, {len(profiles)} bots, {args.rounds} manches) en {elapsed:.2f}s : "
+          f"{args.games / elapsed:.0f} parties/s")
+    print(f"{'transition':<12} {'appels':>9} {'CPU moy.':>10} {'CPU p95':>10} {'alloc moy.':>11}")
+    results = {"games_per_sec": args.games / elapsed, "transitions": {}}
+    for transition, values in recorder.cpu.items():
+        cpu = summarize(values)
+        alloc = statistics.fmean(allocs.alloc[transition]) if allocs.alloc.get(transition) else None
+        results["transitions"][transition] = dict(cpu, alloc=alloc)
+        alloc_text = f"{alloc / 1024:>9.1f}Ko" if alloc is not None else f"{'-':>11}"
+        print(f"{transition:<12} {cpu['count']:>9} {cpu['mean']:>8.1f}µs {cpu['p95']:>8.1f}µs {alloc_text}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for transition, current in results["transitions"].items():
+            previous = baseline["transitions"].get(transition)
+            if previous and current["mean"] > max(previous["mean"], BASELINE_FLOOR_US) * args.tolerance:
+                errors.append(f"{transition}: {current['mean']:.1f}µs vs {previous['mean']:.1f}µs in the baseline")
+        print(f"Référence : {baseline['games_per_sec']:.0f} parties/s")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(dict(results, args=vars(args)), f, indent=2)
+
+    for error in errors[:10]:
+        print(error)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Stress test: hammers answer, timeout and continue on the same games from many threads.
+
+Usage: python benchmarks/stress_concurrency.py [--games 20] [--players 6] [--rounds 5]
+
+Exits with a non-zero status if a turn was scored twice, skipped, or if
+the scores do not match the accepted answers.
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+
+from common import make_offline_quiz, make_question_store
+from app.game.Game import Game
+
+
+def hammer(game: Game, players, results, lock, stop):
+    """One worker: randomly answers, times out or continues whatever turn it sees."""
+    while not stop.is_set() and game.status != "FINISHED":
+        state = game.get_game_state()
+        turn_id = state["turn_id"]
+        action = random.random()
+        if action < 0.5:
+            name = state["current_player"] or random.choice(players)
+            result = game.submit_answer(name, random.choice("ABCD"))
+        elif action < 0.7:
+            result = game.timeout_turn(turn_id)
+        else:
+            game.continue_game(turn_id)
+            result = None
+        if result and result.get("valid"):
+            with lock:
+                results.append(result)
+
+
+def run_game(store, n_players: int, n_rounds: int, n_threads: int) -> list:
+    game = Game(make_offline_quiz(store))
+    players = [f"joueur{i}" for i in range(n_players)]
+    for name in players:
+        game.add_player(name)
+    game.set_config({"min_rounds": n_rounds, "max_rounds": n_rounds, "categories": ["histoire"]})
+    game.start_game(0, 0)
+
+    results, lock, stop = [], threading.Lock(), threading.Event()
+    threads = [threading.Thread(target=hammer, args=(game, players, results, lock, stop)) for _ in range(n_threads)]
+    for t in threads:
+        t.start()
+    deadline = time.time() + 30
+    while game.status != "FINISHED" and time.time() < deadline:
+        time.sleep(0.01)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    errors = []
+    if game.status != "FINISHED":
+        errors.append("game did not finish")
+    turns = sorted(r["turn_id"] for r in results)
+    expected = list(range(1, n_players * n_rounds + 1))
+    if turns != expected:
+        errors.append(f"scored turns {turns} != expected {expected}")
+    points = sum(r["points"] for r in results)
+    scores = sum(p.score for p in game.players)
+    if points != scores:
+        errors.append(f"sum of points {points} != sum of scores {scores}")
+    game.quiz.close()
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+
+    store = make_question_store()
+    started = time.perf_counter()
+    failures = 0
+    for i in range(args.games):
+        errors = run_game(store, args.players, args.rounds, args.threads)
+        for error in errors:
+            print(f"partie {i}: {error}")
+        failures += bool(errors)
+    elapsed = time.perf_counter() - started
+    print(f"{args.games} parties, {args.threads} threads, {failures} en échec ({elapsed:.2f}s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
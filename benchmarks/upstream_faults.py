@@ -0,0 +1,202 @@
+"""
+Fault injection: quiz API errors, tail latency and outage, against a local fake upstream.
+
+Usage: python benchmarks/upstream_faults.py [--requests 200] [--error-rate 0.3] [--slow-rate 0.05]
+
+Compares fetch_questions with and without retries and hedging, checks that
+fetch_many keeps max_concurrency requests in flight rather than waiting for
+the slowest of each batch, checks that client errors (a bad category: 400)
+never open the circuit breaker shared by every game, then takes the upstream down: the breaker must stop the traffic, recently
+seen questions must be served instead, and a game started during the
+outage must stop skipping turns after Game.MAX_SKIPPED_TURNS, wait for the
+API, then reach the end once it is back. Exits with a non-zero status otherwise.
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import time
+
+import common  # noqa: F401  (sets up sys.path)
+from app.game.CircuitBreaker import CircuitBreaker
+from app.game.FakeUpstream import FakeUpstream
+from app.game.Game import Game
+from app.game.QuizEngine import QuizEngine
+
+
+def make_quiz(upstream: FakeUpstream, **options) -> QuizEngine:
+    options.setdefault("retry_backoff", 0.01)
+    return QuizEngine(client=upstream.client(timeout=2.0), breaker=CircuitBreaker(), **options)
+
+
+def run(quiz: QuizEngine, requests: int):
+    """Fresh answers, stale (fallback) answers and latencies (ms) over `requests` sequential calls."""
+    fresh, stale, latencies = 0, 0, []
+    # The engine prints every failed fetch; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(requests):
+            served_before = quiz.fetch_stats["stale_served"]
+            started = time.perf_counter()
+            questions = quiz.fetch_questions(limit=5, difficulty="normal", category="histoire")
+            latencies.append((time.perf_counter() - started) * 1000)
+            if quiz.fetch_stats["stale_served"] > served_before:
+                stale += 1
+            elif questions:
+                fresh += 1
+    latencies.sort()
+    return fresh, stale, latencies
+
+
+def p99(latencies) -> float:
+    return latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.3)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    args = parser.parse_args()
+    errors = []
+
+    # Transient errors: retries with backoff
+    print(f"Erreurs injectées ({args.error_rate:.0%} de 503) :")
+    for label, retries in (("sans retry", 0), ("avec retry", 2)):
+        quiz = make_quiz(FakeUpstream(error_rate=args.error_rate, seed=1), retries=retries, hedge=False)
+        QuizEngine._recent.clear()
+        quiz.breaker.configure(failure_threshold=0)
+        fresh, stale, _ = run(quiz, args.requests)
+        print(f"  {label:>12}: {fresh / args.requests:.1%} de succès, {stale} servies en secours, "
+              f"{quiz.fetch_stats['retries']} nouvelles tentatives")
+        if retries and fresh / args.requests < 1 - args.error_rate ** (retries + 1) * 3:
+            errors.append(f"retries: only {fresh}/{args.requests} fetches succeeded")
+        quiz.close()
+
+    # Client errors: the API is up, the request was wrong; other games must not be cut off
+    upstream = FakeUpstream(error_rate=1.0, error_status=400, seed=4)
+    quiz = make_quiz(upstream, hedge=False)
+    QuizEngine._recent.clear()
+    run(quiz, 20)
+    sent = upstream.get_stats()["requests"]
+    print(f"Erreurs 400 : {sent} requêtes pour 20 demandes (sans nouvelle tentative), "
+          f"disjoncteur {quiz.breaker.get_stats()['state']}")
+    if quiz.breaker.state != CircuitBreaker.CLOSED or sent != 20:
+        errors.append(f"client errors: breaker {quiz.breaker.state} after {sent} requests")
+    quiz.close()
+
+    # Tail latency: hedging at the p95 of the upstream
+    print(f"Latence de queue ({args.slow_rate:.0%} de réponses à 500ms, 10ms sinon) :")
+    p99s = {}
+    for label, hedge in (("sans doublement", False), ("avec doublement", True)):
+        quiz = make_quiz(FakeUpstream(latency=0.01, slow_rate=args.slow_rate, slow_latency=0.5, seed=2), hedge=hedge)
+        _, _, latencies = run(quiz, args.requests)
+        p99s[hedge] = p99(latencies)
+        print(f"  {label:>16}: p50 {statistics.median(latencies):.0f}ms, p99 {p99s[hedge]:.0f}ms, "
+              f"{quiz.fetch_stats['hedges']} doublées ({quiz.fetch_stats['hedge_wins']} gagnées)")
+        quiz.close()
+    if p99s[True] >= p99s[False]:
+        errors.append(f"hedging did not cut the p99 ({p99s[True]:.0f}ms vs {p99s[False]:.0f}ms)")
+
+    # Batches: a slow answer holds one slot of the window, not the whole batch
+    upstream = FakeUpstream(latency=0.01, slow_rate=0.25, slow_latency=0.3, seed=5)
+    quiz = make_quiz(upstream, hedge=False, coalesce=False, max_concurrency=4)
+    batch = [(5, "normal", "histoire")] * 16
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = quiz.fetch_many(batch)
+    elapsed = time.perf_counter() - started
+    slow = upstream.get_stats()["slow"]
+    print(f"Lot de {len(batch)} requêtes (4 en vol, {slow} lentes à 300ms) : {elapsed * 1000:.0f}ms, "
+          f"{sum(r is not None for r in results)} réussies")
+    if None in results:
+        errors.append(f"fetch_many: {results.count(None)}/{len(batch)} requests failed")
+    if elapsed >= 0.3 * max(2, (slow + 3) // 4 + 1):
+        errors.append(f"fetch_many: {elapsed * 1000:.0f}ms for {slow} slow answers, slots are not reused")
+    quiz.close()
+
+    # Outage: the breaker opens and recently seen questions are served
+    upstream = FakeUpstream(seed=3)
+    quiz = make_quiz(upstream, retries=2)
+    QuizEngine._recent.clear()
+    run(quiz, 20)
+    upstream.down = True
+    before = upstream.get_stats()["requests"]
+    _, stale, latencies = run(quiz, args.requests)
+    sent = upstream.get_stats()["requests"] - before
+    print(f"Panne de l'API : {sent} requêtes envoyées pour {args.requests} demandes, "
+          f"{stale} servies depuis les questions récentes ({statistics.median(latencies):.1f}ms), "
+          f"disjoncteur {quiz.breaker.get_stats()['state']}")
+    if sent > quiz.breaker.failure_threshold:
+        errors.append(f"breaker let {sent} requests through")
+    if stale != args.requests:
+        errors.append(f"only {stale}/{args.requests} fetches served from the recent questions")
+    quiz.close()
+
+    # Half-open probe hit by an unexpected error: the next request must still be able to close the breaker
+    flaky = FakeUpstream(seed=5)
+    quiz = make_quiz(flaky, retries=0, hedge=False, coalesce=False)
+    quiz.breaker.configure(failure_threshold=1, reset_timeout=0.01)
+    quiz.breaker.record_failure()
+    time.sleep(0.02)
+    flaky.fail_with = RuntimeError("panne inattendue")
+    try:
+        quiz.fetch_questions(limit=1, difficulty="normal", category="histoire")
+    except RuntimeError:
+        pass
+    flaky.fail_with = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        quiz.fetch_questions(limit=1, difficulty="normal", category="histoire")
+    print(f"Essai interrompu par une exception : disjoncteur {quiz.breaker.get_stats()['state']} à l'essai suivant")
+    if quiz.breaker.state != CircuitBreaker.CLOSED:
+        errors.append(f"breaker stuck {quiz.breaker.state} after a probe raised an unexpected error")
+    quiz.close()
+
+    # Outage with nothing cached: a few turns are skipped, then the game waits for the API
+    QuizEngine._recent.clear()
+    game = Game(make_quiz(upstream, retries=0))
+    game.quiz.breaker.configure(failure_threshold=5, reset_timeout=0.2)
+    game.set_config({"min_rounds": 2, "max_rounds": 2, "categories": ["histoire"]})
+    game.add_player("alice")
+    game.add_player("bob")
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        game.start_game(0, 0)
+        for _ in range(10):
+            if game.status != "FEEDBACK":
+                break
+            game.continue_game(game.turn_id)
+    skipped = game.get_turn_stats()["skipped"]
+    print(f"Partie pendant la panne, sans cache : {game.status}, {skipped} tours passés, "
+          f"en attente des questions : {game.waiting_for_questions}")
+    if skipped != Game.MAX_SKIPPED_TURNS:
+        errors.append(f"{skipped} turns skipped during the outage, expected {Game.MAX_SKIPPED_TURNS}")
+    if game.status != "FEEDBACK" or not game.waiting_for_questions:
+        errors.append(f"game not waiting for questions during the outage ({game.status})")
+
+    # The API comes back: the waiting game resumes and ends without skipping more turns
+    upstream.down = False
+    time.sleep(0.25)
+    with contextlib.redirect_stdout(io.StringIO()):
+        while game.status in ("PLAYING", "FEEDBACK"):
+            if game.status == "PLAYING":
+                game.timeout_turn(game.turn_id)
+            else:
+                game.continue_game(game.turn_id)
+    elapsed = time.perf_counter() - started
+    resumed_skips = game.get_turn_stats()["skipped"] - skipped
+    print(f"Reprise après la panne : {game.status} en {elapsed:.2f}s, "
+          f"{resumed_skips} tours passés en plus")
+    if game.status != "FINISHED":
+        errors.append(f"game stuck in {game.status} at turn {game.turn_id} after the outage")
+    if resumed_skips:
+        errors.append(f"{resumed_skips} turns skipped after the API came back")
+    game.quiz.close()
+
+    for error in errors:
+        print(error)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
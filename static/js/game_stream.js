@@ -0,0 +1,64 @@
+// Abonnement à l'état d'une partie : flux SSE poussé par le serveur,
+// avec repli sur le polling JSON si EventSource est indisponible ou échoue.
+
+function subscribeGameState(sessionId, onState, pollInterval = 1000) {
+    subscribeState(`/api/game/${sessionId}/events`, `/api/game/${sessionId}/state`, onState, pollInterval);
+}
+
+// Vue compacte d'un seul joueur (manette mobile)
+function subscribePlayerView(sessionId, playerName, onState, pollInterval = 1000) {
+    const base = `/api/player/${sessionId}/${encodeURIComponent(playerName)}`;
+    subscribeState(`${base}/events`, `${base}/view`, onState, pollInterval);
+}
+
+function subscribeState(eventsUrl, stateUrl, onState, pollInterval = 1000) {
+    let state = null;
+    let pollTimer = null;
+
+    function startPolling() {
+        if (pollTimer) return;
+        const poll = () => {
+            fetch(stateUrl)
+                .then(r => r.json())
+                .then(data => {
+                    onState(data);
+                    if (data.is_finished) {
+                        clearInterval(pollTimer);
+                    }
+                })
+                .catch(err => console.error("Poll error:", err));
+        };
+        pollTimer = setInterval(poll, pollInterval);
+        poll();
+    }
+
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+
+    const source = new EventSource(eventsUrl);
+    let received = false;
+    let failures = 0;
+
+    source.addEventListener('state', (event) => {
+        received = true;
+        failures = 0;
+        const payload = JSON.parse(event.data);
+        state = payload.full ? payload.state : Object.assign({}, state, payload.delta);
+        onState(state);
+        if (state.is_finished) {
+            // Stop the browser from reconnecting to a finished game
+            source.close();
+        }
+    });
+
+    source.onerror = () => {
+        failures++;
+        // Stream never came up (proxy buffering, unsupported server...): fall back to polling
+        if (!received && failures >= 3) {
+            source.close();
+            startPolling();
+        }
+    };
+}